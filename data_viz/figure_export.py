@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Shared export stage for the visualisations. A figure can be saved as a
+    quick low resolution preview first, then at full resolution by drawing it
+    once with Agg and streaming the pixel buffer to the PNG file in blocks of
+    rows, and optionally as SVG/PDF files with the heavy layers rasterised.
+    The time taken by each stage is reported so layout changes can be checked
+    on the preview without waiting on the full render.
+
+    Usage (from a script in a visualisation folder):
+        import sys
+        sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+        from figure_export import exportFigure
+        exportFigure(fig, 'figure.png', dpi = 600, previewDpi = 72)
+
+"""
+
+# %%% Import packages
+
+import os
+import time
+import struct
+import zlib
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+# %%% Define functions
+
+#Function to write a chunk to a PNG file
+def _writePngChunk(outFile, chunkType, chunkData):
+    outFile.write(struct.pack('>I', len(chunkData)))
+    outFile.write(chunkType + chunkData)
+    outFile.write(struct.pack('>I', zlib.crc32(chunkType + chunkData) & 0xffffffff))
+
+#Function to stream blocks of RGBA rows to a PNG file
+def writePngRows(outputFile, imageSize, rowBlocks, compressLevel = 6, dpi = None):
+    """
+    outputFile: PNG file to write
+    imageSize: (width, height) of the image in pixels
+    rowBlocks: iterable of (nRows, width, 4) uint8 arrays, from top to bottom
+    compressLevel: zlib compression level (default = 6)
+    dpi: resolution to store in the file (default = None, not stored)
+
+    Only one block of rows is held in memory at a time, so images that are
+    too large to create with PIL can still be written.
+
+    """
+
+    #Get the image dimensions
+    imgWidth, imgHeight = imageSize
+
+    with open(outputFile, 'wb') as outFile:
+
+        #Write the PNG signature and 8-bit RGBA header
+        outFile.write(b'\x89PNG\r\n\x1a\n')
+        _writePngChunk(outFile, b'IHDR', struct.pack('>IIBBBBB', imgWidth, imgHeight,
+                                                     8, 6, 0, 0, 0))
+
+        #Write the resolution in pixels per metre
+        if dpi is not None:
+            pixelsPerMetre = int(round(dpi / 0.0254))
+            _writePngChunk(outFile, b'pHYs', struct.pack('>IIB', pixelsPerMetre, pixelsPerMetre, 1))
+
+        #Compress the rows block by block into the image data
+        compressor = zlib.compressobj(compressLevel)
+        nRowsWritten = 0
+        for rows in rowBlocks:
+            #Add the (none) filter type byte to the start of each row
+            filteredRows = np.zeros((len(rows), imgWidth * 4 + 1), dtype = np.uint8)
+            filteredRows[:, 1:] = np.asarray(rows, dtype = np.uint8).reshape(len(rows), -1)
+            compressedData = compressor.compress(filteredRows.tobytes())
+            if len(compressedData) > 0:
+                _writePngChunk(outFile, b'IDAT', compressedData)
+            nRowsWritten += len(rows)
+        _writePngChunk(outFile, b'IDAT', compressor.flush())
+
+        #Finish the file
+        _writePngChunk(outFile, b'IEND', b'')
+
+    #Check the full image was written
+    if nRowsWritten != imgHeight:
+        raise ValueError(f'Expected {imgHeight} rows for {outputFile} but received {nRowsWritten}.')
+
+#Function to draw a figure with Agg and stream it to a PNG file
+def streamPng(fig, outputFile, dpi, blockRows = 512, compressLevel = 6):
+    """
+    fig: matplotlib figure to save
+    outputFile: PNG file to write
+    dpi: resolution to draw the figure at
+    blockRows: number of rows compressed at a time (default = 512)
+    compressLevel: zlib compression level (default = 6)
+
+    The figure is drawn once at the given resolution and the rows are read
+    straight from the Agg buffer, so no extra copy of the full image is made.
+    The figure's own canvas and resolution are restored afterwards.
+
+    """
+
+    #Draw the figure on an Agg canvas at the output resolution
+    origCanvas = fig.canvas
+    origDpi = fig.dpi
+    try:
+        aggCanvas = FigureCanvasAgg(fig)
+        fig.dpi = dpi
+        aggCanvas.draw()
+
+        #Stream the buffer rows to the file
+        imgBuffer = np.asarray(aggCanvas.buffer_rgba())
+        imgHeight, imgWidth = imgBuffer.shape[0:2]
+        writePngRows(outputFile, (imgWidth, imgHeight),
+                     (imgBuffer[rowStart:rowStart + blockRows]
+                      for rowStart in range(0, imgHeight, blockRows)),
+                     compressLevel = compressLevel, dpi = dpi)
+
+    finally:
+        #Restore the figure
+        fig.dpi = origDpi
+        fig.set_canvas(origCanvas)
+
+    return outputFile
+
+#Function to run the export stages for a figure
+def exportFigure(fig, outputFile, dpi = 600, previewDpi = None, previewFile = None,
+                 vectorFormats = (), rasteriseArtists = (), vectorDpi = 300,
+                 blockRows = 512, verbose = True):
+    """
+    fig: matplotlib figure to export
+    outputFile: full resolution PNG file to write
+    dpi: resolution of the full PNG (default = 600)
+    previewDpi: resolution of the preview PNG (default = None, no preview)
+    previewFile: preview PNG file (default = outputFile with '_preview' added)
+    vectorFormats: list of vector formats to also save, e.g. ['svg', 'pdf']
+        (default = none)
+    rasteriseArtists: artists to rasterise in the vector files, such as large
+        collections (default = none)
+    vectorDpi: resolution of the rasterised layers in the vector files (default = 300)
+    blockRows: number of rows written to the full PNG at a time (default = 512)
+    verbose: whether to print the stage timings (default = True)
+
+    Returns a dictionary with the time (s) of each stage and the files saved.
+
+    """
+
+    #Set dictionaries to store the timings and files in
+    timings = {}
+    savedFiles = {}
+    outputBase = os.path.splitext(outputFile)[0]
+
+    #Save the preview
+    if previewDpi is not None:
+        if previewFile is None:
+            previewFile = f'{outputBase}_preview.png'
+        startTime = time.perf_counter()
+        fig.savefig(previewFile, format = 'png', dpi = previewDpi,
+                    facecolor = fig.get_facecolor(), edgecolor = 'none')
+        timings['preview'] = time.perf_counter() - startTime
+        savedFiles['preview'] = previewFile
+        if verbose:
+            print(f'Saved preview {previewFile} ({previewDpi} dpi) in {timings["preview"]:.2f}s.')
+
+    #Save the full resolution PNG
+    startTime = time.perf_counter()
+    streamPng(fig, outputFile, dpi, blockRows = blockRows)
+    timings['png'] = time.perf_counter() - startTime
+    savedFiles['png'] = outputFile
+    if verbose:
+        print(f'Saved {outputFile} ({dpi} dpi) in {timings["png"]:.2f}s.')
+
+    #Save the vector files with the heavy layers rasterised
+    if len(vectorFormats) > 0:
+        origRasterised = [artist.get_rasterized() for artist in rasteriseArtists]
+        try:
+            for artist in rasteriseArtists:
+                artist.set_rasterized(True)
+            for vectorFormat in vectorFormats:
+                vectorFile = f'{outputBase}.{vectorFormat}'
+                startTime = time.perf_counter()
+                fig.savefig(vectorFile, format = vectorFormat, dpi = vectorDpi,
+                            facecolor = fig.get_facecolor(), edgecolor = 'none')
+                timings[vectorFormat] = time.perf_counter() - startTime
+                savedFiles[vectorFormat] = vectorFile
+                if verbose:
+                    print(f'Saved {vectorFile} in {timings[vectorFormat]:.2f}s.')
+        finally:
+            for artist, rasterised in zip(rasteriseArtists, origRasterised):
+                artist.set_rasterized(rasterised)
+
+    return {'timings': timings, 'files': savedFiles}
+
+# %%% ----- End of figure_export.py -----
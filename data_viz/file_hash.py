@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Shared file hashing for the caches used across the visualisations (the
+    Pokemon sprite backgrounds, the Mario sprite downloads and the Zelda
+    image assets).
+
+    Usage (from a script in a visualisation folder):
+        import sys
+        sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+        from file_hash import fileHash
+
+"""
+
+# %%% Import packages
+
+import hashlib
+
+# %%% Define functions
+
+#Function to get the SHA-256 hash of a file
+def fileHash(filePath, blockSize = 65536):
+    """
+    filePath: file to hash
+    blockSize: number of bytes read at a time (default = 65536)
+
+    Returns the hex digest of the file contents. The file is read in blocks
+    so large files aren't loaded into memory all at once.
+
+    """
+
+    #Read the file in blocks and update the hash
+    sha = hashlib.sha256()
+    with open(filePath, 'rb') as inFile:
+        for block in iter(lambda: inFile.read(blockSize), b''):
+            sha.update(block)
+
+    return sha.hexdigest()
+
+# %%% ----- End of file_hash.py -----
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Shared registry for the custom fonts used across the visualisations. The
+    font properties matplotlib reads from each font file are saved to a cache
+    file in the font directory, keyed on the names, sizes and modified times
+    of the fonts in it. When the directory hasn't changed the cached entries
+    are added straight to the font manager rather than opening and parsing
+    every font again. Fonts are only registered once per process.
+
+    Usage (from a script in a visualisation folder):
+        import sys
+        scriptDir = os.path.dirname(os.path.abspath(__file__))
+        sys.path.append(os.path.join(scriptDir, '..', '..'))
+        from font_registry import registerFonts
+        registerFonts([os.path.join(scriptDir, 'fonts')])
+
+"""
+
+# %%% Import packages
+
+import os
+import json
+from matplotlib import font_manager
+
+# %%% Define functions
+
+#Set the name of the cache file saved in each font directory
+cacheFileName = 'fontRegistry.json'
+
+#Set the font properties stored in the cache
+fontFields = ['index', 'name', 'style', 'variant', 'weight', 'stretch', 'size']
+
+#Set of font directories already registered in this process
+_registeredDirs = set()
+
+#Function to list the fonts in a directory along with their size and modified time
+def fontSignature(fontDir):
+    """
+    fontDir: directory with the font files
+
+    Returns a sorted list of [fileName, size, modifiedTime] for each font.
+
+    """
+
+    signature = []
+    for fileName in sorted(os.listdir(fontDir)):
+        if os.path.splitext(fileName)[-1].lower() in ['.ttf', '.otf', '.ttc']:
+            fileStat = os.stat(os.path.join(fontDir, fileName))
+            signature.append([fileName, fileStat.st_size, fileStat.st_mtime])
+
+    return signature
+
+#Function to clear the font lookup cache after adding entries to the font manager
+def _clearFontLookupCache():
+
+    #Matplotlib has no public way to clear the lookup cache (addfont clears it
+    #internally), so only clear it where the cached lookup is available
+    findfontCached = getattr(font_manager.fontManager, '_findfont_cached', None)
+    if hasattr(findfontCached, 'cache_clear'):
+        findfontCached.cache_clear()
+
+#Function to register the fonts in one directory
+def _registerFontDir(fontDir):
+
+    #Get the current signature of the directory and load the cache
+    fontDir = os.path.abspath(fontDir)
+    signature = fontSignature(fontDir)
+    cacheFile = os.path.join(fontDir, cacheFileName)
+    cache = None
+    if os.path.exists(cacheFile):
+        try:
+            with open(cacheFile, 'r') as inFile:
+                cache = json.load(inFile)
+        except (OSError, ValueError):
+            cache = None
+
+    if cache is not None and cache.get('signature') == signature:
+
+        #Add the cached entries directly to the font manager
+        for entry in cache['entries']:
+            font_manager.fontManager.ttflist.append(
+                font_manager.FontEntry(fname = os.path.join(fontDir, entry['file']),
+                                       **{field: entry[field] for field in fontFields}))
+        _clearFontLookupCache()
+        return [entry['name'] for entry in cache['entries']]
+
+    #Otherwise add each font and store the entries it creates
+    entries = []
+    for fileName, _, _ in signature:
+        nEntries = len(font_manager.fontManager.ttflist)
+        font_manager.fontManager.addfont(os.path.join(fontDir, fileName))
+        for fontEntry in font_manager.fontManager.ttflist[nEntries:]:
+            entries.append(dict({field: getattr(fontEntry, field) for field in fontFields},
+                                file = fileName))
+
+    #Save the cache (it is fine to carry on if the directory is read only)
+    try:
+        with open(cacheFile + '.tmp', 'w') as outFile:
+            json.dump({'signature': signature, 'entries': entries}, outFile, indent = 2)
+        os.replace(cacheFile + '.tmp', cacheFile)
+    except OSError:
+        pass
+
+    return [entry['name'] for entry in entries]
+
+#Function to register the custom fonts for use with matplotlib
+def registerFonts(fontDirs):
+    """
+    fontDirs: list of directories with the custom fonts
+
+    Returns the list of font names added. Directories that have already been
+    registered in this process are skipped.
+
+    """
+
+    #Register each new directory
+    fontNames = []
+    for fontDir in fontDirs:
+        if os.path.abspath(fontDir) in _registeredDirs or not os.path.isdir(fontDir):
+            continue
+        fontNames.extend(_registerFontDir(fontDir))
+        _registeredDirs.add(os.path.abspath(fontDir))
+
+    return fontNames
+
+# %%% ----- End of font_registry.py -----
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Helper functions for loading the Pokemon stats data and building the
+    records used to plot each Pokemon. All of the derived values (normalised
+    hp, stat blocks, remainders and size tier) are calculated once as arrays
+    in plotting order, so the plotting code doesn't need to search the
+    dataframe for each Pokemon.
+
+"""
+
+# %%% Import packages
+
+import pandas as pd
+import numpy as np
+
+# %%% Define functions
+
+#Set the columns that aren't plotted as stat blocks
+nonStatColumns = ['idNo', 'name', 'hp', 'total', 'average', 'plotOrder']
+
+#Set the plotting parameters for each size tier
+#Tier 0 = starter pokemon, 1 = starter evolutions, 2 = all other pokemon
+tierZoom = np.array([2, 1, 0.4]) #zoom factor for sprite
+tierHpFontSize = np.array([6, 4, 2]) #font size for hp font
+tierLineWidth = np.array([1, 2/3, 1/3]) #linewidth for boxes
+
+#Function to load the pokemon stats dataset
+def loadPokemonData(dataFile, starterOrder = True, nStarters = 3, evolutionLength = 3):
+    """
+    dataFile: csv file with the pokemon stats
+    starterOrder: whether to reorder the starter evolution lines at the start
+        of the data so the starters come first followed by their evolutions
+        (default = True)
+    nStarters: number of starter pokemon (default = 3)
+    evolutionLength: number of pokemon in each starter evolution line (default = 3)
+
+    Returns the dataframe sorted into plotting order with a reset index.
+
+    """
+
+    #Load the data
+    pokemonData = pd.read_csv(dataFile)
+
+    #Slightly tweak the order of the data frame to set the starters in the right order
+    #The starter evolution lines come first in each generation, so the first of
+    #each line is moved to the front followed by the rest of the lines in order
+    plotOrder = np.arange(1, len(pokemonData)+1)
+    nLines = nStarters * evolutionLength
+    if starterOrder and len(pokemonData) >= nLines:
+        lineInds = np.arange(nLines).reshape(nStarters, evolutionLength)
+        plotOrder[np.concatenate((lineInds[:, 0], lineInds[:, 1:].ravel()))] = np.arange(1, nLines+1)
+    pokemonData['plotOrder'] = plotOrder
+
+    #Sort the dataframe with new order and reset the index
+    pokemonData.sort_values('plotOrder', inplace = True)
+    pokemonData.reset_index(drop = True, inplace = True)
+
+    return pokemonData
+
+#Function to get the stat columns to plot as blocks
+def statColumns(pokemonData):
+
+    return [column for column in pokemonData.columns if column not in nonStatColumns]
+
+#Function to build the plotting records for all pokemon
+def buildPokemonRecords(pokemonData, nStarters = 3, nEvolutions = 6):
+    """
+    pokemonData: dataframe of pokemon stats in plotting order
+    nStarters: number of pokemon in the starter tier (default = 3)
+    nEvolutions: number of pokemon in the starter evolution tier (default = 6)
+
+    Returns a dictionary of arrays (in plotting order) with the idNo, name, hp,
+    normalised hp, stat names, stats, number of 10 point stat blocks, stat remainders and
+    size tier, along with the per-pokemon zoom factor, hp font size and line
+    width for that tier. The 'nameIndex' and 'idNoIndex' dictionaries give the
+    plotting index of each pokemon by name or idNo.
+
+    """
+
+    #Get the stats as arrays
+    hp = pokemonData['hp'].to_numpy()
+    statList = statColumns(pokemonData)
+    statVals = pokemonData[statList].to_numpy()
+
+    #Set the size tier of each pokemon
+    tier = np.full(len(pokemonData), 2)
+    tier[0:nStarters + nEvolutions] = 1
+    tier[0:nStarters] = 0
+
+    #Get the idNo's and names
+    idNo = pokemonData['idNo'].to_numpy()
+    name = pokemonData['name'].to_numpy()
+
+    return {'idNo': idNo,
+            'name': name,
+            'nameIndex': {pokemonName: ind for ind, pokemonName in enumerate(name)},
+            'idNoIndex': {int(pokemonId): ind for ind, pokemonId in enumerate(idNo)},
+            'hp': hp,
+            'hpNorm': hp / np.max(hp),
+            'statList': statList,
+            'stats': statVals,
+            'stat10': np.floor(statVals / 10).astype(int),
+            'statRem': statVals % 10 / 10,
+            'tier': tier,
+            'zoomFac': tierZoom[tier],
+            'hpFontSize': tierHpFontSize[tier],
+            'lineWidth': tierLineWidth[tier]}
+
+# %%% ----- End of pokemon_data.py -----
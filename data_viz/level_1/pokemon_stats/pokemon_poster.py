@@ -0,0 +1,525 @@
+# -*- coding: utf-8 -*-
+"""
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Functions for rendering the Pokemon stats posters, along with a command
+    line interface to render a poster for every generation (or the national
+    dex) in one run. Fonts are registered once per run and the background
+    removed sprites are cached, so each extra poster only costs its render.
+
+    Usage:
+        python pokemon_poster.py
+        python pokemon_poster.py gen1 gen2 national
+
+"""
+
+# %%% Import packages
+
+import os
+import re
+import sys
+import glob
+import time
+import argparse
+from functools import lru_cache
+import matplotlib
+import matplotlib.pyplot as plt
+from matplotlib import rcParams
+from matplotlib import gridspec
+from matplotlib.offsetbox import OffsetImage, AnnotationBbox
+from matplotlib.patches import Rectangle
+from matplotlib.collections import PolyCollection
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import numpy as np
+from pokemon_data import loadPokemonData, buildPokemonRecords
+from pokemon_sprites import removeBackgrounds, composeSpriteAtlas, atlasBounds
+from poster_layout import posterLayout, legendPositions
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from font_registry import registerFonts
+from figure_export import exportFigure
+
+# %%% Define functions
+
+#Set the data folder next to this file so the datasets are found no matter
+#where the script is run from
+dataDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+#Set colouring for stat values (the last two are for the split special stats of later generations)
+statColours = ['#e13620', '#6376b8', '#f4ab6f', '#23afcc', '#7ac74c', '#a33ea1']
+
+#Function to create the stat block geometry for all pokemon
+def statBlockGeometry(stat10, statRem, axPos, statY, xMax = 1.6):
+    """
+    stat10: (nPokemon, nStats) array of the number of 10 point blocks per stat
+    statRem: (nPokemon, nStats) array of the stat remainders (as a block fraction)
+    axPos: (nPokemon, 4) array of the left, bottom, width and height of each
+        pokemon's stats axis in figure coordinates
+    statY: list of y-levels (axis coordinates) to plot each stat at
+    xMax: upper x-limit of the stats axes (default = 1.6)
+    
+    Returns an (nBlocks, 4, 2) array of block corners in figure coordinates,
+    along with the stat number and pokemon index of each block. Each stat has
+    a block for every 10 points plus a final block for the remainder.
+    
+    """
+    
+    #Get the number of pokemon and stats
+    nPokemon, nStats = stat10.shape
+    
+    #Repeat the pokemon and stat for each of its blocks (including the remainder)
+    nBlocks = (stat10 + 1).ravel()
+    blockPokemonInd = np.repeat(np.repeat(np.arange(nPokemon), nStats), nBlocks)
+    blockStatNo = np.repeat(np.tile(np.arange(nStats), nPokemon), nBlocks)
+    
+    #Number the blocks within each stat
+    blockStarts = np.repeat(np.cumsum(nBlocks) - nBlocks, nBlocks)
+    blockNo = np.arange(nBlocks.sum()) - blockStarts
+    
+    #Set the block widths with the last block being the remainder
+    blockWidth = np.where(blockNo < stat10[blockPokemonInd, blockStatNo],
+                          0.05, 0.05 * statRem[blockPokemonInd, blockStatNo])
+    
+    #Get the block corners in data coordinates
+    #The x-values match the previous use of the axes data ratio
+    x0 = blockNo / 20 * xMax
+    x1 = x0 + blockWidth * xMax
+    y0 = np.array(statY)[blockStatNo] - 0.025
+    y1 = y0 + 0.05
+    
+    #Convert to figure coordinates using the stats axis positions
+    left, bottom, width, height = [axPos[blockPokemonInd, ii] for ii in range(4)]
+    figX0 = left + x0 / xMax * width
+    figX1 = left + x1 / xMax * width
+    figY0 = bottom + y0 * height
+    figY1 = bottom + y1 * height
+    blockVerts = np.stack((np.stack((figX0, figY0), axis = -1),
+                           np.stack((figX1, figY0), axis = -1),
+                           np.stack((figX1, figY1), axis = -1),
+                           np.stack((figX0, figY1), axis = -1)), axis = 1)
+    
+    return blockVerts, blockStatNo, blockPokemonInd
+
+#Function to create the hp bar geometry for all pokemon
+def hpBarGeometry(hpNorm, axPos, xMax = 1.6, barY = 0.9, pad = 0.025, nArc = 9):
+    """
+    hpNorm: (nPokemon,) array of hp values normalised to the highest of all pokemon
+    axPos: (nPokemon, 4) array of the left, bottom, width and height of each
+        pokemon's stats axis in figure coordinates
+    xMax: upper x-limit of the stats axes (default = 1.6)
+    barY: y-level (axis coordinates) of the hp bar (default = 0.9)
+    pad: rounding radius of the bar ends in data coordinates (default = 0.025)
+    nArc: number of points around each rounded end (default = 9)
+    
+    Returns an (nPokemon, 2 * nArc, 2) array of bar outlines in figure
+    coordinates for use in a PolyCollection. Each bar is a line of zero
+    height padded out with rounded ends, matching the previous round boxes.
+    
+    """
+    
+    #Get the bar positions and sizes in figure coordinates
+    #Bars shorter than the rounded ends are drawn as just the ends
+    left, bottom, width, height = axPos.T
+    barX = left + pad / xMax * width
+    barWidth = np.maximum(hpNorm - 2 * pad, 0) / xMax * width
+    barBottom = bottom + barY * height
+    
+    #Set the radius of the ends in figure x and y units
+    radiusX = pad / xMax * width
+    radiusY = pad * height
+    
+    #Get the angles around the right end and then the left end
+    angles = np.concatenate((np.linspace(-np.pi / 2, np.pi / 2, nArc),
+                             np.linspace(np.pi / 2, 3 * np.pi / 2, nArc)))
+    endX = np.repeat([1, 0], nArc)
+    
+    #Create the outlines
+    barVerts = np.stack((barX[:, None] + endX * barWidth[:, None] + np.cos(angles) * radiusX[:, None],
+                         barBottom[:, None] + np.sin(angles) * radiusY[:, None]), axis = -1)
+    
+    return barVerts
+
+#Function to register the custom fonts and set the matplotlib parameters
+def setupPlotting(fontDir = None):
+    """
+    fontDir: list of directories with the custom fonts (default = the fonts
+        directory in the current working directory)
+
+    """
+
+    #Add custom fonts for use with matplotlib
+    #These are registered from the font cache if the fonts haven't changed
+    if fontDir is None:
+        fontDir = [os.getcwd()+'\\fonts']
+    registerFonts(fontDir)
+
+    #Set other matplotlib parameters
+    rcParams['font.weight'] = 'bold'
+    rcParams['axes.labelsize'] = 12
+    rcParams['axes.titlesize'] = 16
+    rcParams['axes.linewidth'] = 1.5
+    rcParams['axes.labelweight'] = 'bold'
+    rcParams['legend.fontsize'] = 10
+    rcParams['xtick.major.width'] = 1.5
+    rcParams['ytick.major.width'] = 1.5
+    rcParams['legend.framealpha'] = 0.0
+    rcParams['savefig.dpi'] = 300
+    rcParams['savefig.format'] = 'pdf'
+
+#Function to load a background removed sprite
+#Sprites are kept in memory so they are only read once across posters
+@lru_cache(maxsize = None)
+def loadSprite(spriteFile):
+
+    return plt.imread(spriteFile)
+
+#Function to convert a generation number to roman numerals
+def romanNumeral(number):
+
+    numerals = [(10, 'X'), (9, 'IX'), (5, 'V'), (4, 'IV'), (1, 'I')]
+    roman = ''
+    for value, numeral in numerals:
+        while number >= value:
+            roman += numeral
+            number -= value
+
+    return roman
+
+#Function to get the data files of the datasets to render
+def getDatasetFiles(datasetNames = None, dataDir = dataDir):
+    """
+    datasetNames: list of datasets to render (e.g. ['gen1', 'national'])
+        (default = None, all datasets in dataDir)
+    dataDir: directory with the 'pokemonStats_{dataset}.csv' files
+        (default = the data folder next to this file)
+
+    Returns a dictionary of the data file for each dataset.
+
+    """
+
+    #Find all of the datasets if none are given
+    if datasetNames is None or len(datasetNames) == 0:
+        datasetNames = sorted([os.path.basename(dataFile)[len('pokemonStats_'):-len('.csv')]
+                               for dataFile in glob.glob(os.path.join(dataDir, 'pokemonStats_*.csv'))])
+        if len(datasetNames) == 0:
+            raise FileNotFoundError(f'No pokemonStats_*.csv datasets found in {dataDir}')
+
+    #Check the data files exist
+    dataFiles = {datasetName: os.path.join(dataDir, f'pokemonStats_{datasetName}.csv')
+                 for datasetName in datasetNames}
+    missingFiles = [dataFile for dataFile in dataFiles.values() if not os.path.exists(dataFile)]
+    if len(missingFiles) > 0:
+        raise FileNotFoundError(f'Missing data files: {", ".join(missingFiles)}')
+
+    return dataFiles
+
+#Function to get the title and description for a dataset
+def posterTitle(datasetName):
+    """
+    datasetName: name of the dataset (e.g. 'gen1' or 'national')
+
+    Returns the poster title and description.
+
+    """
+
+    if datasetName.startswith('gen') and datasetName[3:].isdigit():
+        generation = romanNumeral(int(datasetName[3:]))
+        return f'Generation {generation}', f'Base HP and stats of generation {generation} Pokemon'
+    elif datasetName == 'national':
+        return 'National Pokedex', 'Base HP and stats of all Pokemon'
+    else:
+        return datasetName, f'Base HP and stats of {datasetName} Pokemon'
+
+#Function to render a stats poster
+def renderPoster(pokemonData, outputFile, title, description,
+                 spriteDir = 'img\\sprites', logoFile = 'img\\logo\\pokemonBlack.png',
+                 dpi = 600, spriteAtlas = False, atlasDpi = 180,
+                 previewDpi = None, vectorFormats = ()):
+    """
+    pokemonData: dataframe of pokemon stats in plotting order (see loadPokemonData)
+    outputFile: png file to save the poster to
+    title: title text for the poster header
+    description: description text for the poster header
+    spriteDir: directory with the '{idNo}.png' sprites (default = 'img\\sprites')
+    logoFile: logo image for the poster header (default = 'img\\logo\\pokemonBlack.png')
+    dpi: resolution to save the poster at (default = 600)
+    spriteAtlas: whether to draw all sprites as a single atlas image rather
+        than an image artist for each sprite (default = False)
+    atlasDpi: resolution of the sprite atlas (default = 180, which scales the
+        40 pixel sprites by whole or half pixel steps in each tier)
+    previewDpi: resolution of a preview saved before the full poster
+        (default = None, no preview)
+    vectorFormats: list of vector formats to also save, e.g. ['svg', 'pdf'],
+        with the stat blocks and hp bars rasterised (default = none)
+
+    Returns the output file.
+
+    """
+
+    #Build the plotting records for each pokemon (in plotting order)
+    #This precalculates the normalised hp, stat blocks and size tier parameters
+    pokemonRecords = buildPokemonRecords(pokemonData)
+    nPokemon = len(pokemonData)
+    statList = pokemonRecords['statList']
+
+    #Set y-level to plot each stat at
+    statY = list(np.linspace(0.7, 0.1, len(statList)))
+
+    #Create new versions of sprite images with background removed
+    #Only sprites that have changed since the last run are processed
+    removeBackgrounds(list(pokemonRecords['idNo']), spriteDir = spriteDir)
+
+    #Calculate the layout from the size tier of each pokemon
+    layout = posterLayout(pokemonRecords['tier'])
+
+    #Set up the figure
+    fig = plt.figure(figsize = layout['figSize'])
+
+    #Set figure colouring
+    fig.patch.set_facecolor('#fffaf0')
+
+    #Create the desired grid of axes to work with
+    gridSpec = gridspec.GridSpec(*layout['gridShape'])
+
+    #Update spacing of grid
+    gridSpec.update(**layout['gridBounds'], wspace = 0.1, hspace = 0.2)
+
+    #Create the sprite and stats axes for each pokemon
+    pokemonAx = []
+    statsAx = []
+    for spriteSpec, statsSpec in zip(layout['spriteSpecs'], layout['statsSpecs']):
+        pokemonAx.append(fig.add_subplot(gridSpec.new_subplotspec(spriteSpec[0:2],
+                                                                  rowspan = spriteSpec[2],
+                                                                  colspan = spriteSpec[3])))
+        statsAx.append(fig.add_subplot(gridSpec.new_subplotspec(statsSpec[0:2],
+                                                                rowspan = statsSpec[2],
+                                                                colspan = statsSpec[3])))
+
+    #Loop through Pokemon and plot data
+    for ind in range(nPokemon):
+
+        #Get the pokemon idNo and plotting parameters for its size tier
+        idNo = pokemonRecords['idNo'][ind]
+        zoomFac = pokemonRecords['zoomFac'][ind]
+        hpFontSize = pokemonRecords['hpFontSize'][ind]
+
+        #Grab axes to plot on from lists
+        spriteAx = pokemonAx[ind]
+        dataAx = statsAx[ind]
+
+        #Create the sprite axes
+
+        #Add the sprite image to the axes
+        #These are added together after the loop when using the sprite atlas
+        if not spriteAtlas:
+            #Load image
+            pokemonImg = loadSprite(f'{spriteDir}\\{idNo}_bgRemoved.png')
+            #Create offset image
+            imOffset = OffsetImage(pokemonImg, zoom = zoomFac)
+            #Create annotation box
+            annBox = AnnotationBbox(imOffset, (0.5,0.5),
+                                    frameon = False,
+                                    box_alignment = (0.5,0.5),
+                                    xycoords = spriteAx.transAxes,
+                                    pad = 0)
+            #Add image
+            spriteAx.add_artist(annBox)
+
+        #Turn sprite axis off
+        spriteAx.axis('off')
+
+        #Create the stats axis
+
+        #Adjust axis limits for spacing
+        #The y-limits are fixed so the collections below can be positioned from them
+        dataAx.set_xlim([0,1.6])
+        dataAx.set_ylim([0,1])
+
+        #Add hp text
+        #Get the current pokemons absolute hp and normalised to highest of all pokemon
+        hp = pokemonRecords['hp'][ind]
+        hpNorm = pokemonRecords['hpNorm'][ind]
+        dataAx.text(hpNorm+0.05, 0.9, f'{hp} / {hp} HP',
+                    font = 'PKMN RBYGSC', color = 'black', fontsize = hpFontSize,
+                    ha = 'left', va = 'top', clip_on = False)
+
+        #Turn data axis off
+        dataAx.axis('off')
+
+    #Sprites
+    #Pack all sprites into a single image covering the figure
+    if spriteAtlas:
+        #Set the atlas size and get the centre of each sprite axes in atlas pixels
+        atlasWidth = int(round(layout['figSize'][0] * atlasDpi))
+        atlasHeight = int(round(layout['figSize'][1] * atlasDpi))
+        spriteAxPos = np.array([pokemonAx[ind].get_position().bounds for ind in range(nPokemon)]).reshape(-1, 4)
+        centreX = (spriteAxPos[:, 0] + spriteAxPos[:, 2] / 2) * atlasWidth
+        centreY = (1 - (spriteAxPos[:, 1] + spriteAxPos[:, 3] / 2)) * atlasHeight
+        #Scale each sprite to match the offset image zoom (which is relative to 72 dpi)
+        atlasImg = composeSpriteAtlas(
+            [(loadSprite(f'{spriteDir}\\{idNo}_bgRemoved.png') * 255).round().astype(np.uint8)
+             for idNo in pokemonRecords['idNo']],
+            pokemonRecords['zoomFac'] * atlasDpi / 72,
+            np.stack((centreX, centreY), axis = 1),
+            (atlasWidth, atlasHeight))
+        #Crop the atlas to the sprites so only that area is resampled when saving
+        #An empty atlas (e.g. no sprites to draw) is left off the figure
+        spriteBounds = atlasBounds(atlasImg)
+        if spriteBounds is not None:
+            rowStart, rowEnd, colStart, colEnd = spriteBounds
+            #Add the atlas on an axes covering the figure
+            atlasAx = fig.add_axes([0, 0, 1, 1])
+            atlasAx.imshow(atlasImg[rowStart:rowEnd, colStart:colEnd],
+                           extent = (colStart, colEnd, rowEnd, rowStart),
+                           interpolation = 'nearest')
+            atlasAx.set_xlim([0, atlasWidth])
+            atlasAx.set_ylim([atlasHeight, 0])
+            atlasAx.axis('off')
+
+    #Get the positions of the stats axes on the figure
+    statsAxPos = np.array([statsAx[ind].get_position().bounds for ind in range(nPokemon)])
+
+    #HP bars
+    #Create the rounded hp bars for all pokemon and add as a single collection
+    hpBars = PolyCollection(hpBarGeometry(pokemonRecords['hpNorm'], statsAxPos),
+                            edgecolor = '#3d3d3d', facecolor = '#3d3d3d',
+                            transform = fig.transFigure, clip_on = False)
+    fig.add_artist(hpBars)
+
+    #Stats
+    #Create the 10 point and remainder blocks for all stats and pokemon
+    #and add as a single collection
+    blockVerts, blockStatNo, blockPokemonInd = statBlockGeometry(pokemonRecords['stat10'],
+                                                                 pokemonRecords['statRem'],
+                                                                 statsAxPos, statY)
+    statBlocks = PolyCollection(blockVerts,
+                                edgecolor = 'black',
+                                linewidth = pokemonRecords['lineWidth'][blockPokemonInd],
+                                facecolor = np.array(statColours)[blockStatNo],
+                                transform = fig.transFigure, clip_on = False)
+    fig.add_artist(statBlocks)
+
+    #Add pokemon logo header
+    #Load image
+    logoImg = loadSprite(logoFile)
+    #Use first axes to map the image as a reference against
+    logoAx = pokemonAx[0]
+    #Create offset image
+    imOffset = OffsetImage(logoImg, zoom = 0.20)
+    #Create annotation box
+    annBox = AnnotationBbox(imOffset, (0.5,layout['headerY']['logo']),
+                            frameon = False,
+                            box_alignment = (0.5,0.5),
+                            xycoords = fig.transFigure,
+                            pad = 0)
+    #Add image
+    logoAx.add_artist(annBox)
+
+    #Add generation text header
+    fig.text(0.5, layout['headerY']['title'],
+             title,
+             font = 'Pokemon Solid', fontsize = 25,
+             ha = 'center', va = 'center')
+
+    #Add descriptive text
+    fig.text(0.5, layout['headerY']['description'],
+             description,
+             font = 'Lato Regular', fontsize = 10,
+             ha = 'center', va = 'center')
+    fig.text(0.5, layout['headerY']['blockNote'],
+             'Each block represents 10 stat points for the category',
+             font = 'Lato Regular', fontsize = 10,
+             ha = 'center', va = 'center')
+
+    #Add legend text (splitting camel case stat names into words)
+    #The labels are measured so the patches can be placed next to them
+    #Only the Agg based canvases have get_renderer, so an Agg canvas is used
+    #to measure with under the vector backends, and the widths are taken
+    #relative to the figure width in the renderer's units
+    legendY = layout['headerY']['legend']
+    legendLabels = [fig.text(0, legendY, re.sub('([a-z])([A-Z])', r'\1 \2', statName).title(),
+                             font = 'Lato Regular', fontsize = 7,
+                             ha = 'left', va = 'center')
+                    for statName in statList]
+    if not hasattr(fig.canvas, 'get_renderer'):
+        FigureCanvasAgg(fig)
+    renderer = fig.canvas.get_renderer()
+    rendererWidth = renderer.points_to_pixels(fig.get_figwidth() * 72)
+    labelWidths = [label.get_window_extent(renderer).width / rendererWidth for label in legendLabels]
+    patchWidth, patchHeight = layout['legendPatchSize']
+    patchX, labelX = legendPositions(labelWidths, patchWidth)
+
+    #Add legend patches
+    #Loop through and add patches
+    for legPatchNo in range(len(statList)):
+        #Move the label
+        legendLabels[legPatchNo].set_x(labelX[legPatchNo])
+        #Create the square
+        statBox = Rectangle((patchX[legPatchNo],legendY - patchHeight / 2),
+                            patchWidth, patchHeight,
+                            clip_on = False,
+                            edgecolor = 'black',
+                            linewidth = 1,
+                            facecolor = statColours[legPatchNo],
+                            transform = fig.transFigure)
+        #Add to axis
+        logoAx.add_patch(statBox)
+
+    #Add data source and details text
+    fig.text(0.995, 0,
+             'Author: Aaron Fox (@aaron_s_fox) | Source: Bulbapedia',
+             font = 'Lato Regular', fontsize = 10,
+             ha = 'right', va = 'bottom')
+
+    #Save figure
+    exportFigure(fig, outputFile, dpi = dpi, previewDpi = previewDpi,
+                 vectorFormats = vectorFormats,
+                 rasteriseArtists = [statBlocks, hpBars])
+    plt.close(fig)
+
+    return outputFile
+
+# %%% Render posters
+
+if __name__ == '__main__':
+
+    #Set the command line options
+    parser = argparse.ArgumentParser(description = 'Render Pokemon stats posters.')
+    parser.add_argument('datasets', nargs = '*',
+                        help = 'datasets to render (e.g. gen1 national), matching '
+                        'data/pokemonStats_{dataset}.csv (default = all datasets)')
+    parser.add_argument('--dpi', type = int, default = 600,
+                        help = 'resolution to save the posters at')
+    parser.add_argument('--sprite-atlas', action = 'store_true',
+                        help = 'draw the sprites as a single atlas image')
+    parser.add_argument('--preview-dpi', type = int, default = None,
+                        help = 'resolution of a preview saved before each poster')
+    parser.add_argument('--vector', nargs = '+', default = [], choices = ['svg', 'pdf'],
+                        help = 'vector formats to also save each poster as')
+    args = parser.parse_args()
+
+    #Get the datasets to render
+    dataFiles = getDatasetFiles(args.datasets)
+
+    #Render in the background without opening figures
+    matplotlib.use('Agg')
+
+    #Register the fonts once for all posters
+    setupPlotting()
+
+    #Render each poster
+    for datasetName, dataFile in dataFiles.items():
+        startTime = time.perf_counter()
+        title, description = posterTitle(datasetName)
+        pokemonData = loadPokemonData(dataFile)
+        outputFile = renderPoster(pokemonData, f'pokemon_stats_{datasetName}.png',
+                                  title, description, dpi = args.dpi,
+                                  spriteAtlas = args.sprite_atlas,
+                                  previewDpi = args.preview_dpi,
+                                  vectorFormats = args.vector)
+        print(f'Rendered {outputFile} ({len(pokemonData)} Pokemon) in {time.perf_counter() - startTime:.1f}s.')
+
+# %%% ----- End of pokemon_poster.py -----
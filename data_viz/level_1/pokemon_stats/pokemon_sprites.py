@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Helper functions for removing the white background from the Pokemon
+    sprites. Each source sprite is fingerprinted (modified time, size and
+    hash) along with the background removal parameters, and only sprites that
+    have changed since the last run are processed again. The sprites can also
+    be packed into a single atlas image for the poster, with the scaling for
+    each size tier done up front.
+
+"""
+
+# %%% Import packages
+
+import os
+import sys
+import json
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
+import cv2
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from file_hash import fileHash
+
+# %%% Define functions
+
+#Function to crop the whitespace from the sprite images
+#See: https://stackoverflow.com/questions/63001988/how-to-remove-background-of-images-in-python
+
+def cropWhiteSpace(imgFile, outFile, threshold = 250, stretchGain = 2):
+    """
+    imgFile: sprite image to remove the background from
+    outFile: output image file (with alpha channel)
+    threshold: grey level above which pixels are treated as background (default = 250)
+    stretchGain: gain of the linear stretch applied to the mask (default = 2)
+
+    """
+
+    # load image
+    img = cv2.imread(imgFile)
+
+    # convert to graky
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+    # threshold input image as mask
+    mask = cv2.threshold(gray, threshold, 255, cv2.THRESH_BINARY)[1]
+
+    # negate mask
+    mask = 255 - mask
+
+    # linear stretch so that 127.5 goes to 0, but 255 stays 255 (with the default gain)
+    mask = (stretchGain*(mask.astype(np.float32))-(stretchGain-1)*255.0).clip(0,255).astype(np.uint8)
+
+    # put mask into alpha channel
+    result = img.copy()
+    result = cv2.cvtColor(result, cv2.COLOR_BGR2BGRA)
+    result[:, :, 3] = mask
+
+    # save resulting masked image
+    cv2.imwrite(outFile, result)
+
+#Function to process a single sprite and return its new fingerprint
+def _removeBackground(imgFile, outFile, threshold, stretchGain):
+
+    #Remove the background
+    cropWhiteSpace(imgFile, outFile, threshold, stretchGain)
+
+    #Fingerprint the source image
+    fileStat = os.stat(imgFile)
+    return {'mtime': fileStat.st_mtime, 'size': fileStat.st_size,
+            'sha256': fileHash(imgFile)}
+
+#Function to remove the background from all sprites that have changed
+def removeBackgrounds(idNos, spriteDir = 'img\\sprites', threshold = 250,
+                      stretchGain = 2, poolType = 'process', maxWorkers = None):
+    """
+    idNos: list of pokemon idNo's to process
+    spriteDir: directory with the '{idNo}.png' sprites (default = 'img\\sprites')
+    threshold: grey level above which pixels are treated as background (default = 250)
+    stretchGain: gain of the linear stretch applied to the mask (default = 2)
+    poolType: 'process' or 'thread' pool to process the sprites with (default = 'process')
+    maxWorkers: number of workers in the pool (default = pool default)
+
+    A sprite is skipped when its '{idNo}_bgRemoved.png' output exists and the
+    source sprite and parameters match the manifest from the last run. The
+    source is treated as unchanged if its modified time and size match, or
+    failing that if its hash matches. The masking is CPU bound numpy work as
+    well as opencv calls, so the process pool is the default. It can only be
+    used when the calling script is guarded by "if __name__ == '__main__'", as
+    the workers import the main script on Windows, so use the thread pool
+    otherwise (e.g. from an interactive session).
+
+    Returns the list of idNo's that were processed.
+
+    """
+
+    #Load the manifest from the last run
+    manifestFile = os.path.join(spriteDir, 'bgRemoved_manifest.json')
+    if os.path.exists(manifestFile):
+        with open(manifestFile, 'r') as inFile:
+            manifest = json.load(inFile)
+    else:
+        manifest = {}
+
+    #Set the parameters that form part of the cache key
+    params = {'threshold': threshold, 'stretchGain': stretchGain}
+
+    #Check which sprites need processing
+    toProcess = []
+    for idNo in idNos:
+        imgFile = os.path.join(spriteDir, f'{idNo}.png')
+        outFile = os.path.join(spriteDir, f'{idNo}_bgRemoved.png')
+        cacheEntry = manifest.get(str(idNo))
+        #Process if there is no output or the parameters have changed
+        if cacheEntry is None or not os.path.exists(outFile) or cacheEntry['params'] != params:
+            toProcess.append(idNo)
+            continue
+        #Process if the source has changed (checking the hash if the modified time/size differ)
+        fileStat = os.stat(imgFile)
+        if fileStat.st_mtime == cacheEntry['mtime'] and fileStat.st_size == cacheEntry['size']:
+            continue
+        if fileHash(imgFile) != cacheEntry['sha256']:
+            toProcess.append(idNo)
+        else:
+            #Update the modified time so the hash isn't needed next time
+            cacheEntry['mtime'] = fileStat.st_mtime
+            cacheEntry['size'] = fileStat.st_size
+
+    #Process the sprites in the pool
+    if len(toProcess) > 0:
+        poolExecutor = ProcessPoolExecutor if poolType == 'process' else ThreadPoolExecutor
+        with poolExecutor(max_workers = maxWorkers) as executor:
+            fingerprints = list(executor.map(_removeBackground,
+                                             [os.path.join(spriteDir, f'{idNo}.png') for idNo in toProcess],
+                                             [os.path.join(spriteDir, f'{idNo}_bgRemoved.png') for idNo in toProcess],
+                                             [threshold] * len(toProcess),
+                                             [stretchGain] * len(toProcess)))
+        for idNo, fingerprint in zip(toProcess, fingerprints):
+            manifest[str(idNo)] = dict(fingerprint, params = params)
+
+    #Save the manifest to a temporary file first so an interrupted save doesn't corrupt it
+    with tempfile.NamedTemporaryFile('w', dir = spriteDir, suffix = '.tmp', delete = False) as outFile:
+        json.dump(manifest, outFile, indent = 2, sort_keys = True)
+    os.replace(outFile.name, manifestFile)
+
+    #Display summary
+    print(f'Removed background from {len(toProcess)} sprites ({len(idNos) - len(toProcess)} unchanged).')
+
+    return toProcess
+
+#Function to scale a sprite with nearest neighbour sampling
+def scaleSprite(spriteImg, scale):
+    """
+    spriteImg: (height, width, 4) RGBA sprite array
+    scale: scale factor to apply to the sprite
+
+    Returns the scaled sprite, keeping the hard pixel edges of the sprite.
+
+    """
+
+    #Get the source row and column for each pixel of the scaled sprite
+    height, width = spriteImg.shape[0:2]
+    newHeight = max(int(round(height * scale)), 1)
+    newWidth = max(int(round(width * scale)), 1)
+    rows = np.minimum((np.arange(newHeight) + 0.5) / scale, height - 1).astype(int)
+    cols = np.minimum((np.arange(newWidth) + 0.5) / scale, width - 1).astype(int)
+
+    return spriteImg[rows[:, None], cols[None, :]]
+
+#Function to pack the sprites into a single atlas image
+def composeSpriteAtlas(spriteImgs, scales, centres, canvasSize):
+    """
+    spriteImgs: list of (height, width, 4) uint8 RGBA sprite arrays
+    scales: scale factor for each sprite
+    centres: (x, y) pixel position of the centre of each sprite on the canvas
+        (with y measured down from the top)
+    canvasSize: (width, height) of the atlas in pixels
+
+    Returns a (height, width, 4) uint8 RGBA atlas with transparent background.
+    Sprites are clipped at the canvas edges, and only their non-transparent
+    pixels are drawn so neighbouring sprites don't cover each other.
+
+    """
+
+    #Create the transparent canvas
+    canvasWidth, canvasHeight = canvasSize
+    atlas = np.zeros((canvasHeight, canvasWidth, 4), dtype = np.uint8)
+
+    #Place each sprite
+    for spriteImg, scale, (centreX, centreY) in zip(spriteImgs, scales, centres):
+
+        #Scale the sprite and get its corner on the canvas
+        scaledImg = scaleSprite(spriteImg, scale)
+        height, width = scaledImg.shape[0:2]
+        top = int(round(centreY - height / 2))
+        left = int(round(centreX - width / 2))
+
+        #Clip the sprite to the canvas
+        cropTop, cropLeft = max(-top, 0), max(-left, 0)
+        bottom, right = min(top + height, canvasHeight), min(left + width, canvasWidth)
+        if bottom <= top + cropTop or right <= left + cropLeft:
+            continue
+        scaledImg = scaledImg[cropTop:bottom - top, cropLeft:right - left]
+
+        #Draw the non-transparent pixels
+        canvasRegion = atlas[top + cropTop:bottom, left + cropLeft:right]
+        drawMask = scaledImg[:, :, 3] > 0
+        canvasRegion[drawMask] = scaledImg[drawMask]
+
+    return atlas
+
+#Function to get the area of an atlas covered by sprites
+def atlasBounds(atlas):
+    """
+    atlas: (height, width, 4) RGBA atlas from composeSpriteAtlas
+
+    Returns the (rowStart, rowEnd, colStart, colEnd) of the non-transparent
+    pixels, or None if the atlas is empty (e.g. there were no sprites).
+
+    """
+
+    #Get the rows and columns with any non-transparent pixels
+    spriteRows = np.flatnonzero(atlas[:, :, 3].any(axis = 1))
+    spriteCols = np.flatnonzero(atlas[:, :, 3].any(axis = 0))
+    if len(spriteRows) == 0:
+        return None
+
+    return spriteRows[0], spriteRows[-1] + 1, spriteCols[0], spriteCols[-1] + 1
+
+# %%% ----- End of pokemon_sprites.py -----
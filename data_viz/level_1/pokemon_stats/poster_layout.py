@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Layout engine for the Pokemon stats posters. The grid of sprite and stats
+    axes, the figure height and the header positions are calculated from the
+    size tier of each Pokemon, so the same layout works for any generation or
+    the whole national dex. The defaults reproduce the original Generation I
+    poster (18 x 24 grid on an 11 x 16 inch figure).
+
+"""
+
+# %%% Import packages
+
+import numpy as np
+
+# %%% Define functions
+
+#Function to calculate the poster layout
+def posterLayout(tier, tierCellSize = (4, 2, 1), gridCols = 24, figWidth = 11,
+                 rowHeight = 11.2 / 18, headerHeight = 4, footerHeight = 0.8):
+    """
+    tier: (nPokemon,) array of the size tier of each pokemon in plotting order
+    tierCellSize: number of grid rows/columns each of the sprite and stats axes
+        takes up for each tier (default = (4, 2, 1))
+    gridCols: number of columns in the grid (default = 24)
+    figWidth: width of the figure in inches (default = 11)
+    rowHeight: height of each grid row in inches (default = 11.2 / 18)
+    headerHeight: height of the header above the grid in inches (default = 4)
+    footerHeight: height of the footer below the grid in inches (default = 0.8)
+
+    Returns a dictionary with the figure size, grid shape and bounds (in
+    figure coordinates), the (row, col, rowspan, colspan) of the sprite and
+    stats axes for each pokemon and the y-levels (in figure coordinates) of
+    the header elements. Each tier starts on a new row, and each pokemon
+    takes up a sprite and a stats axes side by side.
+
+    """
+
+    #Work through the tiers and allocate grid cells to each pokemon
+    spriteSpecs = [None] * len(tier)
+    statsSpecs = [None] * len(tier)
+    startRow = 0
+    for tierNo, cellSize in enumerate(tierCellSize):
+
+        #Get the pokemon in the tier
+        tierInds = np.flatnonzero(tier == tierNo)
+        if len(tierInds) == 0:
+            continue
+
+        #Get the number of pokemon per row and allocate the cells
+        rowPokemon = gridCols // (2 * cellSize)
+        for tierPos, ind in enumerate(tierInds):
+            row = startRow + (tierPos // rowPokemon) * cellSize
+            col = (tierPos % rowPokemon) * 2 * cellSize
+            spriteSpecs[ind] = (row, col, cellSize, cellSize)
+            statsSpecs[ind] = (row, col + cellSize, cellSize, cellSize)
+
+        #Move the next tier below this one
+        startRow += int(np.ceil(len(tierInds) / rowPokemon)) * cellSize
+
+    #Set the figure height from the number of rows
+    gridRows = startRow
+    figHeight = headerHeight + gridRows * rowHeight + footerHeight
+
+    #Function to convert inches from the top of the figure to figure coordinates
+    def fromTop(inches):
+        return 1 - inches / figHeight
+
+    return {'figSize': (figWidth, figHeight),
+            'gridShape': (gridRows, gridCols),
+            'gridBounds': {'left': 0.05, 'right': 0.95,
+                           'bottom': footerHeight / figHeight,
+                           'top': fromTop(headerHeight)},
+            'spriteSpecs': spriteSpecs,
+            'statsSpecs': statsSpecs,
+            'headerY': {'logo': fromTop(1.2),
+                        'title': fromTop(2.56),
+                        'description': fromTop(3.2),
+                        'blockNote': fromTop(3.52),
+                        'legend': fromTop(3.84)},
+            'legendPatchSize': (0.11 / figWidth, 0.16 / figHeight)}
+
+#Function to place the legend items centred on the figure
+def legendPositions(labelWidths, patchWidth, gap = 0.005, spacing = 0.025):
+    """
+    labelWidths: list of the widths of each label in figure coordinates
+    patchWidth: width of the legend patches in figure coordinates
+    gap: space between each patch and its label (default = 0.005)
+    spacing: space between each legend item (default = 0.025)
+
+    Returns the x-positions (figure coordinates) of the left edge of each
+    patch and label, with the legend as a whole centred on the figure.
+
+    """
+
+    #Get the width of each item and the legend as a whole
+    itemWidths = patchWidth + gap + np.array(labelWidths)
+    legendWidth = itemWidths.sum() + spacing * (len(itemWidths) - 1)
+
+    #Place the items left to right from the centred start
+    patchX = 0.5 - legendWidth / 2 + np.concatenate(([0], np.cumsum(itemWidths[:-1] + spacing)))
+    labelX = patchX + patchWidth + gap
+
+    return patchX, labelX
+
+# %%% ----- End of poster_layout.py -----
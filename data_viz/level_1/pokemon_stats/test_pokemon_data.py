@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Tests for the Pokemon data helper functions.
+
+"""
+
+# %% Import packages
+
+import os
+import numpy as np
+import pytest
+from pokemon_data import loadPokemonData, buildPokemonRecords
+
+# %% Test data
+
+#Load the generation 1 data
+@pytest.fixture(scope = 'module')
+def pokemonData():
+    return loadPokemonData(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                        'data', 'pokemonStats_gen1.csv'))
+
+# %% Tests
+
+def test_starter_order(pokemonData):
+
+    #The starters come first followed by their evolutions, then the rest in order
+    assert list(pokemonData['name'][0:10]) == ['Bulbasaur', 'Charmander', 'Squirtle',
+                                               'Ivysaur', 'Venusaur', 'Charmeleon',
+                                               'Charizard', 'Wartortle', 'Blastoise',
+                                               'Caterpie']
+    assert list(pokemonData['plotOrder']) == list(range(1, len(pokemonData)+1))
+
+def test_records_match_dataframe(pokemonData):
+
+    #Each record matches searching the dataframe for that pokemon
+    records = buildPokemonRecords(pokemonData)
+    assert records['statList'] == ['attack', 'defense', 'speed', 'special']
+    for pokemonName in ['Bulbasaur', 'Charizard', 'Mewtwo']:
+        ind = records['nameIndex'][pokemonName]
+        pokemonRow = pokemonData.loc[pokemonData['name'] == pokemonName].iloc[0]
+        assert records['idNoIndex'][int(pokemonRow['idNo'])] == ind
+        assert records['hpNorm'][ind] == pokemonRow['hp'] / pokemonData['hp'].max()
+        for statInd, statName in enumerate(records['statList']):
+            assert records['stat10'][ind, statInd] == np.floor(pokemonRow[statName] / 10)
+            assert np.isclose(records['statRem'][ind, statInd], pokemonRow[statName] % 10 / 10)
+
+def test_records_tiers(pokemonData):
+
+    #The starters, their evolutions and the rest are set to their size tiers
+    records = buildPokemonRecords(pokemonData)
+    assert records['tier'][0:10].tolist() == [0] * 3 + [1] * 6 + [2]
+    assert records['zoomFac'][[0, 3, 9]].tolist() == [2, 1, 0.4]
+    assert records['lineWidth'][9] == 1/3
+
+# %%% ----- End of test_pokemon_data.py -----
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Tests for the Pokemon poster geometry.
+
+"""
+
+# %% Import packages
+
+import os
+import numpy as np
+import pytest
+from pokemon_poster import statBlockGeometry, hpBarGeometry, getDatasetFiles
+
+# %% Tests
+
+def test_stat_blocks_per_stat():
+
+    #Each stat has a block for every 10 points plus the remainder block
+    stat10 = np.array([[2, 0], [1, 3]])
+    statRem = np.array([[0.5, 0.2], [0.0, 0.9]])
+    axPos = np.array([[0, 0, 1, 1], [1, 0, 1, 1]])
+    blockVerts, blockStatNo, blockPokemonInd = statBlockGeometry(stat10, statRem, axPos, [0.5, 0.25])
+    assert blockVerts.shape == (3 + 1 + 2 + 4, 4, 2)
+    assert blockPokemonInd.tolist() == [0] * 4 + [1] * 6
+    assert blockStatNo.tolist() == [0, 0, 0, 1, 0, 0, 1, 1, 1, 1]
+
+    #The remainder block is scaled by the remainder and blocks sit in their axes
+    blockWidths = blockVerts[:, 1, 0] - blockVerts[:, 0, 0]
+    assert np.allclose(blockWidths[[0, 2, 3]], [0.05, 0.025, 0.01])
+    assert np.all(blockVerts[blockPokemonInd == 1, :, 0] >= 1)
+
+def test_hp_bars_one_array():
+
+    #All the bars are built as one array of outlines
+    hpNorm = np.array([1.0, 0.5, 0.01])
+    axPos = np.array([[0.1, 0.1, 0.3, 0.2], [0.5, 0.1, 0.3, 0.2], [0.1, 0.5, 0.3, 0.2]])
+    barVerts = hpBarGeometry(hpNorm, axPos, nArc = 7)
+    assert barVerts.shape == (3, 14, 2)
+
+    #The bar spans from the axes start to the hp value (in data x units)
+    barLength = (barVerts[:, :, 0].max(axis = 1) - axPos[:, 0]) / axPos[:, 2] * 1.6
+    assert np.allclose(barLength[0:2], hpNorm[0:2])
+
+    #The bar is centred on its y-level with a height of twice the pad
+    barY = axPos[:, 1] + 0.9 * axPos[:, 3]
+    assert np.allclose(barVerts[:, :, 1].mean(axis = 1), barY)
+    assert np.allclose(np.ptp(barVerts[:, :, 1], axis = 1), 2 * 0.025 * axPos[:, 3])
+
+    #A bar shorter than its rounded ends isn't flipped
+    assert barVerts[2, :, 0].min() >= axPos[2, 0] - 1e-12
+
+def test_dataset_files(tmp_path, monkeypatch):
+
+    #The datasets are found next to the script no matter where it is run from
+    monkeypatch.chdir(tmp_path)
+    dataFiles = getDatasetFiles()
+    assert 'gen1' in dataFiles and os.path.exists(dataFiles['gen1'])
+
+    #Missing datasets, or a folder without any, raise an error
+    with pytest.raises(FileNotFoundError):
+        getDatasetFiles(['gen99'])
+    with pytest.raises(FileNotFoundError):
+        getDatasetFiles(dataDir = str(tmp_path))
+
+# %%% ----- End of test_pokemon_poster.py -----
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Tests for the Pokemon sprite helper functions.
+
+"""
+
+# %% Import packages
+
+import os
+import json
+import numpy as np
+import cv2
+from pokemon_sprites import removeBackgrounds, scaleSprite, composeSpriteAtlas, atlasBounds
+
+# %% Test sprites
+
+#Function to save a sprite with a white background
+def saveSprite(spriteDir, idNo, colour):
+    spriteImg = np.full((8, 8, 3), 255, dtype = np.uint8)
+    spriteImg[2:6, 2:6] = colour
+    cv2.imwrite(os.path.join(spriteDir, f'{idNo}.png'), spriteImg)
+
+# %% Tests for removeBackgrounds
+
+def test_remove_backgrounds_cache(tmp_path):
+
+    #Create the sprites
+    spriteDir = str(tmp_path)
+    for idNo in [1, 2, 3]:
+        saveSprite(spriteDir, idNo, (0, 0, 50 * idNo))
+
+    #The first run processes every sprite and makes the background transparent
+    assert removeBackgrounds([1, 2, 3], spriteDir = spriteDir) == [1, 2, 3]
+    outImg = cv2.imread(os.path.join(spriteDir, '1_bgRemoved.png'), cv2.IMREAD_UNCHANGED)
+    assert outImg[0, 0, 3] == 0 and outImg[3, 3, 3] == 255
+    with open(os.path.join(spriteDir, 'bgRemoved_manifest.json'), 'r') as inFile:
+        assert sorted(json.load(inFile)) == ['1', '2', '3']
+
+    #Unchanged sprites are skipped
+    assert removeBackgrounds([1, 2, 3], spriteDir = spriteDir) == []
+
+    #A touched sprite with the same contents is skipped by its hash
+    os.utime(os.path.join(spriteDir, '2.png'), (0, 0))
+    assert removeBackgrounds([1, 2, 3], spriteDir = spriteDir) == []
+
+    #A changed sprite or a missing output is processed again
+    saveSprite(spriteDir, 1, (0, 200, 0))
+    os.remove(os.path.join(spriteDir, '3_bgRemoved.png'))
+    assert removeBackgrounds([1, 2, 3], spriteDir = spriteDir) == [1, 3]
+
+    #Changing the parameters processes every sprite
+    assert removeBackgrounds([1, 2, 3], spriteDir = spriteDir, threshold = 240) == [1, 2, 3]
+
+def test_remove_backgrounds_pools(tmp_path):
+
+    #Create the same sprites for each pool type
+    for poolType in ['process', 'thread']:
+        os.makedirs(tmp_path / poolType)
+        for idNo in [1, 2]:
+            saveSprite(str(tmp_path / poolType), idNo, (0, 50 * idNo, 0))
+
+    #The process pool is the default and gives the same images as the thread pool
+    assert removeBackgrounds([1, 2], spriteDir = str(tmp_path / 'process')) == [1, 2]
+    assert removeBackgrounds([1, 2], spriteDir = str(tmp_path / 'thread'), poolType = 'thread') == [1, 2]
+    for idNo in [1, 2]:
+        assert np.array_equal(cv2.imread(str(tmp_path / 'process' / f'{idNo}_bgRemoved.png'), cv2.IMREAD_UNCHANGED),
+                              cv2.imread(str(tmp_path / 'thread' / f'{idNo}_bgRemoved.png'), cv2.IMREAD_UNCHANGED))
+
+    #The manifest is moved into place without leaving its temporary file
+    assert sorted(os.listdir(tmp_path / 'process')) == ['1.png', '1_bgRemoved.png', '2.png',
+                                                        '2_bgRemoved.png', 'bgRemoved_manifest.json']
+
+# %% Tests for the sprite atlas
+
+#Create a 2 x 2 sprite with a transparent corner
+spriteImg = np.array([[[255, 0, 0, 255], [0, 255, 0, 255]],
+                      [[0, 0, 255, 255], [0, 0, 0, 0]]], dtype = np.uint8)
+
+def test_scale_sprite_nearest():
+
+    #Each pixel is repeated with hard edges when scaled up
+    scaledImg = scaleSprite(spriteImg, 2)
+    assert scaledImg.shape == (4, 4, 4)
+    assert np.array_equal(scaledImg, spriteImg.repeat(2, axis = 0).repeat(2, axis = 1))
+
+    #Scaling down keeps at least one pixel
+    assert scaleSprite(spriteImg, 0.1).shape == (1, 1, 4)
+
+def test_compose_atlas_places_sprites():
+
+    #The sprite is centred on its position, with its transparent pixels left blank
+    atlas = composeSpriteAtlas([spriteImg], [1], [(3, 2)], (5, 4))
+    assert atlas.shape == (4, 5, 4)
+    assert np.array_equal(atlas[1:3, 2:4], spriteImg)
+    assert atlas[0:1].sum() == 0 and atlas[3:].sum() == 0
+
+    #A later sprite doesn't cover the one before with its transparent pixels
+    otherImg = np.zeros((2, 2, 4), dtype = np.uint8)
+    otherImg[0, 0] = [9, 9, 9, 255]
+    atlas = composeSpriteAtlas([spriteImg, otherImg], [1, 1], [(3, 2), (4, 3)], (5, 4))
+    assert atlas[2, 3].tolist() == [9, 9, 9, 255]
+    assert atlas[1, 3].tolist() == [0, 255, 0, 255]
+
+def test_compose_atlas_clips_edges():
+
+    #Sprites over the canvas edges are clipped and sprites off the canvas are skipped
+    atlas = composeSpriteAtlas([spriteImg] * 3, [2, 1, 1], [(1, 1), (5, 4), (-5, -5)], (5, 4))
+    assert np.array_equal(atlas[0:3, 0:3], spriteImg.repeat(2, axis = 0).repeat(2, axis = 1)[1:4, 1:4])
+    assert atlas[3, 4].tolist() == [255, 0, 0, 255]
+    assert np.count_nonzero(atlas[:, :, 3]) == 5 + 1
+
+def test_atlas_bounds():
+
+    #The bounds cover the drawn sprite pixels
+    atlas = composeSpriteAtlas([spriteImg], [1], [(3, 2)], (5, 4))
+    assert atlasBounds(atlas) == (1, 3, 2, 4)
+
+    #An atlas without any sprites is empty
+    emptyAtlas = composeSpriteAtlas([], [], np.zeros((0, 2)), (5, 4))
+    assert emptyAtlas.shape == (4, 5, 4) and emptyAtlas.sum() == 0
+    assert atlasBounds(emptyAtlas) is None
+
+# %%% ----- End of test_pokemon_sprites.py -----
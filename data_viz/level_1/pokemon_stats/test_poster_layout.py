@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Tests for the Pokemon poster layout engine.
+
+"""
+
+# %% Import packages
+
+import numpy as np
+from poster_layout import posterLayout, legendPositions
+
+# %% Tests for posterLayout
+
+def test_layout_generation_1():
+
+    #The defaults reproduce the original Generation I poster
+    tier = np.array([0] * 3 + [1] * 6 + [2] * 142)
+    layout = posterLayout(tier)
+    assert layout['gridShape'] == (18, 24)
+    assert np.allclose(layout['figSize'], (11, 16))
+
+    #Each tier starts on a new row with the sprite and stats axes side by side
+    assert layout['spriteSpecs'][0:4] == [(0, 0, 4, 4), (0, 8, 4, 4), (0, 16, 4, 4), (4, 0, 2, 2)]
+    assert layout['statsSpecs'][2] == (0, 20, 4, 4)
+    assert layout['spriteSpecs'][9] == (6, 0, 1, 1)
+    assert layout['spriteSpecs'][-1] == (17, 18, 1, 1)
+
+def test_layout_grows_with_rows():
+
+    #More pokemon add rows to the figure without changing the header and footer sizes
+    smallLayout = posterLayout(np.array([0] * 3 + [2] * 12))
+    largeLayout = posterLayout(np.array([0] * 3 + [2] * 24))
+    assert largeLayout['gridShape'][0] == smallLayout['gridShape'][0] + 1
+    assert np.isclose(largeLayout['figSize'][1] - smallLayout['figSize'][1], 11.2 / 18)
+    for layout in [smallLayout, largeLayout]:
+        figHeight = layout['figSize'][1]
+        assert np.isclose(layout['gridBounds']['top'], 1 - 4 / figHeight)
+        assert np.isclose(layout['gridBounds']['bottom'], 0.8 / figHeight)
+
+# %% Tests for legendPositions
+
+def test_legend_centred():
+
+    #The legend items are placed in order and centred on the figure
+    patchX, labelX = legendPositions([0.1, 0.05, 0.2], 0.01, gap = 0.005, spacing = 0.025)
+    assert np.allclose(labelX - patchX, 0.015)
+    assert np.allclose(np.diff(patchX), [0.01 + 0.005 + 0.1 + 0.025, 0.01 + 0.005 + 0.05 + 0.025])
+    assert np.isclose(patchX[0] + (labelX[-1] + 0.2), 1)
+
+# %%% ----- End of test_poster_layout.py -----
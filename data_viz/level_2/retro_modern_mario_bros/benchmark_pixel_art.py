@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Benchmarks for the stages of the pixel art pipeline in pixel_art.py. Each
+    stage (resizing, pixel counting, enemy/item allocation, composing the
+    mosaic, and drawing and saving the figure) is run on synthetic character
+    images across a sweep of image sizes and resize factors, reporting the
+    wall time and peak memory of each (traced in a separate run from the
+    timing). The export stage draws the full matplotlib figure and saves it
+    with exportFigure, as in superPixelBros.
+    Results can be saved as a baseline and later runs compared against it to
+    catch slowdowns before re-rendering the posters.
+
+    Usage:
+        python benchmark_pixel_art.py --save-baseline
+        python benchmark_pixel_art.py --compare
+
+"""
+
+# %% Import packages
+
+import os
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+from PIL import Image
+import matplotlib.pyplot as plt
+import numpy as np
+from pixel_art import (SpriteAtlas, allocateSprites, composeMosaic,
+                       imagePixelData, plotPixelArt, resizePixels)
+from figure_export import exportFigure
+
+# %% Define functions
+
+#Function to create a synthetic character image
+def createCharacterImage(imageSize, randomSeed = 0):
+    """
+    imageSize: (width, height) of the image in pixels
+    randomSeed: seed for the random colours (default = 0)
+
+    Returns an RGBA image with a filled ellipse of blocky random colours on a
+    transparent background, roughly matching the coverage of the characters.
+
+    """
+
+    #Set the image dimensions
+    imgWidth, imgHeight = imageSize
+
+    #Create blocks of random colours
+    rng = np.random.default_rng(randomSeed)
+    blockColours = rng.integers(0, 256, size = (imgHeight // 8 + 1, imgWidth // 8 + 1, 3),
+                                dtype = np.uint8)
+    imgRGBA = np.zeros((imgHeight, imgWidth, 4), dtype = np.uint8)
+    imgRGBA[:, :, 0:3] = blockColours.repeat(8, axis = 0).repeat(8, axis = 1)[0:imgHeight, 0:imgWidth]
+
+    #Set the ellipse as the opaque part of the image
+    yy, xx = np.mgrid[0:imgHeight, 0:imgWidth]
+    inEllipse = ((xx - imgWidth / 2) / (imgWidth * 0.45)) ** 2 + \
+        ((yy - imgHeight / 2) / (imgHeight * 0.45)) ** 2 <= 1
+    imgRGBA[inEllipse, 3] = 255
+
+    return Image.fromarray(imgRGBA, 'RGBA')
+
+#Function to create synthetic black and white sprites
+def createSprites(imgDir, nSprites = 22, randomSeed = 0):
+
+    #Create the sprite directory and images
+    os.makedirs(imgDir, exist_ok = True)
+    rng = np.random.default_rng(randomSeed)
+    spriteNames = [f'sprite{spriteInd}' for spriteInd in range(nSprites)]
+    for spriteName in spriteNames:
+        spriteArr = rng.integers(0, 256, size = (16, 16), dtype = np.uint8)
+        Image.fromarray(spriteArr, 'L').save(os.path.join(imgDir, f'{spriteName}_BW.png'))
+
+    return spriteNames
+
+#Function to draw and save the pixel art figure
+def exportPixelArt(mosaic, imageSize, outputFile, dpi):
+
+    #Draw the figure and save it the same way as superPixelBros
+    fig = plotPixelArt(mosaic, imageSize, 'benchmark')
+    try:
+        exportFigure(fig, outputFile, dpi = dpi, verbose = False)
+    finally:
+        plt.close(fig)
+
+#Function to time a stage and record its peak memory
+def measureStage(stageFunction, repeats = 3):
+    """
+    stageFunction: function with no arguments that runs the stage
+    repeats: number of times to time the stage (default = 3)
+
+    Returns the minimum wall time (s), the peak traced memory (MB) and the
+    output of the last run. The memory is traced in a separate run after the
+    timed runs, as tracemalloc slows down the code it traces.
+
+    """
+
+    #Run the stage and keep the fastest time
+    times = []
+    for repeatInd in range(repeats):
+        startTime = time.perf_counter()
+        stageOutput = stageFunction()
+        times.append(time.perf_counter() - startTime)
+
+    #Run the stage again to trace its peak memory
+    tracemalloc.start()
+    try:
+        stageFunction()
+        peakMemory = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+    finally:
+        tracemalloc.stop()
+
+    return min(times), peakMemory, stageOutput
+
+#Function to run the benchmarks
+def runBenchmarks(imageSizes, resizeFactors, tileSize = 10, repeats = 3, dpi = 300):
+    """
+    imageSizes: list of square source image sizes (in pixels) to test
+    resizeFactors: list of resize factors to apply to the source images
+    tileSize: sprite tile size used for rendering (default = 10)
+    repeats: number of times to run each stage (default = 3)
+    dpi: resolution the figure is saved at in the export stage (default = 300)
+
+    Returns a dictionary of results keyed by 'stage|size|factor', each with
+    the time (s) and peak memory (MB).
+
+    """
+
+    #Set a dictionary to store results in
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        #Create the sprites and atlas
+        imgDir = os.path.join(tempDir, 'img')
+        spriteNames = createSprites(imgDir)
+        proportions = np.ones(len(spriteNames)) / len(spriteNames)
+
+        #Loop through the image sizes and resize factors
+        for imageSize in imageSizes:
+
+            #Create the source image
+            sourceFile = os.path.join(tempDir, f'character_{imageSize}.png')
+            createCharacterImage((imageSize, imageSize)).save(sourceFile)
+
+            for resizeFactor in resizeFactors:
+
+                #Set the key and output file for this run
+                runKey = f'{imageSize}|{resizeFactor:.3f}'
+                resizedFile = os.path.join(tempDir, f'character_{imageSize}_resized.png')
+
+                #Resize the image
+                resizeTime, resizeMemory, _ = measureStage(
+                    lambda: resizePixels(sourceFile, resizeFactor, resizedFile), repeats)
+                resizedImg = Image.open(resizedFile).convert('RGBA')
+
+                #Count the pixels
+                countTime, countMemory, pixelData = measureStage(
+                    lambda: imagePixelData(resizedImg), repeats)
+
+                #Allocate the sprites
+                allocateTime, allocateMemory, itemCodes = measureStage(
+                    lambda: allocateSprites(proportions, pixelData.dataPixelCount, 12345), repeats)
+
+                #Compose the mosaic with a fresh atlas each run so the tint cache starts empty
+                composeTime, composeMemory, mosaic = measureStage(
+                    lambda: composeMosaic(pixelData.xy, pixelData.rgba, itemCodes,
+                                          resizedImg.size,
+                                          SpriteAtlas(spriteNames, imgDir = imgDir,
+                                                      tileSize = tileSize)),
+                    repeats)
+
+                #Draw and save the figure
+                exportTime, exportMemory, _ = measureStage(
+                    lambda: exportPixelArt(mosaic, resizedImg.size,
+                                           os.path.join(tempDir, 'pixelArt.png'), dpi),
+                    repeats)
+
+                #Store the results
+                for stage, stageTime, stageMemory in zip(
+                        ['resize', 'count', 'allocate', 'compose', 'export'],
+                        [resizeTime, countTime, allocateTime, composeTime, exportTime],
+                        [resizeMemory, countMemory, allocateMemory, composeMemory, exportMemory]):
+                    results[f'{stage}|{runKey}'] = {'time': stageTime, 'memory': stageMemory}
+
+    return results
+
+#Function to compare results against a baseline
+def compareResults(results, baseline, tolerance = 1.25, minTime = 0.01):
+    """
+    results: dictionary of results from runBenchmarks
+    baseline: dictionary of baseline results from runBenchmarks
+    tolerance: ratio to the baseline above which a result is a regression (default = 1.25)
+    minTime: times below this (s) aren't compared as they are too noisy (default = 0.01)
+
+    Returns a list of regression messages (empty if there are none).
+
+    """
+
+    #Check each result against the baseline
+    regressions = []
+    for runKey, result in results.items():
+        if runKey not in baseline:
+            continue
+        baseResult = baseline[runKey]
+        if result['time'] > minTime and result['time'] > baseResult['time'] * tolerance:
+            regressions.append(f'{runKey}: time {result["time"]:.4f}s vs baseline {baseResult["time"]:.4f}s')
+        if result['memory'] > baseResult['memory'] * tolerance + 1:
+            regressions.append(f'{runKey}: memory {result["memory"]:.1f}MB vs baseline {baseResult["memory"]:.1f}MB')
+
+    return regressions
+
+#Function to print the results as a table
+def printResults(results):
+
+    print(f'{"stage":<10}{"size":>8}{"factor":>8}{"time (s)":>12}{"peak (MB)":>12}')
+    for runKey, result in results.items():
+        stage, imageSize, resizeFactor = runKey.split('|')
+        print(f'{stage:<10}{imageSize:>8}{resizeFactor:>8}{result["time"]:>12.4f}{result["memory"]:>12.1f}')
+
+# %% Run benchmarks
+
+if __name__ == '__main__':
+
+    #Set the command line options
+    parser = argparse.ArgumentParser(description = 'Benchmark the pixel art pipeline.')
+    parser.add_argument('--sizes', type = int, nargs = '+', default = [300, 600, 900],
+                        help = 'square source image sizes to test')
+    parser.add_argument('--factors', type = float, nargs = '+', default = [1/3, 0.5, 1],
+                        help = 'resize factors to test')
+    parser.add_argument('--tile-size', type = int, default = 10,
+                        help = 'sprite tile size for rendering')
+    parser.add_argument('--repeats', type = int, default = 3,
+                        help = 'number of runs of each stage')
+    parser.add_argument('--dpi', type = int, default = 300,
+                        help = 'resolution the figure is saved at')
+    parser.add_argument('--baseline', default = 'benchmark_baseline.json',
+                        help = 'baseline results file')
+    parser.add_argument('--save-baseline', action = 'store_true',
+                        help = 'save the results as the new baseline')
+    parser.add_argument('--compare', action = 'store_true',
+                        help = 'compare the results to the baseline')
+    parser.add_argument('--tolerance', type = float, default = 1.25,
+                        help = 'ratio to the baseline that counts as a regression')
+    args = parser.parse_args()
+
+    #Use the non-interactive backend, as in the batch renderer
+    plt.switch_backend('Agg')
+
+    #Run the benchmarks
+    benchResults = runBenchmarks(args.sizes, args.factors, args.tile_size, args.repeats, args.dpi)
+    printResults(benchResults)
+
+    #Save the baseline
+    if args.save_baseline:
+        with open(args.baseline, 'w') as outFile:
+            json.dump(benchResults, outFile, indent = 2)
+        print(f'Saved baseline to {args.baseline}.')
+
+    #Compare to the baseline
+    if args.compare:
+        with open(args.baseline, 'r') as inFile:
+            baselineResults = json.load(inFile)
+        regressionList = compareResults(benchResults, baselineResults, args.tolerance)
+        if len(regressionList) > 0:
+            print('Regressions found:')
+            for regression in regressionList:
+                print(f'    {regression}')
+            raise SystemExit(1)
+        print('No regressions found.')
+
+# %%% ----- End of benchmark_pixel_art.py -----
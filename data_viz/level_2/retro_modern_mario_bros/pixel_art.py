@@ -0,0 +1,634 @@
+# -*- coding: utf-8 -*-
+"""
+
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Helper functions for building the Super Mario Bros 'pixel art' mosaics.
+    Rather than plotting every sprite as its own matplotlib image, the
+    sprites are tinted and placed into a single RGBA array which can then be
+    shown with one call to imshow. The sprites are held in a SpriteAtlas so
+    they are only read from disk once. Multiple characters can be rendered
+    in parallel with renderBatch, and poster sized versions can be created
+    in blocks with renderTiledMosaic.
+
+"""
+
+# %% Import packages
+
+import os
+import sys
+import time
+import traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from PIL import Image
+import matplotlib.pyplot as plt
+import numpy as np
+from collections import OrderedDict, namedtuple
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from font_registry import registerFonts
+from figure_export import exportFigure, writePngRows
+
+# %% Define functions
+
+#Set the folders next to this file so images and fonts are found no matter
+#where the script is run from
+moduleDir = os.path.dirname(os.path.abspath(__file__))
+imgDir = os.path.join(moduleDir, 'img')
+fontDir = [os.path.join(moduleDir, 'fonts')]
+
+#Set the structure for the pixel data extracted from an image
+PixelData = namedtuple('PixelData', ['xy', 'rgba', 'totalPixelCount',
+                                     'blankPixelCount', 'dataPixelCount'])
+
+#Function to load a black and white sprite as a square tile
+def loadSpriteTile(spritePath, tileSize):
+    """
+    spritePath: path to black and white sprite image
+    tileSize: size (in pixels) of the square tile to create
+
+    Returns a uint8 array of shape (tileSize, tileSize) stretched between 0-255.
+    Sprites are stretched to fill the tile, as they were when plotted with
+    a 1 x 1 extent in the original version.
+
+    """
+
+    #Load the image and resize to the tile
+    spriteImg = Image.open(spritePath).convert('L')
+    spriteImg = spriteImg.resize((tileSize, tileSize), Image.NEAREST)
+
+    #Convert to array
+    tile = np.asarray(spriteImg, dtype = np.float32)
+
+    #Scale between 0-255 in the same way imshow normalises to a colourmap
+    tileRange = tile.max() - tile.min()
+    if tileRange > 0:
+        tile = (tile - tile.min()) / tileRange * 255
+    else:
+        tile = np.zeros_like(tile)
+
+    return np.round(tile).astype(np.uint8)
+
+#Function to tint a stack of tiles by colours
+def tintTiles(tiles, rgbVals):
+    """
+    tiles: (n, tileSize, tileSize) uint8 array of sprite tiles
+    rgbVals: (n, 3) array of RGB values (0-255) to tint each tile with
+
+    Returns an (n, tileSize, tileSize, 3) uint8 array. Each tile runs from
+    the pixel colour (at black) through to white, matching the colourmaps
+    that were previously created for each pixel.
+
+    """
+
+    #Convert colours to the 0-1 colourmap start points
+    startVals = np.asarray(rgbVals, dtype = np.float32)[:, None, None, :] / 256
+
+    #Linearly interpolate between the start colour and white
+    tinted = startVals + (1 - startVals) * (tiles[..., None] / np.float32(255))
+
+    return np.round(tinted * 255).astype(np.uint8)
+
+#Class to hold the sprite tiles and a cache of tinted versions
+class SpriteAtlas:
+    """
+    spriteNames: list of sprite names to load (e.g. imgLinks['Name'])
+    imgDir: directory containing the black and white sprite images
+        (default = the img folder next to this file)
+    tileSize: size in pixels of each sprite tile (default = 10)
+    cacheSize: maximum number of tinted tiles to keep (default = 32768)
+    quantStep: step size RGB values are rounded down to when tinting (default = 4)
+
+    Each sprite is loaded once into a packed (nSprites, tileSize, tileSize)
+    uint8 array. Tinted tiles are kept in a least recently used cache keyed
+    on the sprite and the quantised colour, so that colours repeated across
+    an image (or across characters) are only tinted once.
+
+    """
+
+    def __init__(self, spriteNames, imgDir = imgDir, tileSize = 10,
+                 cacheSize = 32768, quantStep = 4):
+
+        #Store settings
+        self.names = list(spriteNames)
+        self.tileSize = tileSize
+        self.cacheSize = cacheSize
+        self.quantStep = quantStep
+
+        #Map names to their index in the atlas
+        self.index = {spriteName: spriteInd for spriteInd, spriteName in enumerate(self.names)}
+
+        #Load the sprites into the packed array
+        self.tiles = np.stack([loadSpriteTile(os.path.join(imgDir, f'{spriteName}_BW.png'), tileSize)
+                               for spriteName in self.names])
+
+        #Set the tinted tile cache
+        self.cache = OrderedDict()
+
+    #Function to convert sprite names to atlas indices
+    def spriteIndices(self, spriteNames):
+        return np.array([self.index[spriteName] for spriteName in spriteNames], dtype = np.intp)
+
+    #Function to get tinted tiles for a set of sprites and colours
+    def tintedTiles(self, spriteInds, rgbVals):
+        """
+        spriteInds: (n,) array of sprite indices in the atlas
+        rgbVals: (n, 3) array of RGB values (0-255)
+
+        Returns an (n, tileSize, tileSize, 3) uint8 array of tinted tiles.
+
+        """
+
+        #Quantise the colours
+        rgbVals = np.asarray(rgbVals, dtype = np.int64).reshape(-1, 3)
+        rgbQuant = rgbVals // self.quantStep * self.quantStep
+
+        #Create a single integer key for each sprite and colour
+        tileKeys = (np.asarray(spriteInds, dtype = np.int64) << 24) + \
+            (rgbQuant[:, 0] << 16) + (rgbQuant[:, 1] << 8) + rgbQuant[:, 2]
+
+        #Only work with the unique keys
+        uniqueKeys, firstInds, keyInds = np.unique(tileKeys, return_index = True,
+                                                   return_inverse = True)
+
+        #Get the tiles already in the cache and tint the missing ones together
+        uniqueTiles = [self.cache.get(tileKey) for tileKey in uniqueKeys.tolist()]
+        missingInds = [keyInd for keyInd, tile in enumerate(uniqueTiles) if tile is None]
+        if len(missingInds) > 0:
+            missingFirst = firstInds[missingInds]
+            newTiles = tintTiles(self.tiles[np.asarray(spriteInds)[missingFirst]],
+                                 rgbQuant[missingFirst])
+            for keyInd, tile in zip(missingInds, newTiles):
+                uniqueTiles[keyInd] = tile
+                self.cache[uniqueKeys[keyInd].item()] = tile
+
+        #Update the order of the cache and trim it back to size
+        for tileKey in uniqueKeys.tolist():
+            self.cache.move_to_end(tileKey)
+        while len(self.cache) > self.cacheSize:
+            self.cache.popitem(last = False)
+
+        return np.stack(uniqueTiles)[keyInds.reshape(-1)]
+
+#Function to compose the pixel art mosaic as a single image
+def composeMosaic(pixelXY, pixelRGBA, spriteInds, imageSize, spriteAtlas,
+                  chunkSize = 4096):
+    """
+    pixelXY: (n, 2) array of x/y pixel coordinates to draw sprites at
+    pixelRGBA: (n, 4) array of RGBA values (0-255) for each of these pixels
+    spriteInds: (n,) array of sprite indices in the atlas to use at each pixel
+    imageSize: (width, height) of the source image in pixels
+    spriteAtlas: SpriteAtlas containing the sprite tiles
+    chunkSize: number of pixels to tint at once to limit memory use
+
+    Returns a uint8 RGBA array of shape (height * tileSize, width * tileSize, 4)
+    where the transparent pixels of the source image remain transparent.
+
+    """
+
+    #Get the image and tile dimensions
+    imgWidth, imgHeight = imageSize
+    tileSize = spriteAtlas.tileSize
+
+    #Convert inputs to arrays
+    pixelXY = np.asarray(pixelXY, dtype = int).reshape(-1, 2)
+    pixelRGBA = np.asarray(pixelRGBA).reshape(-1, 4)
+    spriteInds = np.asarray(spriteInds, dtype = np.intp)
+
+    #Create the blank mosaic
+    mosaic = np.zeros((imgHeight * tileSize, imgWidth * tileSize, 4), dtype = np.uint8)
+
+    #Create a view of the mosaic that is indexed by source pixel
+    #This has the shape (height, tileSize, width, tileSize, 4)
+    mosaicTiles = mosaic.reshape(imgHeight, tileSize, imgWidth, tileSize, 4)
+
+    #Work through the pixels in chunks and place the tinted tiles
+    for startInd in range(0, len(pixelXY), chunkSize):
+
+        #Get the current chunk
+        chunk = slice(startInd, startInd + chunkSize)
+
+        #Get the tinted tiles for the chunk
+        tinted = spriteAtlas.tintedTiles(spriteInds[chunk], pixelRGBA[chunk, 0:3])
+
+        #Place the colours and the alpha from the source pixels
+        xInds = pixelXY[chunk, 0]
+        yInds = pixelXY[chunk, 1]
+        mosaicTiles[yInds, :, xInds, :, 0:3] = tinted
+        mosaicTiles[yInds, :, xInds, :, 3] = pixelRGBA[chunk, 3][:, None, None]
+
+    return mosaic
+
+#Function to extract the drawable pixels from an image
+def imagePixelData(img):
+    """
+    img: PIL image (converted to RGBA if needed)
+
+    Returns a PixelData tuple with the x/y coordinates (n, 2) and RGBA values
+    (n, 4) of all non-transparent pixels, along with the total, blank and data
+    pixel counts. Pixels are ordered by x and then y, which is the same order
+    the image was previously looped through with getpixel.
+
+    """
+
+    #Convert the image to an array indexed by x then y
+    imgRGBA = np.asarray(img.convert('RGBA')).transpose(1, 0, 2)
+
+    #Find the non-transparent pixels
+    dataMask = imgRGBA[:, :, 3] != 0
+    pixelXY = np.argwhere(dataMask)
+
+    #Get the pixel counts
+    totalPixelCount = dataMask.size
+    dataPixelCount = len(pixelXY)
+
+    return PixelData(xy = pixelXY,
+                     rgba = imgRGBA[dataMask],
+                     totalPixelCount = totalPixelCount,
+                     blankPixelCount = totalPixelCount - dataPixelCount,
+                     dataPixelCount = dataPixelCount)
+
+#Function to allocate enemies/items to the data pixels of an image
+def allocateSprites(proportions, dataPixelCount, randomSeed):
+    """
+    proportions: array of the in-game proportion of each enemy/item
+    dataPixelCount: number of data pixels to allocate enemies/items to
+    randomSeed: seed for random allocation of enemies/items to pixels
+
+    Returns an array of dataPixelCount integer codes (indices into proportions)
+    using the smallest integer type that fits. The count of each code is its
+    proportion of the pixels rounded by the largest remainder method, so the
+    counts sum exactly to dataPixelCount and are each within one of the exact
+    proportion. The codes are then randomly ordered using the seed.
+
+    The order uses numpy's RandomState, whose stream is fixed across numpy
+    versions, so a seed always gives the same artwork. Note the artwork
+    differs from the images made before the counts were rounded this way,
+    which were shuffled with Python's random module.
+
+    """
+
+    #Normalise the proportions so they sum to one
+    proportions = np.asarray(proportions, dtype = float)
+    proportions = proportions / proportions.sum()
+
+    #Determine the number of each enemy/item required based on pixel count
+    #Round down and then give the leftover pixels to the largest remainders
+    exactCounts = proportions * dataPixelCount
+    nItems = np.floor(exactCounts).astype(np.int64)
+    nLeftover = dataPixelCount - nItems.sum()
+    nItems[np.argsort(-(exactCounts - nItems), kind = 'stable')[0:nLeftover]] += 1
+
+    #Create the codes based on their count
+    codeType = np.min_scalar_type(max(len(proportions) - 1, 0))
+    itemCodes = np.repeat(np.arange(len(proportions), dtype = codeType), nItems)
+
+    #Randomly sort the codes
+    np.random.RandomState(randomSeed).shuffle(itemCodes) #set seed for consistency
+
+    return itemCodes
+
+#Function to resize pixels of image
+def resizePixels(imagePath, resizeFactor, outputFile):
+    """
+    imagePath: path to image file
+    resizeFactor: scale factor to apply to image (e.g. 0.5)
+    outputFile: output file name
+    
+    """
+    #read file
+    img = Image.open(imagePath)
+
+    #convert to resized image
+    newSize = (int(img.size[0] * resizeFactor),
+               int(img.size[1] * resizeFactor))
+    newImg = img.resize(newSize,Image.BILINEAR)
+
+    #Save output image
+    newImg.save(outputFile)
+    
+#Function to draw a pixel art mosaic in a titled figure
+def plotPixelArt(mosaic, imageSize, characterName):
+    """
+    mosaic: RGBA mosaic array from composeMosaic
+    imageSize: (width, height) of the source image in pixels
+    characterName: name of the character to add as the title
+
+    Returns the matplotlib figure.
+
+    """
+
+    #Create figure
+    #Determine ratio of figure size based on image size
+    #Need to ensure that 10 is the max size on one of the lengths to ensure font
+    #point size remains consistent across different figures
+    if imageSize[1] / imageSize[0] < 1:
+        fig, ax = plt.subplots(nrows = 1, ncols = 1,
+                                figsize = (10, 10 * imageSize[1] / imageSize[0]))
+    elif imageSize[1] / imageSize[0] > 1:
+        fig, ax = plt.subplots(nrows = 1, ncols = 1,
+                                figsize = (10 * imageSize[0] / imageSize[1], 10))
+    else:
+        fig, ax = plt.subplots(nrows = 1, ncols = 1,
+                               figsize = (10, 10))
+        
+    
+    #Set the axes limits to that of the image pixels
+    ax.set_xlim([0,imageSize[0]])
+    ax.set_ylim([0,imageSize[1]])
+    
+    #Match up axis origin with image
+    ax.invert_yaxis()
+    
+    #Remove tick labels
+    ax.set_xticklabels([])
+    ax.set_yticklabels([])
+    
+    #Get rid of ticks
+    ax.tick_params(axis = 'both', length = 0)
+    
+    #Set tight layout to fill figure canvas
+    plt.tight_layout()
+    
+    #Show the mosaic and set it to the data coordinates using extent
+    #Each pixel covers a 1 x 1 square centred on its coordinates
+    ax.imshow(mosaic, origin = 'upper',
+              extent = (-0.5, imageSize[0]-0.5, imageSize[1]-0.5, -0.5))
+    
+    #Remove axis
+    ax.axis('off')
+    
+    #Add label using custom Mario Bros font
+    fig.text(0.025, 0.95, characterName.upper(),
+             font = 'Super Mario Bros.', fontsize = 50,
+             ha = 'left', va = 'center')
+    
+    #Add data source and details text
+    fig.text(0.025, 0,
+             'Author: Aaron Fox (@aaron_s_fox) | Source: MarioWiki',
+             fontsize = 8, fontweight = 'bold',
+             ha = 'left', va = 'bottom')
+    
+    return fig
+
+#Function to create pixel art characters
+def superPixelBros(characterName, randomSeed, spriteAtlas, countData,
+                   dpi = 300, previewDpi = None, imgDir = imgDir):
+    """
+    characterName: name of character image to use (e.g. 'mario')
+    randomSeed: seed for random allocation of enemies/items to pixels
+    spriteAtlas: SpriteAtlas holding the enemy/item sprite tiles
+    countData: dataframe with the Name and Proportion of each enemy/item
+    dpi: resolution to save the figure at (default = 300)
+    previewDpi: resolution of a preview saved before the full figure
+        (default = None, no preview)
+    imgDir: directory containing the '{characterName}_main.png' image
+        (default = the img folder next to this file)
+    
+    """
+    
+    #Create a resized version of the image for better pixel art
+    #33% looks like a good visual:time cost balance here
+    resizedFile = os.path.join(imgDir, f'{characterName}_main_resized.png')
+    resizePixels(os.path.join(imgDir, f'{characterName}_main.png'), 1/3, resizedFile)
+    
+    #Load in the main image
+    mainImg = Image.open(resizedFile)
+    
+    #Convert to RGB
+    mainImgRGBA = mainImg.convert('RGBA')
+    
+    #Get the data (non-transparent) pixels and their colours
+    pixelData = imagePixelData(mainImgRGBA)
+    dataPixelCount = pixelData.dataPixelCount
+            
+    #Allocate the enemies/items to the data pixels in order
+    itemCodes = allocateSprites(countData['Proportion'], dataPixelCount, randomSeed)
+    spriteInds = spriteAtlas.spriteIndices(countData['Name'])[itemCodes]
+    
+    #Compose the tinted sprites into a single mosaic image
+    mosaic = composeMosaic(pixelData.xy, pixelData.rgba, spriteInds,
+                           mainImgRGBA.size, spriteAtlas)
+    
+    #Draw the mosaic in the figure
+    fig = plotPixelArt(mosaic, mainImgRGBA.size, characterName)
+    
+    #Save figure
+    exportFigure(fig, f'{characterName}_pixelArt.png',
+                 dpi = dpi, previewDpi = previewDpi, verbose = False)
+    
+    #Display confirmation
+    print(f'Saved {characterName.capitalize()} pixel art.')
+    
+    #Close figure
+    plt.close(fig)
+    
+    return f'{characterName}_pixelArt.png'
+
+#Function to create poster sized pixel art in blocks
+def renderTiledMosaic(characterName, randomSeed, spriteAtlas, countData,
+                      resizeFactor = 1, blockSize = 256, outputFile = None,
+                      memmapFile = None, keepMemmap = False, imgDir = imgDir):
+    """
+    characterName: name of character image to use (e.g. 'mario')
+    randomSeed: seed for random allocation of enemies/items to pixels
+    spriteAtlas: SpriteAtlas holding the enemy/item sprite tiles
+    countData: dataframe with the Name and Proportion of each enemy/item
+    resizeFactor: scale factor to apply to the main image (default = 1, i.e. full resolution)
+    blockSize: size in source pixels of the square blocks to process (default = 256)
+    outputFile: PNG file to write (default = '{characterName}_pixelArt_poster.png')
+    memmapFile: file for the memory-mapped mosaic (default = outputFile with '.npy')
+    keepMemmap: whether to keep the memory-mapped mosaic file (default = False)
+    imgDir: directory containing the '{characterName}_main.png' image
+        (default = the img folder next to this file)
+
+    The mosaic is built block by block into a memory-mapped array on disk and
+    then streamed to the PNG file, so the output size is limited by disk space
+    rather than memory. The output is the mosaic only (without titles) at
+    tileSize output pixels per source pixel, e.g. a tileSize of 22 gives a
+    ~20k x 20k image from the full resolution Mario image.
+
+    """
+
+    #Set default files
+    if outputFile is None:
+        outputFile = f'{characterName}_pixelArt_poster.png'
+    if memmapFile is None:
+        memmapFile = os.path.splitext(outputFile)[0] + '.npy'
+
+    #Load in the main image at the desired size
+    mainImg = Image.open(os.path.join(imgDir, f'{characterName}_main.png')).convert('RGBA')
+    if resizeFactor != 1:
+        mainImg = mainImg.resize((int(mainImg.size[0] * resizeFactor),
+                                  int(mainImg.size[1] * resizeFactor)), Image.BILINEAR)
+    imgWidth, imgHeight = mainImg.size
+    tileSize = spriteAtlas.tileSize
+
+    #Get the data pixels and allocate the enemies/items to them
+    pixelData = imagePixelData(mainImg)
+    itemCodes = allocateSprites(countData['Proportion'], pixelData.dataPixelCount, randomSeed)
+    spriteInds = spriteAtlas.spriteIndices(countData['Name'])[itemCodes]
+
+    #Group the data pixels by the block they fall in
+    nBlocksX = int(np.ceil(imgWidth / blockSize))
+    nBlocksY = int(np.ceil(imgHeight / blockSize))
+    blockIds = (pixelData.xy[:, 1] // blockSize) * nBlocksX + pixelData.xy[:, 0] // blockSize
+    blockOrder = np.argsort(blockIds, kind = 'stable')
+    blockEdges = np.searchsorted(blockIds[blockOrder], np.arange(nBlocksX * nBlocksY + 1))
+
+    #Create the memory-mapped output mosaic
+    mosaic = np.lib.format.open_memmap(memmapFile, mode = 'w+', dtype = np.uint8,
+                                       shape = (imgHeight * tileSize, imgWidth * tileSize, 4))
+
+    try:
+
+        #Work through the blocks and write them into the mosaic
+        for blockId in range(nBlocksX * nBlocksY):
+
+            #Get the pixels in the block
+            blockInds = blockOrder[blockEdges[blockId]:blockEdges[blockId+1]]
+            if len(blockInds) == 0:
+                continue
+
+            #Get the block position and size in source pixels
+            blockX = (blockId % nBlocksX) * blockSize
+            blockY = (blockId // nBlocksX) * blockSize
+            blockWidth = min(blockSize, imgWidth - blockX)
+            blockHeight = min(blockSize, imgHeight - blockY)
+
+            #Compose the block using coordinates relative to the block
+            blockMosaic = composeMosaic(pixelData.xy[blockInds] - (blockX, blockY),
+                                        pixelData.rgba[blockInds],
+                                        spriteInds[blockInds],
+                                        (blockWidth, blockHeight), spriteAtlas)
+
+            #Write the block into the mosaic
+            mosaic[blockY*tileSize:(blockY+blockHeight)*tileSize,
+                   blockX*tileSize:(blockX+blockWidth)*tileSize] = blockMosaic
+
+        #Make sure the mosaic is on disk
+        mosaic.flush()
+
+        #Stream the mosaic to the PNG file one block row at a time
+        rowStep = blockSize * tileSize
+        writePngRows(outputFile, (mosaic.shape[1], mosaic.shape[0]),
+                     (mosaic[rowInd:rowInd+rowStep] for rowInd in range(0, mosaic.shape[0], rowStep)))
+
+    finally:
+
+        #Release and remove the memory-mapped file
+        del mosaic
+        if not keepMemmap and os.path.exists(memmapFile):
+            os.remove(memmapFile)
+
+    #Display confirmation
+    print(f'Saved {characterName.capitalize()} poster pixel art.')
+
+    return outputFile
+
+#Function to set up each of the batch rendering processes
+def _initBatchWorker(spriteNames, countData, fontDir, atlasSettings):
+
+    #Use the non-interactive backend in the worker
+    plt.switch_backend('Agg')
+
+    #Add the custom fonts to this process (from the font cache)
+    registerFonts(fontDir)
+
+    #Create the sprite atlas and count data for this process
+    global _workerAtlas, _workerCountData
+    _workerAtlas = SpriteAtlas(spriteNames, **atlasSettings)
+    _workerCountData = countData
+
+#Function to render a single job within a batch worker
+def _renderBatchJob(characterName, randomSeed):
+
+    #Run the render and catch any errors so they can be reported
+    startTime = time.perf_counter()
+    try:
+        outputFile = superPixelBros(characterName, randomSeed,
+                                    _workerAtlas, _workerCountData)
+        errorMsg = None
+    except Exception:
+        outputFile = None
+        errorMsg = traceback.format_exc()
+    finally:
+        plt.close('all')
+
+    return {'character': characterName, 'seed': randomSeed,
+            'file': outputFile, 'error': errorMsg,
+            'time': time.perf_counter() - startTime}
+
+#Function to render a batch of characters in parallel
+def renderBatch(jobs, countData, spriteNames, fontDir = fontDir,
+                maxWorkers = None, atlasSettings = None):
+    """
+    jobs: list of (characterName, randomSeed) tuples to render
+    countData: dataframe with the Name and Proportion of each enemy/item
+    spriteNames: list of sprite names to load into each worker's atlas
+    fontDir: list of directories with custom fonts to add in each worker
+        (default = the fonts folder next to this file)
+    maxWorkers: number of worker processes (default = number of CPUs)
+    atlasSettings: dictionary of extra keyword arguments for SpriteAtlas
+
+    Each job is rendered in a separate process using the Agg backend. Errors
+    in a job are reported in its result rather than stopping the batch, and
+    jobs caught up in a crashed worker are re-run on their own so that only
+    the job causing the crash fails.
+
+    Returns a list of result dictionaries in the same order as the jobs.
+
+    """
+
+    #Set defaults
+    if atlasSettings is None:
+        atlasSettings = {}
+    initArgs = (list(spriteNames), countData, fontDir, atlasSettings)
+
+    #Use spawned processes so workers start from a clean matplotlib state
+    mpContext = multiprocessing.get_context('spawn')
+
+    #Set a list to store results in
+    results = [None] * len(jobs)
+
+    #Run the jobs in the process pool
+    crashedJobs = []
+    with ProcessPoolExecutor(max_workers = maxWorkers, mp_context = mpContext,
+                             initializer = _initBatchWorker,
+                             initargs = initArgs) as executor:
+        futures = {executor.submit(_renderBatchJob, *job): jobInd
+                   for jobInd, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            jobInd = futures[future]
+            try:
+                results[jobInd] = future.result()
+            except BrokenProcessPool:
+                crashedJobs.append(jobInd)
+
+    #Re-run any jobs lost to a crashed worker one at a time
+    for jobInd in sorted(crashedJobs):
+        characterName, randomSeed = jobs[jobInd]
+        try:
+            with ProcessPoolExecutor(max_workers = 1, mp_context = mpContext,
+                                     initializer = _initBatchWorker,
+                                     initargs = initArgs) as executor:
+                results[jobInd] = executor.submit(_renderBatchJob, characterName,
+                                                  randomSeed).result()
+        except BrokenProcessPool:
+            results[jobInd] = {'character': characterName, 'seed': randomSeed,
+                               'file': None, 'error': 'Worker process crashed',
+                               'time': None}
+
+    #Report any failed jobs
+    for result in results:
+        if result['error'] is not None:
+            print(f'Failed to render {result["character"].capitalize()} pixel art:\n{result["error"]}')
+
+    return results
+
+# %%% ----- End of pixel_art.py -----
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Helper functions for downloading the Super Mario Bros sprite images listed
+    in imgLinks.csv. Downloads are run in a thread pool and stored in a content
+    addressed cache (files named by their SHA-256 hash) alongside a manifest
+    of the ETag/Last-Modified headers for each link. Unchanged sprites are
+    skipped via conditional requests, and offline mode works purely from the
+    cache.
+
+"""
+
+# %% Import packages
+
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from file_hash import fileHash
+
+# %% Define functions
+
+#Function to load the cache manifest
+def loadManifest(manifestFile):
+
+    #Return an empty manifest if there isn't one yet
+    if not os.path.exists(manifestFile):
+        return {}
+
+    with open(manifestFile, 'r') as inFile:
+        return json.load(inFile)
+
+#Function to save the cache manifest
+def saveManifest(manifest, manifestFile):
+
+    #Write to a temporary file first so an interrupted save doesn't corrupt it
+    with open(manifestFile + '.tmp', 'w') as outFile:
+        json.dump(manifest, outFile, indent = 2, sort_keys = True)
+    os.replace(manifestFile + '.tmp', manifestFile)
+
+#Function to check if a status code is worth retrying (rate limited or server errors)
+def _isRetryStatus(statusCode):
+    return statusCode == 429 or statusCode >= 500
+
+#Function to request a url with retries
+def _getWithRetries(url, headers, retries, backoff, timeout):
+
+    #Try the request until it succeeds or the retries run out
+    #Only connection errors, timeouts and 429/5xx responses are retried, as
+    #other client errors (e.g. a 404 for a moved sprite) won't change
+    for attempt in range(retries + 1):
+        try:
+            response = requests.get(url, headers = headers, timeout = timeout)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == retries:
+                raise
+        else:
+            if not _isRetryStatus(response.status_code) or attempt == retries:
+                response.raise_for_status()
+                return response
+        #Wait for longer after each failed attempt
+        time.sleep(backoff * 2 ** attempt)
+
+#Function to download a single sprite into the cache
+def _downloadSprite(imgName, imgUrl, outputFile, cacheDir, manifest, manifestLock,
+                    offline, retries, backoff, timeout):
+
+    #Get the current cache entry for the link
+    with manifestLock:
+        cacheEntry = manifest.get(imgUrl)
+    cachedFile = None
+    if cacheEntry is not None:
+        cachedFile = os.path.join(cacheDir, cacheEntry['sha256'] + cacheEntry['ext'])
+        if not os.path.exists(cachedFile):
+            cacheEntry = None
+            cachedFile = None
+
+    #Get the sprite from the cache or the link
+    if offline:
+
+        #Can only use the cache in offline mode
+        if cacheEntry is None:
+            raise FileNotFoundError(f'No cached copy of {imgName} ({imgUrl}) for offline mode.')
+        status = 'cached'
+
+    else:
+
+        #Set conditional headers so unchanged sprites aren't downloaded again
+        headers = {}
+        if cacheEntry is not None:
+            if cacheEntry.get('etag'):
+                headers['If-None-Match'] = cacheEntry['etag']
+            if cacheEntry.get('lastModified'):
+                headers['If-Modified-Since'] = cacheEntry['lastModified']
+
+        #Request the sprite
+        response = _getWithRetries(imgUrl, headers, retries, backoff, timeout)
+
+        if response.status_code == 304:
+            status = 'cached'
+        else:
+            #Store the content under its hash
+            sha = hashlib.sha256(response.content).hexdigest()
+            ext = os.path.splitext(imgUrl)[-1].lower()
+            cachedFile = os.path.join(cacheDir, sha + ext)
+            if not os.path.exists(cachedFile):
+                #Each worker writes to its own temporary file, as links with the
+                #same content are saved to the same cached file
+                with tempfile.NamedTemporaryFile(dir = cacheDir, suffix = '.tmp', delete = False) as outFile:
+                    outFile.write(response.content)
+                os.replace(outFile.name, cachedFile)
+            #Update the manifest
+            with manifestLock:
+                manifest[imgUrl] = {'name': imgName, 'sha256': sha, 'ext': ext,
+                                    'etag': response.headers.get('ETag'),
+                                    'lastModified': response.headers.get('Last-Modified')}
+            status = 'downloaded' if cacheEntry is None or cacheEntry['sha256'] != sha else 'cached'
+
+    #Copy the cached sprite to the output file if it is missing or different
+    if os.path.exists(outputFile) and fileHash(outputFile) == os.path.basename(cachedFile).split('.')[0]:
+        updated = False
+    else:
+        shutil.copyfile(cachedFile, outputFile)
+        updated = True
+
+    return {'name': imgName, 'file': outputFile, 'status': status, 'updated': updated}
+
+#Function to download all of the sprite images
+def downloadSprites(imgLinks, imgDir = 'img', cacheDir = None, offline = False,
+                    maxWorkers = 8, retries = 3, backoff = 0.5, timeout = 30):
+    """
+    imgLinks: dataframe with the Name and Image (url) of each sprite
+    imgDir: directory to save the sprite images to as '{Name}.gif'
+    cacheDir: directory for the download cache (default = imgDir + '/cache')
+    offline: only use the cache and don't make any requests (default = False)
+    maxWorkers: number of download threads (default = 8)
+    retries: number of times to retry a failed request (default = 3)
+    backoff: seconds to wait before the first retry, doubled each retry (default = 0.5)
+    timeout: request timeout in seconds (default = 30)
+
+    Returns a list of result dictionaries for each sprite, where 'updated'
+    notes whether the image in imgDir has changed (i.e. needs converting again).
+
+    """
+
+    #Set the cache directory
+    if cacheDir is None:
+        cacheDir = os.path.join(imgDir, 'cache')
+    os.makedirs(cacheDir, exist_ok = True)
+
+    #Load the cache manifest
+    manifestFile = os.path.join(cacheDir, 'manifest.json')
+    manifest = loadManifest(manifestFile)
+    manifestLock = threading.Lock()
+
+    #Download the sprites in the thread pool
+    with ThreadPoolExecutor(max_workers = maxWorkers) as executor:
+        futures = [executor.submit(_downloadSprite, imgName, imgUrl,
+                                   os.path.join(imgDir, f'{imgName}.gif'), cacheDir,
+                                   manifest, manifestLock, offline,
+                                   retries, backoff, timeout)
+                   for imgName, imgUrl in zip(imgLinks['Name'], imgLinks['Image'])]
+
+    #Save the updated manifest
+    if not offline:
+        saveManifest(manifest, manifestFile)
+
+    #Get the results (raising any errors)
+    results = [future.result() for future in futures]
+
+    #Display summary
+    nDownloaded = sum([result['status'] == 'downloaded' for result in results])
+    print(f'Sprites: {nDownloaded} downloaded, {len(results) - nDownloaded} from cache.')
+
+    return results
+
+# %%% ----- End of sprite_downloader.py -----
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Smoke tests for the pixel art benchmarks.
+
+"""
+
+# %% Import packages
+
+import tracemalloc
+import matplotlib.pyplot as plt
+from benchmark_pixel_art import measureStage, runBenchmarks, compareResults
+
+# %% Tests
+
+def test_measure_stage_traces_separately():
+
+    #The stage is run for each timed repeat plus once more for the memory
+    tracedRuns = []
+    stageTime, stageMemory, stageOutput = measureStage(
+        lambda: tracedRuns.append(tracemalloc.is_tracing()) or bytearray(2 * 1024 ** 2), 3)
+    assert tracedRuns == [False, False, False, True]
+    assert stageMemory >= 2 and len(stageOutput) == 2 * 1024 ** 2
+    assert stageTime >= 0
+    assert not tracemalloc.is_tracing()
+
+def test_benchmark_run():
+
+    #Run every stage on a small image
+    plt.switch_backend('Agg')
+    results = runBenchmarks([24], [0.5], tileSize = 2, repeats = 1, dpi = 20)
+    assert sorted(results) == sorted([f'{stage}|24|0.500' for stage in
+                                      ['resize', 'count', 'allocate', 'compose', 'export']])
+    assert all([result['time'] >= 0 and result['memory'] >= 0 for result in results.values()])
+
+    #The results match themselves, and a much slower run is a regression
+    assert compareResults(results, results) == []
+    slowerResults = {runKey: {'time': result['time'] * 2 + 1, 'memory': result['memory']}
+                     for runKey, result in results.items()}
+    assert len(compareResults(slowerResults, results)) == len(results)
+
+# %%% ----- End of test_benchmark_pixel_art.py -----
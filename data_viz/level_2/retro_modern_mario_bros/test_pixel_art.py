@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Tests for the pixel art helper functions.
+
+"""
+
+# %% Import packages
+
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from PIL import Image
+from pixel_art import (SpriteAtlas, allocateSprites, composeMosaic, imagePixelData,
+                       renderBatch, renderTiledMosaic, tintTiles)
+
+# %% Test sprites
+
+#Create an atlas from two small black and white sprites
+@pytest.fixture
+def spriteAtlas(tmp_path):
+    for spriteName, spriteVals in [('Goomba', [[0, 255], [255, 0]]), ('Koopa', [[255, 0], [0, 0]])]:
+        Image.fromarray(np.array(spriteVals, dtype = np.uint8)).save(tmp_path / f'{spriteName}_BW.png')
+    return SpriteAtlas(['Goomba', 'Koopa'], imgDir = str(tmp_path), tileSize = 2,
+                       cacheSize = 2, quantStep = 4)
+
+# %% Tests for SpriteAtlas
+
+def test_atlas_loads_tiles(spriteAtlas):
+
+    #Sprites are loaded in order and found by name
+    assert spriteAtlas.tiles.shape == (2, 2, 2)
+    assert spriteAtlas.tiles[1].tolist() == [[255, 0], [0, 0]]
+    assert spriteAtlas.spriteIndices(['Koopa', 'Goomba', 'Koopa']).tolist() == [1, 0, 1]
+
+def test_atlas_tints_quantised_colours(spriteAtlas):
+
+    #Colours within a quantisation step share the same cached tile
+    tiles = spriteAtlas.tintedTiles([0, 0, 1], [[201, 102, 3], [200, 100, 0], [200, 100, 0]])
+    assert np.array_equal(tiles[0], tiles[1])
+    assert np.array_equal(tiles, tintTiles(spriteAtlas.tiles[[0, 0, 1]], [[200, 100, 0]] * 3))
+    assert len(spriteAtlas.cache) == 2
+
+def test_atlas_evicts_least_recently_used(spriteAtlas):
+
+    #Fill the cache and then use the first tile again
+    spriteAtlas.tintedTiles([0], [[0, 0, 0]])
+    spriteAtlas.tintedTiles([1], [[0, 0, 0]])
+    spriteAtlas.tintedTiles([0], [[0, 0, 0]])
+
+    #A new tile removes the least recently used tile rather than the oldest added
+    spriteAtlas.tintedTiles([1], [[8, 8, 8]])
+    assert list(spriteAtlas.cache.keys()) == [0, (1 << 24) + (8 << 16) + (8 << 8) + 8]
+
+    #The removed tile is tinted again when it is next needed
+    assert np.array_equal(spriteAtlas.tintedTiles([1], [[0, 0, 0]])[0],
+                          tintTiles(spriteAtlas.tiles[[1]], [[0, 0, 0]])[0])
+    assert len(spriteAtlas.cache) == 2
+
+# %% Tests for allocateSprites
+
+@pytest.mark.parametrize('dataPixelCount', [0, 1, 7, 1000, 12345])
+def test_allocate_largest_remainder_totals(dataPixelCount):
+
+    #Counts sum exactly to the data pixels and are within one of the exact proportion
+    proportions = np.array([0.5, 0.25, 0.125, 0.0625, 0.0625]) * np.array([1.01, 0.99, 1.02, 0.98, 1.0])
+    itemCodes = allocateSprites(proportions, dataPixelCount, 12345)
+    counts = np.bincount(itemCodes, minlength = len(proportions))
+    exactCounts = proportions / proportions.sum() * dataPixelCount
+    assert len(itemCodes) == dataPixelCount
+    assert counts.sum() == dataPixelCount
+    assert np.all(np.abs(counts - exactCounts) < 1)
+
+def test_allocate_largest_remainder_order():
+
+    #The leftover pixel goes to the largest remainder
+    itemCodes = allocateSprites([0.45, 0.35, 0.2], 2, 1)
+    assert np.bincount(itemCodes, minlength = 3).tolist() == [1, 1, 0]
+
+def test_allocate_code_type():
+
+    #Codes use the smallest integer type that fits
+    assert allocateSprites(np.ones(200), 400, 1).dtype == np.uint8
+    assert allocateSprites(np.ones(300), 600, 1).dtype == np.uint16
+
+def test_allocate_seed_repeatable():
+
+    #The same seed gives the same order, matching numpy's RandomState stream
+    proportions = [0.6, 0.3, 0.1]
+    itemCodes = allocateSprites(proportions, 100, 12345)
+    assert np.array_equal(itemCodes, allocateSprites(proportions, 100, 12345))
+    assert not np.array_equal(itemCodes, allocateSprites(proportions, 100, 54321))
+    expectedCodes = np.repeat(np.arange(3, dtype = np.uint8), [60, 30, 10])
+    np.random.RandomState(12345).shuffle(expectedCodes)
+    assert np.array_equal(itemCodes, expectedCodes)
+
+# %% Tests for imagePixelData
+
+def test_pixel_data_matches_getpixel_loop():
+
+    #Create a small image with some transparent pixels
+    imgRGBA = np.random.RandomState(1).randint(0, 256, (3, 4, 4)).astype(np.uint8)
+    imgRGBA[[0, 2, 1], [0, 1, 3], 3] = 0
+    img = Image.fromarray(imgRGBA, 'RGBA')
+
+    #Get the data pixels the way they were looped through with getpixel
+    loopXY = []
+    loopRGBA = []
+    for x in range(img.size[0]):
+        for y in range(img.size[1]):
+            if img.getpixel((x, y))[3] != 0:
+                loopXY.append((x, y))
+                loopRGBA.append(img.getpixel((x, y)))
+
+    #The array version gives the same pixels in the same order
+    pixelData = imagePixelData(img)
+    assert pixelData.xy.tolist() == [list(xy) for xy in loopXY]
+    assert pixelData.rgba.tolist() == [list(rgba) for rgba in loopRGBA]
+    assert (pixelData.totalPixelCount, pixelData.blankPixelCount, pixelData.dataPixelCount) == (12, 3, 9)
+
+# %% Tests for composeMosaic
+
+def test_tint_tiles_colour_to_white():
+
+    #Black tile pixels take the colour and white tile pixels stay white
+    tinted = tintTiles(np.array([[[0, 255]]], dtype = np.uint8), [[128, 64, 0]])
+    assert tinted.shape == (1, 1, 2, 3)
+    assert tinted[0, 0, 0].tolist() == [128, 64, 0]
+    assert tinted[0, 0, 1].tolist() == [255, 255, 255]
+
+def test_compose_mosaic_places_tiles(spriteAtlas):
+
+    #Place a Goomba and a Koopa into a 3 x 2 pixel image
+    pixelXY = np.array([[0, 0], [2, 1]])
+    pixelRGBA = np.array([[200, 100, 0, 255], [0, 0, 0, 128]])
+    mosaic = composeMosaic(pixelXY, pixelRGBA, np.array([0, 1]), (3, 2), spriteAtlas, chunkSize = 1)
+    assert mosaic.shape == (4, 6, 4)
+
+    #The tiles sit at their pixel position with the tinted colours and pixel alpha
+    assert np.array_equal(mosaic[0:2, 0:2, 0:3],
+                          tintTiles(spriteAtlas.tiles[[0]], pixelRGBA[[0], 0:3])[0])
+    assert np.all(mosaic[0:2, 0:2, 3] == 255)
+    assert mosaic[2:4, 4:6].tolist() == [[[255, 255, 255, 128], [0, 0, 0, 128]],
+                                         [[0, 0, 0, 128], [0, 0, 0, 128]]]
+
+    #All other pixels stay transparent
+    drawnMask = np.zeros((4, 6), dtype = bool)
+    drawnMask[0:2, 0:2] = True
+    drawnMask[2:4, 4:6] = True
+    assert np.all(mosaic[~drawnMask] == 0)
+
+# %% Tests for renderTiledMosaic
+
+def test_tiled_mosaic_matches_whole_mosaic(spriteAtlas, tmp_path, monkeypatch):
+
+    #Create a main image that doesn't divide evenly into blocks
+    imgRGBA = np.random.RandomState(2).randint(0, 256, (7, 5, 4)).astype(np.uint8)
+    imgRGBA[::3, ::2, 3] = 0
+    imgDir = tmp_path / 'img'
+    os.makedirs(imgDir)
+    Image.fromarray(imgRGBA, 'RGBA').save(imgDir / 'toad_main.png')
+
+    #Render the poster in 3 x 3 pixel blocks, saving it in a different folder
+    os.makedirs(tmp_path / 'output')
+    monkeypatch.chdir(tmp_path / 'output')
+    countData = pd.DataFrame({'Name': ['Goomba', 'Koopa'], 'Proportion': [0.75, 0.25]})
+    outputFile = renderTiledMosaic('toad', 12345, spriteAtlas, countData, blockSize = 3,
+                                   imgDir = str(imgDir))
+
+    #The poster is the same as composing the whole mosaic at once
+    pixelData = imagePixelData(Image.open(imgDir / 'toad_main.png'))
+    itemCodes = allocateSprites(countData['Proportion'], pixelData.dataPixelCount, 12345)
+    wholeMosaic = composeMosaic(pixelData.xy, pixelData.rgba,
+                                spriteAtlas.spriteIndices(countData['Name'])[itemCodes],
+                                (5, 7), spriteAtlas)
+    with Image.open(outputFile) as posterImg:
+        assert np.array_equal(np.asarray(posterImg.convert('RGBA')), wholeMosaic)
+
+    #The memory-mapped mosaic is removed
+    assert not os.path.exists('toad_pixelArt_poster.npy')
+
+# %% Tests for renderBatch
+
+def test_batch_reports_failed_jobs(spriteAtlas, tmp_path):
+
+    #Characters without a main image fail in their worker
+    countData = pd.DataFrame({'Name': ['Goomba', 'Koopa'], 'Proportion': [0.75, 0.25]})
+    jobs = [('missingA', 1), ('missingB', 2)]
+    results = renderBatch(jobs, countData, spriteAtlas.names, maxWorkers = 2,
+                          atlasSettings = {'imgDir': str(tmp_path), 'tileSize': 2})
+
+    #The errors are returned in the results, in the order of the jobs
+    #The fonts are found from the module folder, so only the missing images fail
+    assert [(result['character'], result['seed']) for result in results] == jobs
+    assert all(result['file'] is None for result in results)
+    assert all('FileNotFoundError' in result['error'] for result in results)
+
+# %%% ----- End of test_pixel_art.py -----
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Tests for the sprite downloader, using a local http.server in a thread in
+    place of the sprite links.
+
+"""
+
+# %% Import packages
+
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pandas as pd
+import pytest
+import requests
+from sprite_downloader import downloadSprites, _getWithRetries
+
+# %% Test server
+
+#Handler that serves sprites with an ETag, or a set list of error statuses first
+class SpriteHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+
+        #Record the request
+        self.server.requestLog.append((self.path, self.headers.get('If-None-Match')))
+
+        #Send any queued error status for the path
+        errorStatuses = self.server.errorStatuses.get(self.path, [])
+        if len(errorStatuses) > 0:
+            self.send_response(errorStatuses.pop(0))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        #Send the sprite, or not modified if the ETag matches
+        if self.path not in self.server.sprites:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        content = self.server.sprites[self.path]
+        etag = f'"{hash(content)}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def spriteServer():
+
+    #Start the server on a free port
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SpriteHandler)
+    server.sprites = {'/goomba.gif': b'GIF89a goomba', '/koopa.gif': b'GIF89a koopa'}
+    server.errorStatuses = {}
+    server.requestLog = []
+    serverThread = threading.Thread(target = server.serve_forever, daemon = True)
+    serverThread.start()
+    server.baseUrl = f'http://127.0.0.1:{server.server_address[1]}'
+    yield server
+    server.shutdown()
+    server.server_close()
+
+#Function to get the image links for the test sprites
+def getImgLinks(server, names = ('goomba', 'koopa')):
+    return pd.DataFrame({'Name': list(names),
+                         'Image': [f'{server.baseUrl}/{name}.gif' for name in names]})
+
+# %% Tests
+
+def test_download_then_cache_hit(spriteServer, tmp_path):
+
+    #First run downloads the sprites
+    imgLinks = getImgLinks(spriteServer)
+    results = downloadSprites(imgLinks, imgDir = str(tmp_path), backoff = 0)
+    assert [result['status'] for result in results] == ['downloaded', 'downloaded']
+    assert all([result['updated'] for result in results])
+    with open(os.path.join(tmp_path, 'goomba.gif'), 'rb') as inFile:
+        assert inFile.read() == b'GIF89a goomba'
+
+    #Second run is a cache hit, with the output files left as is
+    results = downloadSprites(imgLinks, imgDir = str(tmp_path), backoff = 0)
+    assert [result['status'] for result in results] == ['cached', 'cached']
+    assert not any([result['updated'] for result in results])
+
+def test_same_content_links(spriteServer, tmp_path):
+
+    #Links with the same content are saved to one cached file without clashing
+    names = [f'goomba{nameInd}' for nameInd in range(8)]
+    for name in names:
+        spriteServer.sprites[f'/{name}.gif'] = b'GIF89a goomba'
+    results = downloadSprites(getImgLinks(spriteServer, names), imgDir = str(tmp_path),
+                              maxWorkers = 8, backoff = 0)
+    assert all([result['status'] == 'downloaded' for result in results])
+    for name in names:
+        with open(os.path.join(tmp_path, f'{name}.gif'), 'rb') as inFile:
+            assert inFile.read() == b'GIF89a goomba'
+
+    #Only the manifest and the one cached file are left, without temporary files
+    cacheFiles = sorted(os.listdir(os.path.join(tmp_path, 'cache')))
+    assert len(cacheFiles) == 2 and cacheFiles[1] == 'manifest.json'
+    assert cacheFiles[0].endswith('.gif')
+
+def test_etag_not_modified(spriteServer, tmp_path):
+
+    #The second request sends the ETag and gets a 304 with no content
+    imgLinks = getImgLinks(spriteServer, ['goomba'])
+    downloadSprites(imgLinks, imgDir = str(tmp_path), backoff = 0)
+    downloadSprites(imgLinks, imgDir = str(tmp_path), backoff = 0)
+    assert spriteServer.requestLog[0][1] is None
+    assert spriteServer.requestLog[1][1] is not None
+
+    #A changed sprite is downloaded again and updates the output file
+    spriteServer.sprites['/goomba.gif'] = b'GIF89a new goomba'
+    results = downloadSprites(imgLinks, imgDir = str(tmp_path), backoff = 0)
+    assert results[0]['status'] == 'downloaded' and results[0]['updated']
+
+def test_server_error_retried(spriteServer, tmp_path):
+
+    #A 5xx and 429 are retried until the sprite is sent
+    spriteServer.errorStatuses['/goomba.gif'] = [503, 429]
+    results = downloadSprites(getImgLinks(spriteServer, ['goomba']), imgDir = str(tmp_path), backoff = 0)
+    assert results[0]['status'] == 'downloaded'
+    assert len(spriteServer.requestLog) == 3
+
+    #The error is raised when the retries run out
+    spriteServer.errorStatuses['/goomba.gif'] = [500] * 3
+    with pytest.raises(requests.HTTPError):
+        _getWithRetries(f'{spriteServer.baseUrl}/goomba.gif', {}, retries = 2, backoff = 0, timeout = 5)
+
+def test_client_error_not_retried(spriteServer):
+
+    #A 404 fails on the first request
+    with pytest.raises(requests.HTTPError):
+        _getWithRetries(f'{spriteServer.baseUrl}/missing.gif', {}, retries = 3, backoff = 0, timeout = 5)
+    assert len(spriteServer.requestLog) == 1
+
+def test_offline_mode(spriteServer, tmp_path):
+
+    #Offline mode fails without a cached copy
+    imgLinks = getImgLinks(spriteServer, ['goomba'])
+    with pytest.raises(FileNotFoundError):
+        downloadSprites(imgLinks, imgDir = str(tmp_path), offline = True)
+
+    #Offline mode uses the cache without making any requests
+    downloadSprites(imgLinks, imgDir = str(tmp_path), backoff = 0)
+    os.remove(os.path.join(tmp_path, 'goomba.gif'))
+    nRequests = len(spriteServer.requestLog)
+    results = downloadSprites(imgLinks, imgDir = str(tmp_path), offline = True)
+    assert results[0]['status'] == 'cached' and results[0]['updated']
+    assert len(spriteServer.requestLog) == nRequests
+    assert os.path.exists(os.path.join(tmp_path, 'goomba.gif'))
+
+# %%% ----- End of test_sprite_downloader.py -----
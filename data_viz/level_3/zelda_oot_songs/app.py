@@ -9,42 +9,77 @@
     
     Script to create Dash app for level 3 of #GamesNightViz
     
+    The app is built by createApp() and the module exposes the WSGI server
+    as app:server, so it can be run in production with gunicorn using the
+    settings in gunicorn.conf.py (e.g. gunicorn -c gunicorn.conf.py). The
+    song data and image assets are loaded once when the module is imported,
+    so with preload_app they are shared by all of the gunicorn workers.
+    
 """
 
 # %% Import packages
 
+import os
+import json
+import importlib.util
 import plotly.io as pio
 pio.renderers.default = 'svg'
 import plotly.graph_objs as go
-from PIL import Image
 import pandas as pd
 import dash
 from dash import html
 from dash import dcc
-from dash.dependencies import Input, Output
+from dash.dependencies import Input, Output, State, ClientsideFunction
+from dash.exceptions import PreventUpdate
+from zelda_assets import buildImageAssets, buildMapLayer, loadAssetBundle, assetMaxAge
 
 # %% Set-up
 
-#Import data
-songData = pd.read_csv('data\\songData.csv')
+#Set the app folder so files are found no matter where the app is run from
+appDir = os.path.dirname(os.path.abspath(__file__))
+assetsDir = os.path.join(appDir, 'assets')
+
+#Set whether the song selection is handled by the server or in the browser
+#Set the ZELDA_CALLBACK_MODE environment variable to 'clientside' to use the
+#browser, which avoids a server request each time a song is selected
+callbackMode = os.environ.get('ZELDA_CALLBACK_MODE', 'server')
+
+#Set how the location markers are drawn on the map with the ZELDA_MARKER_MODE
+#environment variable. 'images' places an ocarina image on each point, while
+#'webgl' draws all of the points as a single WebGL trace so the map stays
+#smooth with hundreds or thousands of points. 'auto' uses the images up to
+#markerImageLimit points and WebGL above that
+markerMode = os.environ.get('ZELDA_MARKER_MODE', 'auto')
+markerImageLimit = 100
+
+#Set whether the static images of the map are composited into one background
+#image with the ZELDA_MAP_LAYER environment variable. 'composite' serves the
+#Link, map and ocarina images (and the marker circles) as a single image
+#sized for the screen width, leaving only the hover trace in the figure.
+#'figure' adds each of them to the figure as layout images
+mapLayerMode = os.environ.get('ZELDA_MAP_LAYER', 'composite')
 
-#Load map image
-mapImg = Image.open('img\\oot_map.jpg')
+#Import data
+songData = pd.read_csv(os.path.join(appDir, 'data', 'songData.csv'))
 
-#Load ocarina image
-ocarinaSmallImg = Image.open('img\\ocarina_small.png')
+#Build the resized/WebP versions of the images in the assets folder
+#Images are referenced by url so they aren't embedded in the figure data
+#A deployment bundle from build_bundle.py has these built ahead of time
+assetBundle = loadAssetBundle(assetsDir)
+if assetBundle is not None:
+    imageAssets = assetBundle['images']
+else:
+    imageAssets = buildImageAssets(os.path.join(appDir, 'img'), assetsDir)
 
-#Load Link image
-linkImg = Image.open('img\\linkPlaying.png')
+#Get map and Link image sizes
+mapImgSize = imageAssets['oot_map.jpg']['size']
+linkImgSize = imageAssets['linkPlaying.png']['size']
 
 #Set song point location size
 songPointSize = 25
 
-#Import N64 button images
+#Set N64 button images
 buttonImageFiles = ['n64_A', 'n64_up', 'n64_left', 'n64_right', 'n64_down']
-buttonImg = {}
-for button in buttonImageFiles:
-    buttonImg[button.split('_')[-1]] = Image.open('img\\'+button+'.png')
     
 #Map buttons to plotting values
 buttonPlotVal = {'A': 100, 'down': 200, 'right': 400, 'left': 500, 'up': 700}
@@ -55,131 +90,242 @@ noteList = ['note1', 'note2', 'note3', 'note4', 'note5', 'note6', 'note7', 'note
 #Set note image size
 notePointSize = 100
 
-#Load treble clef image
-clefImg = Image.open('img\\treble_clef.png')
+#Set the position and size of the note images on the song graph (in paper coordinates)
+noteLayout = {'x0': 0.2, 'xStep': 0.1, 'size': 0.25}
 
 #Set axis ranges for calculations
 musicRangeX = [0.5, 850]
 musicRangeY = [-100,800]
 
+#Get the height of each button on the song graph (in paper coordinates)
+buttonPaperY = {button: buttonPlotVal[button] / (musicRangeY[1]-musicRangeY[0]) for button in buttonPlotVal}
+
 #Calculate ratio of Link image height to map
-linkToMap_heightRatio = mapImg.size[1] / linkImg.size[1]
+linkToMap_heightRatio = mapImgSize[1] / linkImgSize[1]
 
 #Calculate ratio Link image width
-linkImg_ratioWidth = linkImg.size[0] * linkToMap_heightRatio
+linkImg_ratioWidth = linkImgSize[0] * linkToMap_heightRatio
 
 #Calculate width proportion that Link image should take up
-linkImg_widthProp = linkImg_ratioWidth / (linkImg_ratioWidth + mapImg.size[0])
+linkImg_widthProp = linkImg_ratioWidth / (linkImg_ratioWidth + mapImgSize[0])
 
 #Calcualte width proportion that map image should take up
 mapImg_widthProp = 1 - linkImg_widthProp 
 
 #Calculate map figure height to widthratio
-mapFig_heightToWidth = mapImg.size[1] / (mapImg.size[0] + linkImg_ratioWidth)
+mapFig_heightToWidth = mapImgSize[1] / (mapImgSize[0] + linkImg_ratioWidth)
 
 #Calculate relative height and width we want map figure to cover
 mapFigRelWidth = 78
 mapFigRelHeight = mapFigRelWidth / mapFig_heightToWidth
 
-# %% Create static map figure
+#Set the on screen width (px) of the map that the size of the marker circles
+#in the composited map layer are matched to
+mapReferenceWidth = 1500
+
+# %% Define functions
+
+#Function to get the versioned asset urls of the images for an app
+def getImageUrls(app):
+    """
+    app: Dash app the images are served from
+    
+    Returns a dictionary with the url of each image asset. The urls include
+    the asset version, so browsers can cache them for a long time.
+    
+    """
+    
+    return {imgName: app.get_asset_url(imageAssets[imgName]['webp']) + '?v=' + imageAssets[imgName]['version'] for imgName in imageAssets}
+
+#Function to get the N64 button image urls for each note
+def getButtonImages(imageUrls):
+    return {button.split('_')[-1]: imageUrls[button+'.png'] for button in buttonImageFiles}
+
+#Function to get the paper coordinates of points on the map
+def getMapPaperPoints(pointData):
+    return [(linkImg_widthProp + (1-linkImg_widthProp)*(pointX / mapImgSize[0]), pointY / mapImgSize[1])
+            for pointX, pointY in zip(pointData['learntWhere_X'], pointData['learntWhere_Y'])]
+
+#Function to get the marker mode used for a number of points
+def getMarkerMode(markerMode, nPoints):
+    if markerMode == 'auto':
+        return 'webgl' if nPoints > markerImageLimit else 'images'
+    return markerMode
+
+#Function to create the static images of the map figure
+def createMapImages(pointData, markerMode):
+    """
+    pointData: dataframe of the points marked on the map
+    markerMode: 'images' to include an ocarina image on each point
+    
+    Returns a list of layout image dictionaries with the image file name as
+    the source. These are either added to the figure or composited into the
+    map layer by buildMapLayer.
+    
+    """
+    
+    #Add Link image
+    mapImages = [
+        dict(
+            source = 'linkPlaying.png',
+            xref = 'paper', yref = 'paper',
+            x = 0, y = 0,
+            sizex = linkImg_widthProp-0.01, sizey = 1,
+            xanchor = 'left', yanchor = 'bottom',
+            layer = 'above'
+        )
+    ]
+
+    #Add map image
+    mapImages.append(
+        dict(
+            source = 'oot_map.jpg',
+            xref = 'paper', yref = 'paper', 
+            x = linkImg_widthProp, y = 0,
+            sizex = mapImg_widthProp, sizey = 1,
+            xanchor = 'left', yanchor = 'bottom',
+            layer = 'below'       
+            )
+        )
+    
+    #Add ocarina images on points
+    if getMarkerMode(markerMode, len(pointData)) == 'images':
+        for pointX, pointY in getMapPaperPoints(pointData):
+            mapImages.append(
+                dict(
+                    source = 'ocarina_small.png',
+                    xref = 'paper', yref = 'paper',
+                    x = pointX,
+                    y = pointY,
+                    sizex = 0.023, sizey = 0.023,
+                    xanchor = 'center', yanchor = 'middle',
+                    layer = 'above'
+                )
+            )
+    
+    return mapImages
 
 ##### TODO: consider extra hover points over link image
 
-#Create blank figure
-mapFig = go.Figure()
-
-#Update figure layout
-mapFig.update_layout(
-    #Sizing
-    autosize = True,
-    #Figure boundaries
-    margin = dict(l = 0,
-                  r = 0,
-                  t = 0,
-                  b = 0),
-    #Axis limits
-    xaxis_range = [(linkImg.size[0] * (mapImg.size[1] / linkImg.size[1]) * -1), mapImg.size[0]],
-    yaxis_range = [0,mapImg.size[1]],
-    #Figure & background colour
-    paper_bgcolor = 'rgba(255, 255, 255, 0)',
-    plot_bgcolor = 'rgba(255, 255, 255, 0)',
-    #Turn off legend
-    showlegend = False,
-    #Hover label font
-    hoverlabel = dict(bgcolor = "white",
-                      font_size = 14, font_family = 'Arial')
-    )
+#Function to create the static map figure
+def createMapFigure(imageUrls, markerMode = markerMode, pointData = None, mapLayer = None):
+    """
+    imageUrls: dictionary of the image asset urls from getImageUrls
+    markerMode: 'images', 'webgl' or 'auto' for how the location markers are
+        drawn (default = the ZELDA_MARKER_MODE environment variable, or 'auto')
+    pointData: dataframe of the points to mark on the map, with the same
+        learntWhere_X, learntWhere_Y, song, learntWhere and songType columns
+        as songData (default = songData)
+    mapLayer: composited map layer from buildMapLayer (default = None). When
+        given, the static images and marker circles are left out of the
+        figure and only the hover trace is kept.
+    
+    """
+    
+    #Set the points to mark
+    if pointData is None:
+        pointData = songData
+    
+    #Check whether to draw the markers with WebGL
+    markerMode = getMarkerMode(markerMode, len(pointData))
+    
+    #Create blank figure
+    mapFig = go.Figure()
 
-#Add Link image
-mapFig.add_layout_image(
-    dict(
-        source = linkImg,
-        xref = 'paper', yref = 'paper',
-        x = 0, y = 0,
-        sizex = linkImg_widthProp-0.01, sizey = 1,
-        xanchor = 'left', yanchor = 'bottom',
-        layer = 'above'
-    )
-)
-
-#Add map image
-mapFig.add_layout_image(
-    dict(
-        source = mapImg,
-        xref = 'paper', yref = 'paper', 
-        x = linkImg_widthProp, y = 0,
-        sizex = mapImg_widthProp, sizey = 1,
-        xanchor = 'left', yanchor = 'bottom',
-        layer = 'below'       
+    #Update figure layout
+    mapFig.update_layout(
+        #Sizing
+        autosize = True,
+        #Figure boundaries
+        margin = dict(l = 0,
+                      r = 0,
+                      t = 0,
+                      b = 0),
+        #Axis limits
+        xaxis_range = [(linkImgSize[0] * (mapImgSize[1] / linkImgSize[1]) * -1), mapImgSize[0]],
+        yaxis_range = [0,mapImgSize[1]],
+        #Figure & background colour
+        paper_bgcolor = 'rgba(255, 255, 255, 0)',
+        plot_bgcolor = 'rgba(255, 255, 255, 0)',
+        #Turn off legend
+        showlegend = False,
+        #Hover label font
+        hoverlabel = dict(bgcolor = "white",
+                          font_size = 14, font_family = 'Arial')
         )
-    )
 
-# #Add map border
-# mapFig.add_trace(
-#     go.Scatter(
-#         x = [1-mapImg_widthProp, 1, 1, 1-mapImg_widthProp, 1-mapImg_widthProp],
-#         y = [0, 0, 1, 1, 0],
-#         line = dict(color = '#000000', width = 3),
-#         mode = 'lines', hoverinfo = 'skip'
-#         )
-#     )
-
-#Set invisible axes
-mapFig.update_xaxes(visible = False, showgrid = False, fixedrange = True)
-mapFig.update_yaxes(visible = False, showgrid = False, fixedrange = True)
-
-#Add scatter of song location points
-mapFig.add_trace(
-    go.Scatter(
-        x = songData['learntWhere_X'], y = songData['learntWhere_Y'],
-        marker = dict(
-            color = 'white', size = songPointSize,
-            line = dict(color = '#373f87', width = 2)
-                      ),
+    #Add the static images, unless they are served as the map layer
+    if mapLayer is None:
+        mapFig.update_layout(images = [dict(mapImage, source = imageUrls[mapImage['source']])
+                                       for mapImage in createMapImages(pointData, markerMode)])
+
+    # #Add map border
+    # mapFig.add_trace(
+    #     go.Scatter(
+    #         x = [1-mapImg_widthProp, 1, 1, 1-mapImg_widthProp, 1-mapImg_widthProp],
+    #         y = [0, 0, 1, 1, 0],
+    #         line = dict(color = '#000000', width = 3),
+    #         mode = 'lines', hoverinfo = 'skip'
+    #         )
+    #     )
+
+    #Set invisible axes
+    mapFig.update_xaxes(visible = False, showgrid = False, fixedrange = True)
+    mapFig.update_yaxes(visible = False, showgrid = False, fixedrange = True)
+
+    #Set the hover data of the points
+    pointHover = dict(
         mode = 'markers', name = '',
-        hovertext = songData['song'].to_list(),
-        customdata = songData['learntWhere'].to_list(),
-        text = songData['songType'].to_list(),
+        hovertext = pointData['song'].to_list(),
+        customdata = pointData['learntWhere'].to_list(),
+        text = pointData['songType'].to_list(),
         hovertemplate = '<b>Song:</b> %{hovertext}<br><b>Location:</b> %{customdata}<br><b>Type:</b> %{text}'
         )
-    )
 
-#Add ocarina images on points
-for songInd in range(len(songData)):
-    mapFig.add_layout_image(
-        dict(
-            source = ocarinaSmallImg,
-            xref = 'paper', yref = 'paper',
-            x = linkImg_widthProp + (1-linkImg_widthProp)*(songData['learntWhere_X'][songInd] / mapImg.size[0]),
-            y = songData['learntWhere_Y'][songInd] / mapImg.size[1],
-            sizex = 0.023, sizey = 0.023,
-            xanchor = 'center', yanchor = 'middle',
-            layer = 'above'
-        )
-    )
-
-# %% Create app
+    if mapLayer is not None:
+        
+        #Keep the markers for hovering, with the circles and ocarinas drawn in
+        #the map layer
+        mapTrace = go.Scattergl if markerMode == 'webgl' else go.Scatter
+        mapFig.add_trace(
+            mapTrace(
+                x = pointData['learntWhere_X'], y = pointData['learntWhere_Y'],
+                marker = dict(size = songPointSize, opacity = 0),
+                **pointHover
+                )
+            )
+    
+    elif markerMode == 'webgl':
+        
+        #Add all of the points as a single WebGL trace
+        #Layout images can't be drawn by WebGL, so the ocarina is replaced by a
+        #dotted marker in the same colours
+        mapFig.add_trace(
+            go.Scattergl(
+                x = pointData['learntWhere_X'], y = pointData['learntWhere_Y'],
+                marker = dict(
+                    color = 'white', size = songPointSize, symbol = 'circle-dot',
+                    line = dict(color = '#373f87', width = 2)
+                              ),
+                **pointHover
+                )
+            )
+        
+    else:
 
+        #Add scatter of song location points
+        mapFig.add_trace(
+            go.Scatter(
+                x = pointData['learntWhere_X'], y = pointData['learntWhere_Y'],
+                marker = dict(
+                    color = 'white', size = songPointSize,
+                    line = dict(color = '#373f87', width = 2)
+                              ),
+                **pointHover
+                )
+            )
+    
+    return mapFig
 
 ####Layout not really working 
 #### Review here: https://dash.plotly.com/interactive-graphing
@@ -189,125 +335,125 @@ for songInd in range(len(songData)):
 #### Size scaling of images on graph is poor
 #### Need to calculate or create size relative to axes coordinates
 
-#Create the app
-app = dash.Dash()
-
-#Create app layout
-app.layout = html.Div([
+#Function to create the app layout
+def createLayout(mapFig, mapLayer = None):
+    """
+    mapFig: static map figure from createMapFigure
+    mapLayer: composited map layer from buildMapLayer (default = None). When
+        given, the map graph has the layer as its background.
+    
+    The map graph is kept at the aspect ratio of the Link and map images, so
+    the images fill their boxes and line up with the points on the map in
+    both the paper and data coordinates.
+    
+    """
+    
+    #Set the map graph style
+    if mapLayer is None:
+        mapGraphClass = None
+        mapAspectRatio = (round(linkImg_ratioWidth + mapImgSize[0]), mapImgSize[1])
+    else:
+        mapGraphClass = mapLayer['cssClass']
+        mapAspectRatio = mapLayer['aspectRatio']
+    mapGraphStyle = {'width': '78vw', 'aspectRatio': '{0} / {1}'.format(*mapAspectRatio), 'margin': '0em'}
     
-    #Create div for header and text section
-    html.Div([
+    #Create app layout
+    return html.Div([
+    
+        #Create div for header and text section
+        html.Div([
         
-        #Create heading
-        html.H1('The Legend of Zelda: Ocarina of Time'),        
+            #Create heading
+            html.H1('The Legend of Zelda: Ocarina of Time'),        
         
-        #Create introductory text
-        html.P("There are many items that offer power ups and increase Link's abilities in Ocarina of Time. During the game — Link receives the Fairy Ocarina and later the Ocarina of Time, on which he can play a series of songs that are learnt throughout the game."),
+            #Create introductory text
+            html.P("There are many items that offer power ups and increase Link's abilities in Ocarina of Time. During the game — Link receives the Fairy Ocarina and later the Ocarina of Time, on which he can play a series of songs that are learnt throughout the game."),
         
-        html.P("These songs are learnt at various locations across Hyrule, with each holding it's own unique power. This page allows you to explore the various songs Link learns across Hyrule, and the unique powers of each. Hover over the ocarina symbols to discover where each song is learnt and its general power type. Use the dropdown box to select specific songs to learn how each is played and more details on the power up the song provides."),
+            html.P("These songs are learnt at various locations across Hyrule, with each holding it's own unique power. This page allows you to explore the various songs Link learns across Hyrule, and the unique powers of each. Hover over the ocarina symbols to discover where each song is learnt and its general power type. Use the dropdown box to select specific songs to learn how each is played and more details on the power up the song provides."),
         
-        ]), #end of header and intro text div
+            ]), #end of header and intro text div
     
-    #Create div for static map figure
-    html.Div([
+        #Create div for static map figure
+        html.Div([
         
-        #Add the figure via dcc graph
-        dcc.Graph(figure = mapFig, responsive = True,
-                  style = {'width': '78vw', 'height': '65vh', 'margin': '0em'},
-                  config = {'displayModeBar': False})
-        ],
-        #Set the style for width
-        #Width to height ratio determined via earlier calculations
-        style = {'width': '78vw', 'float': 'left', 'display': 'inline-block'}        
+            #Add the figure via dcc graph
+            dcc.Graph(figure = mapFig, responsive = True,
+                      className = mapGraphClass, style = mapGraphStyle,
+                      config = {'displayModeBar': False})
+            ],
+            #Set the style for width
+            #Width to height ratio determined via earlier calculations
+            style = {'width': '78vw', 'float': 'left', 'display': 'inline-block'}        
         
-        ), #end of static map div
+            ), #end of static map div
     
-    #Create div for dropdown box
-    html.Div([
+        #Create div for dropdown box
+        html.Div([
         
-        #Add level 2 heading
-        html.H2('Select Song:'),
+            #Add level 2 heading
+            html.H2('Select Song:'),
         
-        #Add the dropdown box
-        dcc.Dropdown(id = 'songDropDown',
-                     options = [{'label': songName, 'value': songName} for songName in songData['song']],
-                     value = "Zelda's Lullaby")
-        ],        
-        #Set the style for width
-        style = {'width': '20vw', 'float': 'center', 'display': 'inline-block'}
+            #Add the dropdown box
+            dcc.Dropdown(id = 'songDropDown',
+                         options = [{'label': songName, 'value': songName} for songName in songData['song']],
+                         value = "Zelda's Lullaby")
+            ],        
+            #Set the style for width
+            style = {'width': '20vw', 'float': 'center', 'display': 'inline-block'}
                 
-        ), #end of dropdown box div
+            ), #end of dropdown box div
     
-    #Create div for song graph
-    html.Div([
+        #Create div for song graph
+        html.Div([
         
-        #Add level 2 heading
-        html.H2('How to Play:'),
+            #Add level 2 heading
+            html.H2('How to Play:'),
         
-        #Add the song graph
-        dcc.Graph(id = 'songGraph', responsive = True,
-                  style = {'width': '20vw', 'height': '15vh', 'margin': '0em'},
-                  config = {'displayModeBar': False}),
-        ],       
-        #Set the style
-        style = {'width': '20vw', 'float': 'center', 'display': 'inline-block'}
+            #Add the song graph
+            dcc.Graph(id = 'songGraph', responsive = True,
+                      style = {'width': '20vw', 'height': '15vh', 'margin': '0em'},
+                      config = {'displayModeBar': False}),
+            ],       
+            #Set the style
+            style = {'width': '20vw', 'float': 'center', 'display': 'inline-block'}
         
-        ),
+            ),
     
-    #Create div for song type
-    html.Div([
+        #Create div for song type
+        html.Div([
         
-        #Add level 2 heading
-        html.H2('Song Type:'),
+            #Add level 2 heading
+            html.H2('Song Type:'),
         
-        #Add the song type
-        html.Div(id = 'songTypeText')
+            #Add the song type
+            html.Div(id = 'songTypeText')
         
-        ],       
-        #Set the style for width
-        style = {'width': '20vw', 'float': 'center', 'display': 'inline-block'}
+            ],       
+            #Set the style for width
+            style = {'width': '20vw', 'float': 'center', 'display': 'inline-block'}
         
-        ),
+            ),
     
-    #Create div for song power
-    html.Div([
+        #Create div for song power
+        html.Div([
         
-        #Add level 2 heading
-        html.H2('Song Power:'),
+            #Add level 2 heading
+            html.H2('Song Power:'),
         
-        #Add the song power
-        html.Div(id = 'songPowerText')
+            #Add the song power
+            html.Div(id = 'songPowerText')
         
-        ],       
-        #Set the style for width
-        style = {'width': '20vw', 'float': 'center', 'display': 'inline-block'}
+            ],       
+            #Set the style for width
+            style = {'width': '20vw', 'float': 'center', 'display': 'inline-block'}
         
-        ),
+            ),
     
     
-    ]) #end of overall parent
-
-#Create the app callback for figure
-@app.callback(Output(component_id = 'songGraph', component_property = 'figure'),
-              Output(component_id = 'songTypeText', component_property = 'children'),
-              Output(component_id = 'songPowerText', component_property = 'children'),
-              [Input(component_id = 'songDropDown', component_property = 'value')])
+        ]) #end of overall parent
 
-#Define function to update song graph, song type text and song power
-def graph_update(songDropDownValue):
-    
-    #Set song
-    songName = songDropDownValue
-    songInd = songData.index[songData['song'] == songName].tolist()[0]
-
-    #Get notes in list form
-    songNotes = songData[noteList].iloc[songInd].dropna().tolist()
-    
-    #Get the song type
-    songType = songData['songType'].iloc[songInd]
-    
-    #Get the song type
-    songPower = songData['power'].iloc[songInd]
+#Function to create the staff lines and treble clef of the song graph
+def createStaffFigure(imageUrls):
 
     #Create blank figure
     fig = go.Figure()
@@ -344,29 +490,11 @@ def graph_update(songDropDownValue):
     #Set invisible axes
     fig.update_xaxes(visible = False, showgrid = False)
     fig.update_yaxes(visible = False, showgrid = False)
-        
-    #Add note images
-    for noteInd in range(len(songNotes)):
-        #Get the note name
-        note = songNotes[noteInd]
-        #Add image
-        fig.add_layout_image(
-            dict(
-                source = buttonImg[note],
-                xref = 'paper', yref = 'paper',
-                x = 0.2 + (noteInd*0.1),
-                y = buttonPlotVal[note] / (musicRangeY[1]-musicRangeY[0]),
-                sizex = 0.25,
-                sizey = 0.25,
-                xanchor = 'center', yanchor = 'middle',
-                layer = 'above'
-            )
-        )
     
     #Add treble clef image
     fig.add_layout_image(
         dict(
-            source = clefImg,
+            source = imageUrls['treble_clef.png'],
             xref = 'paper', yref = 'paper',
             x = 0,
             y = 0.5,
@@ -377,10 +505,297 @@ def graph_update(songDropDownValue):
         )
     )
     
-    return fig, f'{songType} Song', songPower
+    return fig
+
+#Function to create the note images for a song
+def createNoteImages(songNotes, buttonImg):
+    """
+    songNotes: list of the button for each note of the song
+    buttonImg: dictionary of the image url for each button from getButtonImages
+    
+    Returns a list of layout image dictionaries for the notes.
+    
+    Note that assets/zelda_songs.js places the notes in the same way for the
+    clientside callback mode.
+    
+    """
+    
+    #Create the image for each note
+    noteImages = []
+    for noteInd in range(len(songNotes)):
+        #Get the note name
+        note = songNotes[noteInd]
+        #Add image
+        noteImages.append(
+            dict(
+                source = buttonImg[note],
+                xref = 'paper', yref = 'paper',
+                x = noteLayout['x0'] + (noteInd*noteLayout['xStep']),
+                y = buttonPaperY[note],
+                sizex = noteLayout['size'],
+                sizey = noteLayout['size'],
+                xanchor = 'center', yanchor = 'middle',
+                layer = 'above'
+            )
+        )
+    
+    return noteImages
+
+#Function to get the notes, song type text and song power for a song
+def getSongDetails(songInd):
+
+    #Get notes in list form
+    songNotes = songData[noteList].iloc[songInd].dropna().tolist()
+    
+    #Get the song type
+    songType = songData['songType'].iloc[songInd]
+    
+    #Get the song type
+    songPower = songData['power'].iloc[songInd]
+    
+    return songNotes, f'{songType} Song', songPower
+
+#Function to create the song graph with a hidden note image for each note
+def createSongSlotsFigure(imageUrls):
+    """
+    imageUrls: dictionary of the image asset urls from getImageUrls
+    
+    Returns the staff figure with a hidden note image (slot) for each of the
+    notes in noteList, after the treble clef image. The slots are shown and
+    changed to the notes of a song with getSongSlots.
+    
+    """
+    
+    #Create the staff and add the hidden note images
+    fig = createStaffFigure(imageUrls)
+    for noteImage in createNoteImages(['A'] * len(noteList), getButtonImages(imageUrls)):
+        fig.add_layout_image(dict(noteImage, visible = False))
+    
+    return fig
+
+#Function to get the changes to the note slots of the song graph for a song
+def getSongSlots(songNotes, buttonImg):
+    """
+    songNotes: list of the button for each note of the song
+    buttonImg: dictionary of the image url for each button from getButtonImages
+    
+    Returns a list of the image properties to set for each note slot. The
+    x-position of each slot doesn't change, so only the image and height of
+    the notes are set and the unused slots are hidden.
+    
+    """
+    
+    return [{'source': buttonImg[songNotes[noteInd]], 'y': buttonPaperY[songNotes[noteInd]], 'visible': True}
+            if noteInd < len(songNotes) else {'visible': False}
+            for noteInd in range(len(noteList))]
+
+#Function to get the note slot properties that differ from the song shown
+def diffSongSlots(shownSlots, songSlots):
+    """
+    shownSlots: list of the slot properties of the song shown, from
+        getSongSlots (or None for the hidden slots of a new song graph)
+    songSlots: list of the slot properties of the new song, from getSongSlots
+    
+    Returns a list of (slotInd, imageProperty, value) for only the properties
+    that change. A slot that stays hidden isn't changed, a slot being hidden
+    only has its visibility changed, and a slot that is already shown only
+    has the image and height changed if they differ.
+    
+    """
+    
+    #Treat every slot as hidden if no song has been shown
+    if shownSlots is None:
+        shownSlots = [{'visible': False}] * len(songSlots)
+    
+    #Compare each slot to the song shown
+    slotChanges = []
+    for slotInd, (shownSlot, songSlot) in enumerate(zip(shownSlots, songSlots)):
+        if not songSlot['visible']:
+            if shownSlot['visible']:
+                slotChanges.append((slotInd, 'visible', False))
+        else:
+            for imageProperty, value in songSlot.items():
+                if shownSlot.get(imageProperty) != value:
+                    slotChanges.append((slotInd, imageProperty, value))
+    
+    return slotChanges
+
+#Function to create the song graph, song type text and song power for a song
+def createSongOutputs(songInd, imageUrls):
+    """
+    songInd: index of the song in songData
+    imageUrls: dictionary of the image asset urls from getImageUrls
+    
+    Returns the serialised song figure (as a dictionary), song type text and
+    song power text.
+    
+    """
+    
+    #Get the song details
+    songNotes, songTypeText, songPower = getSongDetails(songInd)
+
+    #Create the staff and add the note images
+    fig = createStaffFigure(imageUrls)
+    for noteImage in createNoteImages(songNotes, getButtonImages(imageUrls)):
+        fig.add_layout_image(noteImage)
+    
+    #Serialise the figure to plain JSON types so it is only encoded once
+    return json.loads(fig.to_json()), songTypeText, songPower
+
+#Function to register the song selection callback
+def registerCallbacks(app, imageUrls, callbackMode = 'server'):
+    """
+    app: Dash app to add the callback to
+    imageUrls: dictionary of the image asset urls from getImageUrls
+    callbackMode: 'server' to look up the song outputs on the server, or
+        'clientside' to build them in the browser (default = 'server')
+    
+    In the server mode the song graph is updated with partial figure updates,
+    which only change the note slots that differ from the song shown (kept in
+    a store on the page).
+    
+    """
+    
+    if callbackMode == 'clientside':
+        
+        #Store the song table and staff figure in the browser
+        #The song graph and text are then built in assets/zelda_songs.js without
+        #a request to the server
+        songStoreData = {'staffFigure': json.loads(createStaffFigure(imageUrls).to_json()),
+                         'buttonSources': getButtonImages(imageUrls),
+                         'buttonY': buttonPaperY,
+                         'noteLayout': noteLayout,
+                         'songs': {}}
+        for songInd, songName in enumerate(songData['song']):
+            songNotes, songTypeText, songPower = getSongDetails(songInd)
+            songStoreData['songs'][songName] = {'notes': songNotes, 'type': songTypeText,
+                                                'power': songPower}
+        app.layout.children.append(dcc.Store(id = 'songStore', data = songStoreData))
+        
+        #Create the clientside callback for figure
+        app.clientside_callback(
+            ClientsideFunction(namespace = 'zelda', function_name = 'songUpdate'),
+            Output(component_id = 'songGraph', component_property = 'figure'),
+            Output(component_id = 'songTypeText', component_property = 'children'),
+            Output(component_id = 'songPowerText', component_property = 'children'),
+            [Input(component_id = 'songDropDown', component_property = 'value')],
+            [State(component_id = 'songStore', component_property = 'data')])
+        
+    else:
+        
+        #Create the song graph once in the layout with a slot for each note
+        songFigure = createSongSlotsFigure(imageUrls)
+        app.layout['songGraph'].figure = json.loads(songFigure.to_json())
+        slotOffset = len(createStaffFigure(imageUrls).layout.images)
+        
+        #Store the song shown on the page, so only the slots that change are sent
+        app.layout.children.append(dcc.Store(id = 'songShown'))
+        
+        #Get the slots and text for every song once at startup
+        buttonImg = getButtonImages(imageUrls)
+        songSlots = {}
+        for songInd, songName in enumerate(songData['song']):
+            songNotes, songTypeText, songPower = getSongDetails(songInd)
+            songSlots[songName] = (getSongSlots(songNotes, buttonImg), songTypeText, songPower)
+        
+        #Create the app callback for figure
+        @app.callback(Output(component_id = 'songGraph', component_property = 'figure'),
+                      Output(component_id = 'songTypeText', component_property = 'children'),
+                      Output(component_id = 'songPowerText', component_property = 'children'),
+                      Output(component_id = 'songShown', component_property = 'data'),
+                      [Input(component_id = 'songDropDown', component_property = 'value')],
+                      [State(component_id = 'songShown', component_property = 'data')])
+        
+        #Define function to update the song graph notes, song type text and song power
+        def graph_update(songDropDownValue, songShownValue):
+            
+            #Don't update if the dropdown has been cleared
+            if songDropDownValue not in songSlots:
+                raise PreventUpdate
+            
+            #Set the note images that differ from the song shown
+            #Only these properties are sent, and the staff isn't redrawn
+            newSlots, songTypeText, songPower = songSlots[songDropDownValue]
+            shownSlots = songSlots[songShownValue][0] if songShownValue in songSlots else None
+            songPatch = dash.Patch()
+            for slotInd, imageProperty, value in diffSongSlots(shownSlots, newSlots):
+                songPatch['layout']['images'][slotOffset + slotInd][imageProperty] = value
+            
+            return songPatch, songTypeText, songPower, songDropDownValue
+
+# %% Build map layer
+
+#Function to composite the static images of the map into the background image
+def buildAppMapLayer(assetsDir = assetsDir, extraFormats = ()):
+    """
+    assetsDir: Dash assets folder to save the map layer to (default = the app's)
+    extraFormats: other image formats to save, e.g. ['avif'] (default = none)
+    
+    Returns the map layer details from buildMapLayer.
+    
+    """
+    
+    mapReferenceHeight = mapReferenceWidth * mapFig_heightToWidth
+    return buildMapLayer(
+        os.path.join(appDir, 'img'), assetsDir,
+        (round(linkImg_ratioWidth + mapImgSize[0]), mapImgSize[1]),
+        createMapImages(songData, 'images'),
+        markers = getMapPaperPoints(songData),
+        markerStyle = {'size': songPointSize / mapReferenceHeight, 'lineWidth': 2 / mapReferenceHeight,
+                       'colour': 'white', 'lineColour': '#373f87'},
+        displayWidth = mapFigRelWidth / 100,
+        extraFormats = extraFormats)
+
+#Build the map layer once on import, so the images are shared by all of the apps
+if mapLayerMode != 'composite':
+    mapLayer = None
+elif assetBundle is not None:
+    mapLayer = assetBundle['mapLayer']
+else:
+    mapLayer = buildAppMapLayer()
+
+# %% Create app
+
+#Function to create the Dash app
+def createApp(callbackMode = callbackMode, markerMode = markerMode):
+    """
+    callbackMode: 'server' or 'clientside' song selection (default = the
+        ZELDA_CALLBACK_MODE environment variable, or 'server')
+    markerMode: 'images', 'webgl' or 'auto' map markers (default = the
+        ZELDA_MARKER_MODE environment variable, or 'auto')
+    
+    Returns the Dash app. The song data and image assets are shared between
+    apps, so only the figures, layout and callback are created here.
+    
+    """
+    
+    #Create the app
+    #Responses are compressed when Flask-Compress is installed
+    app = dash.Dash(__name__, assets_folder = assetsDir,
+                    compress = importlib.util.find_spec('flask_compress') is not None,
+                    title = 'Legend of Zelda Ocarina of Time Songs')
+    
+    #Let browsers cache the assets, as the image urls change with their contents
+    app.server.config['SEND_FILE_MAX_AGE_DEFAULT'] = assetMaxAge
+    
+    #Get the image urls for the app
+    imageUrls = getImageUrls(app)
+    
+    #Create the layout and callback
+    app.layout = createLayout(createMapFigure(imageUrls, markerMode, mapLayer = mapLayer), mapLayer)
+    registerCallbacks(app, imageUrls, callbackMode)
+    
+    return app
+
+#Create the app and the WSGI server (e.g. for gunicorn app:server)
+app = createApp()
+server = app.server
 
-#Run app
-if __name__ == '__main__': 
-    app.run_server()  
+#Run app with the development server
+if __name__ == '__main__':
+    if hasattr(app, 'run'):
+        app.run()
+    else:
+        app.run_server()
 
-# %%% ----- End of app.py -----
\ No newline at end of file
+# %%% ----- End of app.py -----
@@ -0,0 +1,45 @@
+/*
+    Clientside callback for the song selection in the Zelda Dash app.
+
+    Builds the song graph, song type and song power from the song table held
+    in the songStore, placing the note images the same way as
+    createNoteImages in app.py.
+*/
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    zelda: {
+        songUpdate: function(songName, songStore) {
+
+            //Don't update if the dropdown has been cleared
+            if (!songName || !(songName in songStore.songs)) {
+                throw window.dash_clientside.PreventUpdate;
+            }
+
+            //Get the song details
+            var song = songStore.songs[songName];
+            var noteLayout = songStore.noteLayout;
+
+            //Create the note images
+            var noteImages = song.notes.map(function(note, noteInd) {
+                return {
+                    source: songStore.buttonSources[note],
+                    xref: 'paper', yref: 'paper',
+                    x: noteLayout.x0 + noteInd * noteLayout.xStep,
+                    y: songStore.buttonY[note],
+                    sizex: noteLayout.size,
+                    sizey: noteLayout.size,
+                    xanchor: 'center', yanchor: 'middle',
+                    layer: 'above'
+                };
+            });
+
+            //Add the notes to a copy of the staff figure
+            var staffFigure = songStore.staffFigure;
+            var layout = Object.assign({}, staffFigure.layout, {
+                images: (staffFigure.layout.images || []).concat(noteImages)
+            });
+
+            return [{data: staffFigure.data, layout: layout}, song.type, song.power];
+        }
+    }
+});
@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+"""
+
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Script to build the deployment bundle of the Zelda Dash app from the
+    files in this folder, so there is no hand copied version of the app to
+    keep up to date. The bundle has:
+        - app.py, zelda_assets.py, gunicorn.conf.py and the song data, plus
+          the shared file_hash.py helper from the data_viz folder
+        - the deployment files from heroku-files (Procfile, requirements.txt,
+          runtime.txt and .gitignore)
+        - the resized images and composited map layer in WebP and JPEG/PNG,
+          plus AVIF when Pillow supports it
+        - the fonts subset to the characters used on the page
+        - content hashed file names for the assets, so they can be cached
+          for a long time, with their details in assets/bundle.json for the
+          app to load instead of building the images when it starts
+        - gzip (and brotli, if the brotli package is installed) copies of the
+          text assets for a static file server or CDN in front of the app
+
+    The transfer size of the assets before and after is reported.
+
+    Usage (from this folder):
+        python build_bundle.py --output bundle
+
+"""
+
+# %% Import packages
+
+import os
+import re
+import json
+import gzip
+import shutil
+import string
+import argparse
+from PIL import features
+from dash import dcc
+import app as zeldaApp
+from zelda_assets import buildImageAssets
+from file_hash import fileHash
+
+# %% Define functions
+
+#Set the app and deployment files copied to the bundle
+appFiles = ['app.py', 'zelda_assets.py', 'gunicorn.conf.py', os.path.join('data', 'songData.csv')]
+deployFiles = ['Procfile', 'requirements.txt', 'runtime.txt', '.gitignore']
+sharedFiles = ['file_hash.py']
+
+#Set the asset types that are pre-compressed
+compressTypes = ['.css', '.js', '.json', '.svg', '.ttf', '.otf']
+
+#Function to get the text shown on the page
+def getPageText(component):
+    """
+    component: Dash component (or text) from the app layout
+
+    Returns a set of the characters in the text and dropdown options of the
+    component and its children.
+
+    """
+
+    if component is None:
+        return set()
+    elif isinstance(component, str):
+        return set(component)
+    elif isinstance(component, (list, tuple)):
+        return set().union(*[getPageText(child) for child in component])
+    elif isinstance(component, dcc.Dropdown):
+        return set().union(*[getPageText(option['label'] if isinstance(option, dict) else option)
+                             for option in component.options])
+
+    return getPageText(getattr(component, 'children', None))
+
+#Function to get the characters used on the page
+def getPageCharacters(layout):
+    """
+    layout: app layout from createLayout
+
+    Returns a string of the characters in the layout, the song details shown
+    by the callback and the printable ASCII characters (to be safe).
+
+    """
+
+    pageCharacters = getPageText(layout) | set(string.printable.strip()) | {' '}
+    for songColumn in ['song', 'songType', 'power']:
+        pageCharacters |= set(''.join(zeldaApp.songData[songColumn].astype(str)))
+
+    return ''.join(sorted(pageCharacters))
+
+#Function to subset a font to a set of characters
+def subsetFont(fontFile, outFile, characters):
+    """
+    fontFile: font to subset
+    outFile: file to save the subset font to
+    characters: string of the characters to keep
+
+    Returns True if the font was subset, or False if fontTools isn't
+    installed and the font was copied as is.
+
+    """
+
+    #Check for fontTools
+    try:
+        from fontTools import subset
+    except ImportError:
+        shutil.copy(fontFile, outFile)
+        return False
+
+    #Subset the font
+    options = subset.Options()
+    options.name_IDs = ['*']
+    options.notdef_outline = True
+    font = subset.load_font(fontFile, options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(text = characters)
+    subsetter.subset(font)
+    subset.save_font(font, outFile, options)
+
+    return True
+
+#Function to add the content hash to the asset file names
+def hashAssetNames(assetsDir, hashLength = 10):
+    """
+    assetsDir: assets folder of the bundle
+    hashLength: number of characters of the hash to use (default = 10)
+
+    Returns a dictionary of the new path of each asset (relative to the
+    assets folder). The stylesheets are renamed last, after the urls in them
+    are changed to the new names of the images and fonts.
+
+    """
+
+    #Get the asset files, with the stylesheets last
+    assetFiles = sorted([os.path.relpath(os.path.join(currentDir, fileName), assetsDir).replace(os.sep, '/')
+                         for currentDir, _, fileNames in os.walk(assetsDir) for fileName in fileNames],
+                        key = lambda assetFile: (assetFile.endswith('.css'), assetFile))
+
+    #Rename each file
+    hashedNames = {}
+    for assetFile in assetFiles:
+        assetPath = os.path.join(assetsDir, assetFile)
+
+        #Change the urls in stylesheets to the renamed files (without the
+        #version, as the name now changes with the contents)
+        if assetFile.endswith('.css'):
+            cssDir = os.path.dirname(assetFile)
+            def replaceUrl(match):
+                urlFile = os.path.normpath(os.path.join(cssDir, match.group(2))).replace(os.sep, '/')
+                if urlFile not in hashedNames:
+                    return match.group(0)
+                return f"url('{os.path.relpath(hashedNames[urlFile], cssDir or '.').replace(os.sep, '/')}')"
+            with open(assetPath, 'r', encoding = 'utf-8') as inFile:
+                cssText = inFile.read()
+            cssText = re.sub(r"""url\((['"]?)([^'")?]+)(\?[^'")]*)?\1\)""", replaceUrl, cssText)
+            with open(assetPath, 'w', encoding = 'utf-8') as outFile:
+                outFile.write(cssText)
+
+        #Add the hash to the name
+        baseName, ext = os.path.splitext(assetFile)
+        hashedNames[assetFile] = f'{baseName}.{fileHash(assetPath)[0:hashLength]}{ext}'
+        os.replace(assetPath, os.path.join(assetsDir, hashedNames[assetFile]))
+
+    return hashedNames
+
+#Function to save pre-compressed copies of a file
+def compressFile(filePath):
+    """
+    filePath: file to compress
+
+    Returns a dictionary of the size (bytes) of the file and each compressed
+    copy saved. Copies that aren't smaller than the file aren't kept.
+
+    """
+
+    #Read the file
+    with open(filePath, 'rb') as inFile:
+        fileData = inFile.read()
+    sizes = {'raw': len(fileData)}
+
+    #Compress with gzip (with a fixed time so the output is repeatable)
+    compressedData = {'gz': gzip.compress(fileData, compresslevel = 9, mtime = 0)}
+
+    #Compress with brotli if it's installed
+    try:
+        import brotli
+        compressedData['br'] = brotli.compress(fileData, quality = 11)
+    except ImportError:
+        pass
+
+    #Save the copies that are smaller
+    for encoding, data in compressedData.items():
+        if len(data) < len(fileData):
+            with open(f'{filePath}.{encoding}', 'wb') as outFile:
+                outFile.write(data)
+            sizes[encoding] = len(data)
+
+    return sizes
+
+#Function to build the deployment bundle
+def buildBundle(outputDir = 'bundle'):
+    """
+    outputDir: folder to build the bundle in (default = 'bundle'). An earlier
+        bundle in the folder is replaced.
+
+    Returns a list of (asset, sizeBefore, sizeAfter) in bytes, where the size
+    before is of the source file and the size after is of the smallest
+    version a browser would download.
+
+    """
+
+    #Clear an earlier bundle, checking it is one before deleting it
+    if os.path.exists(outputDir):
+        if not os.path.exists(os.path.join(outputDir, 'assets', 'bundle.json')):
+            raise ValueError(f'{outputDir} exists and is not a bundle from build_bundle.py.')
+        shutil.rmtree(outputDir)
+    bundleAssetsDir = os.path.join(outputDir, 'assets')
+    os.makedirs(os.path.join(outputDir, 'data'))
+
+    #Copy the app and deployment files
+    for appFile in appFiles:
+        shutil.copy(os.path.join(zeldaApp.appDir, appFile), os.path.join(outputDir, appFile))
+    for deployFile in deployFiles:
+        shutil.copy(os.path.join(zeldaApp.appDir, 'heroku-files', deployFile), os.path.join(outputDir, deployFile))
+    for sharedFile in sharedFiles:
+        shutil.copy(os.path.join(zeldaApp.appDir, '..', '..', sharedFile), os.path.join(outputDir, sharedFile))
+
+    #Build the images and map layer in the bundle, adding AVIF if it's supported
+    extraFormats = ['avif'] if features.check('avif') else []
+    imageAssets = buildImageAssets(os.path.join(zeldaApp.appDir, 'img'), bundleAssetsDir,
+                                   extraFormats = extraFormats)
+    mapLayer = zeldaApp.buildAppMapLayer(bundleAssetsDir, extraFormats = extraFormats)
+    os.remove(os.path.join(bundleAssetsDir, 'img', 'manifest.json'))
+
+    #Copy the stylesheets and scripts, and subset the fonts to the page text
+    layout = zeldaApp.createLayout(zeldaApp.createMapFigure(zeldaApp.getImageUrls(zeldaApp.app)))
+    pageCharacters = getPageCharacters(layout)
+    fontsSubset = []
+    for assetFile in sorted(os.listdir(zeldaApp.assetsDir)):
+        assetPath = os.path.join(zeldaApp.assetsDir, assetFile)
+        if os.path.splitext(assetFile)[-1].lower() in ['.ttf', '.otf']:
+            fontsSubset.append(subsetFont(assetPath, os.path.join(bundleAssetsDir, assetFile),
+                                          pageCharacters))
+        elif os.path.splitext(assetFile)[-1].lower() in ['.css', '.js']:
+            shutil.copy(assetPath, os.path.join(bundleAssetsDir, assetFile))
+    if not all(fontsSubset):
+        print('fontTools is not installed, so the fonts were copied without subsetting.')
+
+    #Add the content hashes to the asset names
+    hashedNames = hashAssetNames(bundleAssetsDir)
+
+    #Save the asset details for the app, with the hash as the version
+    bundleImages = {}
+    for imgName, imageAsset in imageAssets.items():
+        bundleImages[imgName] = {imageFormat: hashedNames[assetFile] for imageFormat, assetFile in imageAsset.items()
+                                 if imageFormat not in ['size', 'version']}
+        bundleImages[imgName]['size'] = list(imageAsset['size'])
+        bundleImages[imgName]['version'] = hashedNames[imageAsset['webp']].split('.')[-2]
+    bundleMapLayer = dict(mapLayer, css = hashedNames[mapLayer['css']],
+                          aspectRatio = list(mapLayer['aspectRatio']))
+    with open(os.path.join(bundleAssetsDir, 'bundle.json'), 'w') as outFile:
+        json.dump({'images': bundleImages, 'mapLayer': bundleMapLayer}, outFile, indent = 2, sort_keys = True)
+
+    #Pre-compress the text assets
+    compressedSizes = {}
+    for assetFile, hashedName in hashedNames.items():
+        if os.path.splitext(assetFile)[-1].lower() in compressTypes:
+            compressedSizes[assetFile] = compressFile(os.path.join(bundleAssetsDir, hashedName))
+
+    #Get the size of each asset before and after
+    def bundleSize(assetFile):
+        if assetFile in compressedSizes:
+            return min(compressedSizes[assetFile].values())
+        return os.path.getsize(os.path.join(bundleAssetsDir, hashedNames[assetFile]))
+    assetSizes = []
+    for imgName, imageAsset in imageAssets.items():
+        assetSizes.append((f'img/{imgName}', os.path.getsize(os.path.join(zeldaApp.appDir, 'img', imgName)),
+                           min([bundleSize(imageAsset[imageFormat]) for imageFormat in ['webp'] + extraFormats])))
+    for width in mapLayer['widths']:
+        assetSizes.append((f'map layer ({width}px)', 0,
+                           min([bundleSize(f'img/map_layer_{width}.{imageFormat}') for imageFormat in ['webp'] + extraFormats])))
+    for assetFile in sorted(os.listdir(zeldaApp.assetsDir)):
+        if assetFile in hashedNames:
+            assetSizes.append((assetFile, os.path.getsize(os.path.join(zeldaApp.assetsDir, assetFile)), bundleSize(assetFile)))
+
+    return assetSizes
+
+# %% Build bundle
+
+if __name__ == '__main__':
+
+    #Get the output folder
+    parser = argparse.ArgumentParser(description = 'Build the deployment bundle of the Zelda Dash app.')
+    parser.add_argument('--output', default = 'bundle', help = 'folder to build the bundle in')
+    args = parser.parse_args()
+
+    #Build the bundle
+    assetSizes = buildBundle(args.output)
+
+    #Report the transfer sizes
+    print(f'{"asset":<32}{"before (kB)":>14}{"after (kB)":>14}')
+    for assetName, sizeBefore, sizeAfter in assetSizes:
+        print(f'{assetName:<32}{sizeBefore / 1e3:>14.1f}{sizeAfter / 1e3:>14.1f}')
+    totalBefore = sum([assetSize[1] for assetSize in assetSizes])
+    totalAfter = sum([assetSize[2] for assetSize in assetSizes])
+    print(f'{"total":<32}{totalBefore / 1e3:>14.1f}{totalAfter / 1e3:>14.1f}')
+    print('The map layer is new (before = 0), and only one of its widths is loaded for each screen size.')
+    print(f'Built the bundle in {args.output}.')
+
+# %%% ----- End of build_bundle.py -----
@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+"""
+
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Script to export the Zelda Dash app as a static website. The app only
+    ever shows the dozen songs in songData.csv, so the page layout, the map
+    figure and the song figure, type and power of every song are rendered
+    ahead of time. The output folder has an index.html page, a JSON file per
+    song and the assets, and a small script switches between the songs with
+    plotly.js, so it can be served by any static file server without Python.
+
+    Usage (from this folder):
+        python export_static.py --output static_site
+
+    The song files are loaded with fetch, so the page needs to be served
+    (e.g. python -m http.server -d static_site) rather than opened directly.
+
+    The fonts are subset to the characters on the page (as in the deployment
+    bundle), and plotly.js is loaded from the plotly CDN using the smallest
+    partial bundle with the trace types of the figures. A full local copy is
+    included as a fallback if the CDN can't be reached, or used on its own
+    with --plotly local.
+
+"""
+
+# %% Import packages
+
+import os
+import re
+import json
+import html as htmlText
+import shutil
+import argparse
+import plotly
+from plotly.offline import get_plotlyjs_version
+from dash import dcc
+import app as zeldaApp
+from build_bundle import getPageCharacters, subsetFont
+
+# %% Define functions
+
+#Set the page template
+pageTemplate = '''<!DOCTYPE html>
+<html lang="en">
+    <head>
+        <meta charset="utf-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1">
+        <title>{title}</title>
+{styleSheets}
+{plotlyScripts}
+    </head>
+    <body>
+{body}
+        <script>
+            var staticFigures = {figures};
+            var initialSong = {initialSong};
+{switcher}
+        </script>
+    </body>
+</html>
+'''
+
+#Set the trace types in each of the plotly.js partial bundles, smallest first
+#See https://github.com/plotly/plotly.js/blob/master/dist/README.md
+plotlyBundles = {'basic': {'bar', 'pie', 'scatter'},
+                 'cartesian': {'bar', 'box', 'contour', 'heatmap', 'histogram', 'histogram2d',
+                               'histogram2dcontour', 'image', 'pie', 'scatter', 'scatterternary',
+                               'violin'}}
+
+#Set the script to load the local copy of plotly.js if the CDN can't be reached
+plotlyFallback = '''        <script>window.Plotly || document.write('<script src="assets/plotly.min.js"><\\/script>');</script>'''
+
+#Set the script to draw the figures and switch between songs
+switcherScript = '''
+            //Draw the static figures
+            var plotConfig = {responsive: true, displayModeBar: false};
+            Object.keys(staticFigures).forEach(function(graphId) {
+                Plotly.newPlot(graphId, staticFigures[graphId].data, staticFigures[graphId].layout, plotConfig);
+            });
+
+            //Show a song in the song graph and text
+            var songCache = {};
+            function showSong(song) {
+                songCache[song.file] = song;
+                Plotly.react('songGraph', song.figure.data, song.figure.layout, plotConfig);
+                document.getElementById('songTypeText').textContent = song.type;
+                document.getElementById('songPowerText').textContent = song.power;
+            }
+            showSong(initialSong);
+
+            //Load the song file when a song is selected
+            var songDropDown = document.getElementById('songDropDown');
+            songDropDown.addEventListener('change', function() {
+                var songFile = songDropDown.options[songDropDown.selectedIndex].dataset.file;
+                if (songFile in songCache) {
+                    showSong(songCache[songFile]);
+                } else {
+                    fetch(songFile).then(function(response) {
+                        return response.json();
+                    }).then(showSong);
+                }
+            });
+'''
+
+#Function to convert a style dictionary to CSS
+def styleToCss(style):
+    return '; '.join([f'{re.sub("([A-Z])", lambda match: "-" + match.group(1).lower(), key)}: {value}'
+                      for key, value in style.items()])
+
+#Function to render a Dash component as static HTML
+def renderComponent(component, figures, songFiles, indent = 2):
+    """
+    component: Dash component (or text) to render
+    figures: dictionary to add the figure of each graph to, by graph id
+    songFiles: dictionary of the song file for each song name, used for the
+        dropdown options
+    indent: indent level of the component (default = 2)
+
+    Returns the HTML of the component. Graphs are rendered as empty divs that
+    are drawn by plotly.js, dropdowns as select elements and stores are left
+    out. Only the html components and properties used by the app layout are
+    supported.
+
+    """
+
+    #Render text and lists of components
+    padding = ' ' * 4 * indent
+    if component is None:
+        return ''
+    elif isinstance(component, str):
+        return padding + htmlText.escape(component)
+    elif isinstance(component, (list, tuple)):
+        return '\n'.join([renderComponent(child, figures, songFiles, indent) for child in component])
+
+    #Get the attributes of the element
+    attributes = ''
+    componentId = getattr(component, 'id', None)
+    if isinstance(component, dcc.Graph) and componentId is None:
+        componentId = f'graph{len(figures)}'
+    if componentId is not None:
+        attributes += f' id="{htmlText.escape(componentId)}"'
+    if getattr(component, 'className', None) is not None:
+        attributes += f' class="{htmlText.escape(component.className)}"'
+    if getattr(component, 'style', None) is not None:
+        attributes += f' style="{htmlText.escape(styleToCss(component.style))}"'
+
+    #Render the component
+    if isinstance(component, dcc.Store):
+        return ''
+    elif isinstance(component, dcc.Graph):
+        if getattr(component, 'figure', None) is not None:
+            figures[componentId] = component.figure
+        return f'{padding}<div{attributes}></div>'
+    elif isinstance(component, dcc.Dropdown):
+        options = []
+        for option in component.options:
+            optionValue = option['value'] if isinstance(option, dict) else option
+            optionLabel = option['label'] if isinstance(option, dict) else option
+            selected = ' selected' if optionValue == getattr(component, 'value', None) else ''
+            options.append(f'{padding}    <option value="{htmlText.escape(optionValue)}" '
+                           f'data-file="{songFiles[optionValue]}"{selected}>{htmlText.escape(optionLabel)}</option>')
+        return f'{padding}<select{attributes}>\n' + '\n'.join(options) + f'\n{padding}</select>'
+    else:
+        tag = component._type.lower()
+        children = renderComponent(getattr(component, 'children', None), figures, songFiles, indent + 1)
+        return f'{padding}<{tag}{attributes}>\n{children}\n{padding}</{tag}>'
+
+#Function to get the smallest plotly.js bundle with the trace types of the figures
+def getPlotlyBundle(figures):
+    """
+    figures: list of figure dictionaries
+
+    Returns the name of the partial bundle, or None if the full bundle is
+    needed (e.g. for the WebGL markers).
+
+    """
+
+    #Get the trace types (scatter by default)
+    traceTypes = {trace.get('type', 'scatter') for figure in figures for trace in figure.get('data', [])}
+
+    #Find the first bundle with all of the trace types
+    for bundleName, bundleTypes in plotlyBundles.items():
+        if traceTypes <= bundleTypes:
+            return bundleName
+
+    return None
+
+#Function to get the script elements that load plotly.js
+def getPlotlyScripts(bundleName, plotlySource = 'cdn'):
+    """
+    bundleName: name of the partial bundle from getPlotlyBundle (or None)
+    plotlySource: 'cdn' to load plotly.js from the plotly CDN with the local
+        copy as a fallback, or 'local' to only use the local copy
+        (default = 'cdn')
+
+    """
+
+    #Use the local copy
+    localScript = '        <script src="assets/plotly.min.js"></script>'
+    if plotlySource == 'local':
+        return localScript
+
+    #Use the CDN with the same version as the local copy
+    bundlePrefix = 'plotly' if bundleName is None else f'plotly-{bundleName}'
+    cdnUrl = f'https://cdn.plot.ly/{bundlePrefix}-{get_plotlyjs_version()}.min.js'
+
+    return f'        <script src="{cdnUrl}"></script>\n{plotlyFallback}'
+
+#Function to convert an object to JSON for a script element
+def scriptJson(obj):
+    return json.dumps(obj).replace('</', '<\\/')
+
+#Function to export the app as a static website
+def exportStatic(outputDir = 'static_site', plotlySource = 'cdn'):
+    """
+    outputDir: folder to save the website to (default = 'static_site')
+    plotlySource: 'cdn' or 'local' plotly.js, see getPlotlyScripts
+        (default = 'cdn')
+
+    Returns a dictionary with the number of songs exported, the total size
+    (bytes) of the website, the size without the local copy of plotly.js and
+    the plotly.js bundle used.
+
+    """
+
+    #Create the output folders
+    outAssetsDir = os.path.join(outputDir, 'assets')
+    outSongsDir = os.path.join(outputDir, 'songs')
+    os.makedirs(outSongsDir, exist_ok = True)
+
+    #Copy the app assets and plotly.js
+    #The Dash callback script isn't needed on the static page, and the fonts
+    #are subset below
+    shutil.copytree(zeldaApp.assetsDir, outAssetsDir, dirs_exist_ok = True,
+                    ignore = shutil.ignore_patterns('*.js', 'manifest.json', '*.ttf', '*.otf'))
+    plotlyFile = os.path.join(outAssetsDir, 'plotly.min.js')
+    shutil.copy(os.path.join(os.path.dirname(plotly.__file__), 'package_data', 'plotly.min.js'),
+                plotlyFile)
+
+    #Get the image urls relative to the page
+    imageUrls = {imgName: f'assets/{imageAsset["webp"]}?v={imageAsset["version"]}'
+                 for imgName, imageAsset in zeldaApp.imageAssets.items()}
+
+    #Save the outputs of each song
+    songFiles = {}
+    songs = {}
+    for songInd, songName in enumerate(zeldaApp.songData['song']):
+        songFigure, songTypeText, songPower = zeldaApp.createSongOutputs(songInd, imageUrls)
+        songFiles[songName] = f'songs/song{songInd + 1:02d}.json'
+        songs[songName] = {'file': songFiles[songName], 'figure': songFigure,
+                           'type': songTypeText, 'power': songPower}
+        with open(os.path.join(outputDir, songFiles[songName]), 'w') as outFile:
+            json.dump(songs[songName], outFile, separators = (',', ':'))
+
+    #Render the layout
+    layout = zeldaApp.createLayout(zeldaApp.createMapFigure(imageUrls, zeldaApp.markerMode,
+                                                            mapLayer = zeldaApp.mapLayer),
+                                   zeldaApp.mapLayer)
+    figures = {}
+    body = renderComponent(layout, figures, songFiles)
+    figures = {graphId: json.loads(figure.to_json()) if hasattr(figure, 'to_json') else figure
+               for graphId, figure in figures.items()}
+
+    #Subset the fonts to the characters on the page
+    pageCharacters = getPageCharacters(layout)
+    for assetFile in sorted(os.listdir(zeldaApp.assetsDir)):
+        if os.path.splitext(assetFile)[-1].lower() in ['.ttf', '.otf']:
+            subsetFont(os.path.join(zeldaApp.assetsDir, assetFile), os.path.join(outAssetsDir, assetFile),
+                       pageCharacters)
+
+    #Get the plotly.js bundle for the figures
+    plotlyBundle = getPlotlyBundle(list(figures.values()) + [song['figure'] for song in songs.values()])
+
+    #Link the stylesheets in the same order as Dash
+    styleSheets = []
+    for currentDir, _, fileNames in sorted(os.walk(outAssetsDir)):
+        for fileName in sorted(fileNames):
+            if fileName.endswith('.css'):
+                cssPath = os.path.relpath(os.path.join(currentDir, fileName), outputDir).replace(os.sep, '/')
+                styleSheets.append(f'        <link rel="stylesheet" href="{cssPath}">')
+
+    #Save the page with the first song included
+    initialSong = songs[layout['songDropDown'].value]
+    with open(os.path.join(outputDir, 'index.html'), 'w', encoding = 'utf-8') as outFile:
+        outFile.write(pageTemplate.format(title = 'Legend of Zelda Ocarina of Time Songs',
+                                          styleSheets = '\n'.join(styleSheets),
+                                          plotlyScripts = getPlotlyScripts(plotlyBundle, plotlySource),
+                                          body = body,
+                                          figures = scriptJson(figures),
+                                          initialSong = scriptJson(initialSong),
+                                          switcher = switcherScript))
+
+    #Remove the images the page doesn't use, such as the fallback formats (the
+    #browsers that run the page all support WebP) and the map images that are
+    #already in the map layer
+    siteText = ''
+    for currentDir, _, fileNames in os.walk(outputDir):
+        for fileName in fileNames:
+            if os.path.splitext(fileName)[-1] in ['.html', '.json', '.css']:
+                with open(os.path.join(currentDir, fileName), 'r', encoding = 'utf-8') as inFile:
+                    siteText += inFile.read()
+    outImgDir = os.path.join(outAssetsDir, 'img')
+    for imgFile in os.listdir(outImgDir):
+        if not imgFile.endswith('.css') and imgFile not in siteText:
+            os.remove(os.path.join(outImgDir, imgFile))
+
+    #Get the size of the website
+    siteSize = sum([os.path.getsize(os.path.join(currentDir, fileName))
+                    for currentDir, _, fileNames in os.walk(outputDir) for fileName in fileNames])
+
+    return {'nSongs': len(songs), 'size': siteSize,
+            'sizeWithoutPlotly': siteSize - os.path.getsize(plotlyFile),
+            'plotlyBundle': plotlyBundle or 'full'}
+
+# %% Export website
+
+if __name__ == '__main__':
+
+    #Get the output folder
+    parser = argparse.ArgumentParser(description = 'Export the Zelda Dash app as a static website.')
+    parser.add_argument('--output', default = 'static_site', help = 'folder to save the website to')
+    parser.add_argument('--plotly', default = 'cdn', choices = ['cdn', 'local'],
+                        help = 'load plotly.js from the CDN (with a local fallback) or only the local copy')
+    args = parser.parse_args()
+
+    #Export the website
+    exportSummary = exportStatic(args.output, args.plotly)
+    print(f'Exported {exportSummary["nSongs"]} songs to {args.output} ({exportSummary["size"] / 1e6:.1f} MB, '
+          f'{exportSummary["sizeWithoutPlotly"] / 1e6:.1f} MB without the local plotly.js).')
+    if args.plotly == 'cdn':
+        print(f'plotly.js is loaded from the CDN ({exportSummary["plotlyBundle"]} bundle).')
+
+# %%% ----- End of export_static.py -----
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    gunicorn settings for running the Zelda Dash app in production. Run from
+    this folder with:
+        gunicorn -c gunicorn.conf.py
+
+    The app is preloaded in the master process before the workers are forked,
+    so the song data, image assets and cached song figures are only built
+    once and shared between the workers. The song callback is a lookup of a
+    cached figure, so each worker runs a few threads to serve the callbacks
+    and asset requests alongside each other.
+
+    Settings can be changed with the environment variables:
+        PORT: port to listen on (default = 8050)
+        WEB_CONCURRENCY: number of worker processes (default = 2 per CPU, up to 4)
+        GUNICORN_THREADS: number of threads per worker (default = 4)
+        GUNICORN_TIMEOUT: worker timeout in seconds (default = 30)
+
+"""
+
+# %% Import packages
+
+import os
+import multiprocessing
+
+# %% Settings
+
+#Set the WSGI app
+wsgi_app = 'app:server'
+
+#Set the address to listen on
+bind = f'0.0.0.0:{os.environ.get("PORT", "8050")}'
+
+#Load the app before forking the workers
+preload_app = True
+
+#Set the number of workers and threads
+workers = int(os.environ.get('WEB_CONCURRENCY', min(2 * multiprocessing.cpu_count(), 4)))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+
+#Set the timeouts
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+keepalive = 5
+
+#Log requests to stdout
+accesslog = '-'
+
+# %%% ----- End of gunicorn.conf.py -----
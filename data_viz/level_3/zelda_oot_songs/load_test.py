@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""
+
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Load test for the Zelda Dash app. A number of simulated users run at the
+    same time, each loading the page and app layout and then selecting every
+    song in the dropdown (one _dash-update-component request per song). The
+    latency percentiles, throughput and payload size of each request type
+    are reported and can be saved to a JSON file to compare runs, such as
+    before and after a change to graph_update.
+
+    The app needs to be running first, with either the development server:
+        python app.py
+    or the production settings:
+        gunicorn -c gunicorn.conf.py
+    and then the test is run with e.g.:
+        python load_test.py --users 20 --repeats 5 --output results.json
+        python load_test.py --users 20 --repeats 5 --compare results.json
+
+    Note that in the clientside callback mode the songs are selected in the
+    browser, so only the page and layout requests are tested.
+
+"""
+
+# %% Import packages
+
+import argparse
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import requests
+
+# %% Define functions
+
+#Set the percentiles to report
+reportPercentiles = [50, 95, 99]
+
+#Function to find a component in the app layout
+def findComponent(layout, componentId):
+    """
+    layout: app layout from the _dash-layout request
+    componentId: id of the component to find
+
+    Returns the component dictionary, or None if it isn't found.
+
+    """
+
+    #Search through the component and its children
+    if isinstance(layout, dict):
+        if layout.get('props', {}).get('id') == componentId:
+            return layout
+        children = layout.get('props', {}).get('children')
+        return findComponent(children, componentId) if children is not None else None
+    elif isinstance(layout, list):
+        for child in layout:
+            component = findComponent(child, componentId)
+            if component is not None:
+                return component
+
+    return None
+
+#Function to create the song update request bodies from the app dependencies
+def createSongRequests(dependencies, songNames, inputId = 'songDropDown', shownId = 'songShown'):
+    """
+    dependencies: callback list from the _dash-dependencies request
+    songNames: list of the songs to select
+    inputId: id of the dropdown the callback uses (default = 'songDropDown')
+    shownId: id of the store of the song shown, if the callback has it as a
+        state (default = 'songShown')
+
+    Returns a list of request bodies for the server callback of each song.
+    The list is empty if the callback is run in the browser. The song shown
+    is set to the song before, as when a user selects the songs in order.
+
+    """
+
+    #Get the server callback with the dropdown as input
+    callbacks = [callback for callback in dependencies
+                 if callback.get('clientside_function') is None and
+                 any([callbackInput['id'] == inputId for callbackInput in callback['inputs']])]
+    if len(callbacks) == 0:
+        return []
+    callback = callbacks[0]
+
+    #Get the outputs (multiple outputs are joined with '...')
+    outputList = callback['output'].strip('.').split('...')
+    outputs = [{'id': output.rsplit('.', 1)[0], 'property': output.rsplit('.', 1)[1]} for output in outputList]
+    if not callback['output'].startswith('..'):
+        outputs = outputs[0]
+
+    #Create the request body for each song
+    return [{'output': callback['output'],
+             'outputs': outputs,
+             'inputs': [{'id': inputId, 'property': 'value', 'value': songName}],
+             'state': [dict(state, value = songNames[songInd - 1] if state['id'] == shownId and songInd > 0 else None)
+                       for state in callback.get('state', [])],
+             'changedPropIds': [f'{inputId}.value']}
+            for songInd, songName in enumerate(songNames)]
+
+#Function to time a request
+def timeRequest(session, method, url, **kwargs):
+    """
+    session: requests session to use
+    method: 'GET' or 'POST'
+    url: url to request
+
+    Returns the latency (s), the size of the response as sent (bytes, which is
+    smaller than the content when it is compressed) and the size of the
+    content (bytes).
+
+    """
+
+    startTime = time.perf_counter()
+    response = session.request(method, url, **kwargs)
+    content = response.content
+    latency = time.perf_counter() - startTime
+    response.raise_for_status()
+
+    return latency, int(response.headers.get('Content-Length', len(content))), len(content)
+
+#Function to run the requests for one simulated user
+def runUser(baseUrl, songRequests, repeats, results, resultsLock):
+    """
+    baseUrl: url the app is served from
+    songRequests: list of the song update request bodies
+    repeats: number of times the user loads the page and selects each song
+    results: dictionary to add the (latency, sentBytes, contentBytes) of each
+        request type to
+    resultsLock: lock for adding to the results
+
+    """
+
+    #Use one session per user so connections are kept alive like a browser
+    with requests.Session() as session:
+        session.headers['Accept-Encoding'] = 'gzip, deflate, br'
+        userResults = {'page': [], 'layout': [], 'songUpdate': []}
+        for _ in range(repeats):
+
+            #Load the page and app layout
+            userResults['page'].append(timeRequest(session, 'GET', f'{baseUrl}/'))
+            userResults['layout'].append(timeRequest(session, 'GET', f'{baseUrl}/_dash-layout'))
+
+            #Select each song
+            for songRequest in songRequests:
+                userResults['songUpdate'].append(
+                    timeRequest(session, 'POST', f'{baseUrl}/_dash-update-component', json = songRequest))
+
+    #Add to the overall results
+    with resultsLock:
+        for requestType in userResults:
+            results[requestType].extend(userResults[requestType])
+
+#Function to summarise the results of a request type
+def summariseResults(requestResults, testDuration):
+    """
+    requestResults: list of (latency, sentBytes, contentBytes) for each request
+    testDuration: length of the test (s)
+
+    Returns a dictionary with the number of requests, throughput (requests/s),
+    latency percentiles (ms) and mean payload sizes (bytes).
+
+    """
+
+    #Check for requests
+    if len(requestResults) == 0:
+        return {'nRequests': 0}
+
+    #Get the summary
+    resultArray = np.array(requestResults, dtype = float)
+    summary = {'nRequests': len(requestResults),
+               'throughput': len(requestResults) / testDuration,
+               'meanMs': resultArray[:, 0].mean() * 1000}
+    for percentile in reportPercentiles:
+        summary[f'p{percentile}Ms'] = np.percentile(resultArray[:, 0], percentile) * 1000
+    summary['sentBytes'] = resultArray[:, 1].mean()
+    summary['contentBytes'] = resultArray[:, 2].mean()
+
+    return summary
+
+#Function to run the load test
+def runLoadTest(baseUrl = 'http://127.0.0.1:8050', nUsers = 10, repeats = 3):
+    """
+    baseUrl: url the app is served from (default = 'http://127.0.0.1:8050')
+    nUsers: number of simulated users running at the same time (default = 10)
+    repeats: number of times each user loads the page and selects each song
+        (default = 3)
+
+    Returns a dictionary with the test settings, the overall throughput and a
+    summary of each request type.
+
+    """
+
+    #Get the songs and callback details from the app
+    baseUrl = baseUrl.rstrip('/')
+    layout = requests.get(f'{baseUrl}/_dash-layout').json()
+    dependencies = requests.get(f'{baseUrl}/_dash-dependencies').json()
+    songNames = [option['value'] if isinstance(option, dict) else option
+                 for option in findComponent(layout, 'songDropDown')['props']['options']]
+    songRequests = createSongRequests(dependencies, songNames)
+    if len(songRequests) == 0:
+        print('No server callback found for the song dropdown (clientside mode), only testing the page and layout.')
+
+    #Run the users at the same time
+    results = {'page': [], 'layout': [], 'songUpdate': []}
+    resultsLock = threading.Lock()
+    startTime = time.perf_counter()
+    with ThreadPoolExecutor(max_workers = nUsers) as executor:
+        userRuns = [executor.submit(runUser, baseUrl, songRequests, repeats, results, resultsLock)
+                    for _ in range(nUsers)]
+        for userRun in userRuns:
+            userRun.result()
+    testDuration = time.perf_counter() - startTime
+
+    #Summarise the results
+    nRequests = sum([len(requestResults) for requestResults in results.values()])
+    return {'settings': {'baseUrl': baseUrl, 'nUsers': nUsers, 'repeats': repeats,
+                         'nSongs': len(songNames)},
+            'duration': testDuration,
+            'throughput': nRequests / testDuration,
+            'requests': {requestType: summariseResults(results[requestType], testDuration)
+                         for requestType in results}}
+
+#Function to print the load test results
+def printResults(testResults, compareResults = None):
+    """
+    testResults: results from runLoadTest
+    compareResults: earlier results to compare against (default = None)
+
+    """
+
+    #Print the overall results
+    settings = testResults['settings']
+    print(f'{settings["nUsers"]} users x {settings["repeats"]} repeats against {settings["baseUrl"]}: '
+          f'{testResults["throughput"]:.1f} requests/s over {testResults["duration"]:.1f}s')
+    if compareResults is not None:
+        print(f'    (compared to {compareResults["throughput"]:.1f} requests/s)')
+
+    #Print each request type
+    columns = ['nRequests', 'throughput', 'meanMs'] + [f'p{percentile}Ms' for percentile in reportPercentiles] + ['sentBytes', 'contentBytes']
+    print(f'{"request":<12}' + ''.join([f'{column:>14}' for column in columns]))
+    for requestType, summary in testResults['requests'].items():
+        if summary['nRequests'] == 0:
+            continue
+        print(f'{requestType:<12}' + ''.join([f'{summary[column]:>14.1f}' for column in columns]))
+        if compareResults is not None and compareResults['requests'].get(requestType, {}).get('nRequests', 0) > 0:
+            previous = compareResults['requests'][requestType]
+            print(f'{"  previous":<12}' + ''.join([f'{previous[column]:>14.1f}' for column in columns]))
+
+# %% Run load test
+
+if __name__ == '__main__':
+
+    #Get the test settings
+    parser = argparse.ArgumentParser(description = 'Load test the Zelda Dash app.')
+    parser.add_argument('--url', default = 'http://127.0.0.1:8050', help = 'url the app is served from')
+    parser.add_argument('--users', type = int, default = 10, help = 'number of users at the same time')
+    parser.add_argument('--repeats', type = int, default = 3, help = 'number of times each user selects every song')
+    parser.add_argument('--output', default = None, help = 'JSON file to save the results to')
+    parser.add_argument('--compare', default = None, help = 'JSON file of earlier results to compare against')
+    args = parser.parse_args()
+
+    #Run the test
+    testResults = runLoadTest(args.url, args.users, args.repeats)
+
+    #Print and save the results
+    compareResults = None
+    if args.compare is not None:
+        with open(args.compare, 'r') as inFile:
+            compareResults = json.load(inFile)
+    printResults(testResults, compareResults)
+    if args.output is not None:
+        with open(args.output, 'w') as outFile:
+            json.dump(testResults, outFile, indent = 2)
+
+# %%% ----- End of load_test.py -----
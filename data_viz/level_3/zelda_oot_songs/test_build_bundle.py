@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Tests for the deployment bundle helper functions.
+
+"""
+
+# %% Import packages
+
+import os
+import gzip
+import pytest
+from dash import html, dcc
+from build_bundle import getPageText, subsetFont, hashAssetNames, compressFile
+from file_hash import fileHash
+
+# %% Tests for the page text
+
+def test_page_text():
+
+    #The text of the components and the dropdown labels are found
+    layout = html.Div([html.H1('Zelda'), html.P(['Song', None]),
+                       dcc.Dropdown(options = [{'label': 'Épona', 'value': 'a'}, 'Sun'])])
+    assert getPageText(layout) == set('ZeldaSongÉponaSun')
+
+def test_subset_font(tmp_path):
+
+    #The subset font is smaller and only has the characters used
+    pytest.importorskip('fontTools')
+    from fontTools.ttLib import TTFont
+    fontFile = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets', 'Triforce.ttf')
+    outFile = str(tmp_path / 'Triforce.ttf')
+    assert subsetFont(fontFile, outFile, 'Zelda ')
+    assert os.path.getsize(outFile) < os.path.getsize(fontFile)
+    assert set(TTFont(outFile).getBestCmap()) <= set(map(ord, 'Zelda '))
+
+# %% Tests for hashAssetNames
+
+def test_hash_asset_names_css_urls(tmp_path):
+
+    #Create assets with a stylesheet referencing the image and font in different ways
+    assetsDir = tmp_path / 'assets'
+    os.makedirs(assetsDir / 'img')
+    (assetsDir / 'img' / 'map.webp').write_bytes(b'map image')
+    (assetsDir / 'Triforce.ttf').write_bytes(b'font data')
+    (assetsDir / 'custom.css').write_text("@font-face { src: url(Triforce.ttf); }\n"
+                                         ".a { background: url('img/map.webp?v=123'); }\n"
+                                         ".b { background: url(\"missing.png\"); }\n")
+    (assetsDir / 'img' / 'map_layer.css').write_text(".c { background: url('map.webp?v=123'); }\n")
+    imageHash = fileHash(str(assetsDir / 'img' / 'map.webp'))[0:10]
+    fontHash = fileHash(str(assetsDir / 'Triforce.ttf'))[0:10]
+
+    #The files are renamed with their content hash
+    hashedNames = hashAssetNames(str(assetsDir))
+    assert hashedNames['img/map.webp'] == f'img/map.{imageHash}.webp'
+    assert hashedNames['Triforce.ttf'] == f'Triforce.{fontHash}.ttf'
+    assert sorted(hashedNames) == ['Triforce.ttf', 'custom.css', 'img/map.webp', 'img/map_layer.css']
+    assert not os.path.exists(assetsDir / 'img' / 'map.webp')
+
+    #The stylesheet urls point to the renamed files relative to the stylesheet, without the version
+    cssText = (assetsDir / hashedNames['custom.css']).read_text()
+    assert f"url('Triforce.{fontHash}.ttf')" in cssText
+    assert f"url('img/map.{imageHash}.webp')" in cssText
+    assert 'url("missing.png")' in cssText
+    assert f"url('map.{imageHash}.webp')" in (assetsDir / hashedNames['img/map_layer.css']).read_text()
+
+    #The stylesheet hash is from its rewritten contents
+    assert hashedNames['custom.css'] == f"custom.{fileHash(str(assetsDir / hashedNames['custom.css']))[0:10]}.css"
+
+# %% Tests for compressFile
+
+def test_compress_file(tmp_path):
+
+    #A compressible file gets a gzip copy with the same contents
+    textFile = tmp_path / 'style.css'
+    textFile.write_text('.zelda { colour: green; }\n' * 100)
+    sizes = compressFile(str(textFile))
+    assert sizes['raw'] == os.path.getsize(textFile)
+    assert sizes['gz'] < sizes['raw']
+    assert gzip.decompress((tmp_path / 'style.css.gz').read_bytes()) == textFile.read_bytes()
+
+    #Copies that aren't smaller aren't kept
+    smallFile = tmp_path / 'small.js'
+    smallFile.write_text('a')
+    assert compressFile(str(smallFile)) == {'raw': 1}
+    assert not os.path.exists(tmp_path / 'small.js.gz')
+
+# %%% ----- End of test_build_bundle.py -----
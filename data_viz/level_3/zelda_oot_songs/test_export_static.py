@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Tests for the static site export of the Zelda app.
+
+"""
+
+# %% Import packages
+
+import os
+from fontTools.ttLib import TTFont
+import app as zeldaApp
+from export_static import exportStatic, getPlotlyBundle, getPlotlyScripts
+
+# %% Tests
+
+def test_plotly_bundle():
+
+    #The smallest bundle with all of the trace types is used
+    assert getPlotlyBundle([{'data': [{'type': 'scatter'}, {}]}]) == 'basic'
+    assert getPlotlyBundle([{'data': [{'type': 'scatter'}]}, {'data': [{'type': 'heatmap'}]}]) == 'cartesian'
+    assert getPlotlyBundle([{'data': [{'type': 'scattergl'}]}]) is None
+
+def test_plotly_scripts():
+
+    #The CDN script has the local copy as a fallback
+    cdnScripts = getPlotlyScripts('basic')
+    assert 'https://cdn.plot.ly/plotly-basic-' in cdnScripts
+    assert 'window.Plotly ||' in cdnScripts and 'assets/plotly.min.js' in cdnScripts
+    assert 'https://cdn.plot.ly/plotly-' in getPlotlyScripts(None)
+    assert 'cdn.plot.ly' not in getPlotlyScripts('basic', 'local')
+
+def test_export_static_site(tmp_path):
+
+    #Export the site
+    outputDir = str(tmp_path / 'site')
+    exportSummary = exportStatic(outputDir)
+    assert exportSummary['nSongs'] == len(os.listdir(os.path.join(outputDir, 'songs')))
+    with open(os.path.join(outputDir, 'index.html'), 'r', encoding = 'utf-8') as inFile:
+        pageText = inFile.read()
+    assert 'cdn.plot.ly' in pageText
+
+    #The fonts are subset, so they have fewer glyphs than the source fonts
+    for fontFile in ['RocknRollOne-Regular.ttf', 'Triforce.ttf']:
+        subsetGlyphs = len(TTFont(os.path.join(outputDir, 'assets', fontFile)).getGlyphOrder())
+        sourceGlyphs = len(TTFont(os.path.join(zeldaApp.assetsDir, fontFile)).getGlyphOrder())
+        assert subsetGlyphs <= sourceGlyphs
+    assert os.path.getsize(os.path.join(outputDir, 'assets', 'RocknRollOne-Regular.ttf')) < 100e3
+
+    #Only the images used by the page are kept, without the fallback formats
+    imgFiles = os.listdir(os.path.join(outputDir, 'assets', 'img'))
+    assert 'treble_clef.webp' in imgFiles
+    assert 'treble_clef.png' not in imgFiles and 'manifest.json' not in imgFiles
+
+# %%% ----- End of test_export_static.py -----
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Tests for the Zelda app load test, run against the app served in a
+    thread.
+
+"""
+
+# %% Import packages
+
+import threading
+import pytest
+from werkzeug.serving import make_server
+import app as zeldaApp
+from load_test import findComponent, summariseResults, runLoadTest
+
+# %% Test server
+
+#Serve the app on a free port in a thread
+@pytest.fixture(scope = 'module')
+def baseUrl():
+    server = make_server('127.0.0.1', 0, zeldaApp.server, threaded = True)
+    serverThread = threading.Thread(target = server.serve_forever, daemon = True)
+    serverThread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    serverThread.join()
+
+# %% Tests
+
+def test_find_component():
+
+    #Components are found within nested children
+    layout = {'props': {'children': [{'props': {'id': 'a'}},
+                                     {'props': {'children': {'props': {'id': 'b', 'value': 1}}}}]}}
+    assert findComponent(layout, 'b') == {'props': {'id': 'b', 'value': 1}}
+    assert findComponent(layout, 'c') is None
+
+def test_summarise_results():
+
+    #The throughput, latency percentiles and mean sizes are summarised
+    summary = summariseResults([(0.01, 100, 200), (0.03, 300, 400)], 2)
+    assert summary['nRequests'] == 2
+    assert summary['throughput'] == 1
+    assert summary['meanMs'] == pytest.approx(20)
+    assert summary['p50Ms'] == pytest.approx(20)
+    assert (summary['sentBytes'], summary['contentBytes']) == (200, 300)
+    assert summariseResults([], 1) == {'nRequests': 0}
+
+def test_run_load_test(baseUrl):
+
+    #Each user loads the page and layout and selects every song on each repeat
+    testResults = runLoadTest(baseUrl, nUsers = 2, repeats = 2)
+    nSongs = len(zeldaApp.songData)
+    assert testResults['settings']['nSongs'] == nSongs
+    assert testResults['requests']['page']['nRequests'] == 2 * 2
+    assert testResults['requests']['layout']['nRequests'] == 2 * 2
+    assert testResults['requests']['songUpdate']['nRequests'] == 2 * 2 * nSongs
+
+# %%% ----- End of test_load_test.py -----
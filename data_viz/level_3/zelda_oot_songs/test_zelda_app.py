@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Tests for the Zelda Dash app.
+
+"""
+
+# %% Import packages
+
+import os
+import json
+import pandas as pd
+import app as zeldaApp
+from load_test import createSongRequests
+
+# %% Tests for the song slots
+
+#Set some slots to compare
+slotA = {'source': 'a.webp', 'y': 0.1, 'visible': True}
+slotB = {'source': 'b.webp', 'y': 0.2, 'visible': True}
+slotHidden = {'visible': False}
+
+def test_diff_slots_new_graph():
+
+    #Every property of the shown slots is set on a new graph, and hidden slots are left
+    assert zeldaApp.diffSongSlots(None, [slotA, slotHidden]) == \
+        [(0, 'source', 'a.webp'), (0, 'y', 0.1), (0, 'visible', True)]
+
+def test_diff_slots_same_song():
+
+    #Nothing changes when the same song is selected again
+    assert zeldaApp.diffSongSlots([slotA, slotB, slotHidden], [slotA, slotB, slotHidden]) == []
+
+def test_diff_slots_changed():
+
+    #Only the differing properties are set, and a slot being hidden only changes its visibility
+    assert zeldaApp.diffSongSlots([slotA, slotB, slotA], [slotA, dict(slotB, y = 0.3), slotHidden]) == \
+        [(1, 'y', 0.3), (2, 'visible', False)]
+
+    #A hidden slot being shown has all of its properties set
+    assert zeldaApp.diffSongSlots([slotA, slotHidden], [slotA, slotB]) == \
+        [(1, 'source', 'b.webp'), (1, 'y', 0.2), (1, 'visible', True)]
+
+# %% Tests for the song callback
+
+def test_song_callback_patch():
+
+    #Get the song requests, with each song shown after the one before
+    app = zeldaApp.createApp('server')
+    client = app.server.test_client()
+    dependencies = client.get('/_dash-dependencies').get_json()
+    songNames = list(zeldaApp.songData['song'])
+    songRequests = createSongRequests(dependencies, songNames)
+
+    #Check the patch of each song only has the slot changes from the song before
+    imageUrls = zeldaApp.getImageUrls(app)
+    slotOffset = len(zeldaApp.createStaffFigure(imageUrls).layout.images)
+    buttonImg = zeldaApp.getButtonImages(imageUrls)
+    shownSlots = None
+    for songInd, songRequest in enumerate(songRequests):
+        response = client.post('/_dash-update-component', json = songRequest).get_json()['response']
+        songSlots = zeldaApp.getSongSlots(zeldaApp.getSongDetails(songInd)[0], buttonImg)
+        expectedChanges = [(['layout', 'images', slotOffset + slotInd, imageProperty], value)
+                           for slotInd, imageProperty, value in zeldaApp.diffSongSlots(shownSlots, songSlots)]
+        assert [(operation['location'], operation['params']['value'])
+                for operation in response['songGraph']['figure']['operations']] == expectedChanges
+        assert response['songShown']['data'] == songNames[songInd]
+        shownSlots = songSlots
+
+# %% Tests for the map markers
+
+def test_marker_mode_auto():
+
+    #The images are used up to the limit and WebGL above it
+    assert zeldaApp.getMarkerMode('auto', zeldaApp.markerImageLimit) == 'images'
+    assert zeldaApp.getMarkerMode('auto', zeldaApp.markerImageLimit + 1) == 'webgl'
+    assert zeldaApp.getMarkerMode('images', 10000) == 'images'
+
+def test_map_figure_markers():
+
+    #The image markers add an ocarina image on each point
+    imageUrls = zeldaApp.getImageUrls(zeldaApp.app)
+    nSongs = len(zeldaApp.songData)
+    mapFig = zeldaApp.createMapFigure(imageUrls, 'auto')
+    assert len(mapFig.layout.images) == 2 + nSongs
+    assert [trace.type for trace in mapFig.data] == ['scatter']
+
+    #Many points are drawn as a single WebGL trace without the ocarina images
+    pointData = pd.concat([zeldaApp.songData] * (zeldaApp.markerImageLimit // nSongs + 1), ignore_index = True)
+    mapFig = zeldaApp.createMapFigure(imageUrls, 'auto', pointData = pointData)
+    assert len(mapFig.layout.images) == 2
+    assert [trace.type for trace in mapFig.data] == ['scattergl']
+    assert len(mapFig.data[0].x) == len(pointData)
+
+    #The image markers can still be chosen for many points
+    mapFig = zeldaApp.createMapFigure(imageUrls, 'images', pointData = pointData)
+    assert len(mapFig.layout.images) == 2 + len(pointData)
+
+    #With the map layer the figure only keeps the hidden markers for hovering
+    mapFig = zeldaApp.createMapFigure(imageUrls, 'webgl', mapLayer = {'cssClass': 'zeldaMapLayer'})
+    assert len(mapFig.layout.images) == 0
+    assert [trace.type for trace in mapFig.data] == ['scattergl']
+    assert mapFig.data[0].marker.opacity == 0
+
+# %% Tests for the app factory
+
+def test_create_app_independent():
+
+    #Each app has its own server and layout, with the shared data built once
+    otherApp = zeldaApp.createApp('server')
+    assert otherApp.server is not zeldaApp.app.server
+    assert otherApp.layout is not zeldaApp.app.layout
+    assert zeldaApp.server is zeldaApp.app.server
+
+    #The page is served with the app title
+    response = otherApp.server.test_client().get('/')
+    assert response.status_code == 200
+    assert '<title>Legend of Zelda Ocarina of Time Songs</title>' in response.get_data(as_text = True)
+
+def test_gunicorn_settings(monkeypatch):
+
+    #The settings serve the preloaded WSGI server with threaded workers on the given port
+    monkeypatch.setenv('PORT', '9001')
+    monkeypatch.setenv('WEB_CONCURRENCY', '3')
+    gunicornSettings = {}
+    with open(os.path.join(zeldaApp.appDir, 'gunicorn.conf.py'), 'r') as inFile:
+        exec(inFile.read(), gunicornSettings)
+    assert gunicornSettings['wsgi_app'] == 'app:server'
+    assert gunicornSettings['bind'] == '0.0.0.0:9001'
+    assert (gunicornSettings['workers'], gunicornSettings['threads']) == (3, 4)
+    assert gunicornSettings['worker_class'] == 'gthread' and gunicornSettings['preload_app']
+
+# %% Tests for the clientside mode
+
+def test_clientside_song_store():
+
+    #The songs and staff figure are stored in the page for the browser callback
+    app = zeldaApp.createApp('clientside')
+    songStore = app.layout['songStore'].data
+    imageUrls = zeldaApp.getImageUrls(app)
+    assert songStore['staffFigure'] == json.loads(zeldaApp.createStaffFigure(imageUrls).to_json())
+    assert songStore['buttonSources'] == zeldaApp.getButtonImages(imageUrls)
+    for songInd, songName in enumerate(zeldaApp.songData['song']):
+        songNotes, songTypeText, songPower = zeldaApp.getSongDetails(songInd)
+        assert songStore['songs'][songName] == {'notes': songNotes, 'type': songTypeText,
+                                                'power': songPower}
+
+    #The song selection is handled by the browser rather than the server
+    dependencies = app.server.test_client().get('/_dash-dependencies').get_json()
+    assert createSongRequests(dependencies, list(zeldaApp.songData['song'])) == []
+    assert [callback['clientside_function'] for callback in dependencies] == \
+        [{'namespace': 'zelda', 'function_name': 'songUpdate'}]
+    with open(os.path.join(zeldaApp.assetsDir, 'zelda_songs.js'), 'r') as inFile:
+        assert 'songUpdate: function(songName, songStore)' in inFile.read()
+
+# %% Tests for the image assets
+
+def test_image_urls_cached():
+
+    #Each image is served from its versioned url and can be cached for a long time
+    client = zeldaApp.app.server.test_client()
+    for imgName, imageUrl in zeldaApp.getImageUrls(zeldaApp.app).items():
+        assert imageUrl.endswith('.webp?v=' + zeldaApp.imageAssets[imgName]['version'])
+        response = client.get(imageUrl)
+        assert response.status_code == 200
+        assert response.cache_control.max_age == zeldaApp.assetMaxAge
+        response.close()
+
+    #The figures reference the image urls rather than embedding the images
+    assert 'base64' not in zeldaApp.app.server.test_client().get('/_dash-layout').get_data(as_text = True)
+
+# %%% ----- End of test_zelda_app.py -----
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Tests for the Zelda image assets.
+
+"""
+
+# %% Import packages
+
+import os
+import json
+import numpy as np
+import pytest
+from PIL import Image
+from zelda_assets import buildImageAssets, buildMapLayer, loadAssetBundle
+
+# %% Test images
+
+#Create a folder with a large photo and a small icon
+@pytest.fixture
+def imgDir(tmp_path):
+    imgDir = tmp_path / 'img'
+    os.makedirs(imgDir)
+    Image.fromarray(np.random.RandomState(1).randint(0, 256, (200, 400, 3)).astype(np.uint8)).save(imgDir / 'map.jpg')
+    Image.new('RGBA', (64, 32), (255, 0, 0, 128)).save(imgDir / 'icon.png')
+    return str(imgDir)
+
+# %% Tests for buildImageAssets
+
+def test_image_assets_resized(imgDir, tmp_path):
+
+    #Images are saved as WebP and their original format, fitted to their maximum size
+    assetsDir = str(tmp_path / 'assets')
+    imageAssets = buildImageAssets(imgDir, assetsDir, {'map.jpg': (100, 100), 'icon.png': (128, 128)})
+    assert imageAssets['map.jpg']['webp'] == 'img/map.webp'
+    assert imageAssets['map.jpg']['fallback'] == 'img/map.jpg'
+    assert imageAssets['map.jpg']['size'] == (400, 200)
+    with Image.open(os.path.join(assetsDir, 'img', 'map.webp')) as img:
+        assert img.size == (100, 50)
+
+    #Images smaller than their maximum size aren't enlarged, and keep their transparency
+    with Image.open(os.path.join(assetsDir, 'img', 'icon.webp')) as img:
+        assert img.size == (64, 32)
+        assert img.convert('RGBA').getpixel((0, 0)) == (255, 0, 0, 128)
+
+def test_image_assets_cached(imgDir, tmp_path):
+
+    #Build the assets and note when they were saved
+    assetsDir = str(tmp_path / 'assets')
+    maxSizes = {'map.jpg': (100, 100), 'icon.png': (128, 128)}
+    imageAssets = buildImageAssets(imgDir, assetsDir, maxSizes)
+    webpFile = os.path.join(assetsDir, 'img', 'map.webp')
+    os.utime(webpFile, (0, 0))
+
+    #Unchanged images aren't built again and keep their version
+    assert buildImageAssets(imgDir, assetsDir, maxSizes) == imageAssets
+    assert os.stat(webpFile).st_mtime == 0
+
+    #A new maximum size builds the image again with a new version
+    newAssets = buildImageAssets(imgDir, assetsDir, dict(maxSizes, **{'map.jpg': (50, 50)}))
+    assert os.stat(webpFile).st_mtime > 0
+    assert newAssets['map.jpg']['version'] != imageAssets['map.jpg']['version']
+    assert newAssets['icon.png'] == imageAssets['icon.png']
+
+# %% Tests for buildMapLayer
+
+#Set a layer with the icon on the left half and a marker on the right half
+mapLayers = [dict(source = 'icon.png', x = 0, y = 0, sizex = 0.5, sizey = 1,
+                  xanchor = 'left', yanchor = 'bottom', layer = 'below')]
+markerStyle = {'size': 0.4, 'lineWidth': 0.05, 'colour': 'blue', 'lineColour': 'blue'}
+
+def test_map_layer_composite(imgDir, tmp_path):
+
+    #The images are saved at each width up to the canvas width
+    assetsDir = str(tmp_path / 'assets')
+    mapLayer = buildMapLayer(imgDir, assetsDir, (200, 50), mapLayers, markers = [(0.75, 0.5)],
+                             markerStyle = markerStyle, widths = (100, 400), backgroundColour = '#ffffff')
+    assert mapLayer['widths'] == [100, 200]
+    assert mapLayer['aspectRatio'] == (200, 50)
+    with Image.open(os.path.join(assetsDir, 'img', 'map_layer_200.webp')) as img:
+        assert img.size == (200, 50)
+    with Image.open(os.path.join(assetsDir, 'img', 'map_layer_100.jpg')) as img:
+        assert img.size == (100, 25)
+
+    #The icon fills its box (flattened on the background) and the marker is drawn at its point
+    with Image.open(os.path.join(assetsDir, 'img', 'map_layer_200.jpg')) as img:
+        assert np.allclose(img.getpixel((50, 25)), (255, 127, 127), atol = 8)
+        assert np.allclose(img.getpixel((150, 25)), (0, 0, 255), atol = 8)
+        assert np.allclose(img.getpixel((190, 5)), (255, 255, 255), atol = 8)
+
+    #The stylesheet sets the larger image for wider screens, with the versions in the urls
+    with open(os.path.join(assetsDir, mapLayer['css']), 'r') as inFile:
+        css = inFile.read()
+    assert f"url('map_layer_100.webp?v={mapLayer['versions'][100]}') type('image/webp')" in css
+    assert '@media (min-width: 129px)' in css
+    assert css.count('image-set(') == 2
+
+def test_map_layer_cached(imgDir, tmp_path):
+
+    #Unchanged layers aren't built again
+    assetsDir = str(tmp_path / 'assets')
+    mapLayer = buildMapLayer(imgDir, assetsDir, (200, 50), mapLayers, widths = (100,))
+    webpFile = os.path.join(assetsDir, 'img', 'map_layer_100.webp')
+    os.utime(webpFile, (0, 0))
+    assert buildMapLayer(imgDir, assetsDir, (200, 50), mapLayers, widths = (100,)) == mapLayer
+    assert os.stat(webpFile).st_mtime == 0
+
+    #Changing a layer builds the images again
+    buildMapLayer(imgDir, assetsDir, (200, 50), [dict(mapLayers[0], sizex = 0.25)], widths = (100,))
+    assert os.stat(webpFile).st_mtime > 0
+
+# %% Tests for loadAssetBundle
+
+def test_load_asset_bundle(tmp_path):
+
+    #No bundle is found in a plain assets folder
+    assert loadAssetBundle(str(tmp_path)) is None
+
+    #The saved details are restored to the same types as when they were built
+    with open(tmp_path / 'bundle.json', 'w') as outFile:
+        json.dump({'images': {'map.jpg': {'webp': 'img/map.webp', 'size': [400, 200], 'version': 'abc'}},
+                   'mapLayer': {'widths': [100], 'versions': {'100': 'def'}, 'aspectRatio': [200, 50]}},
+                  outFile)
+    assetBundle = loadAssetBundle(str(tmp_path))
+    assert assetBundle['images']['map.jpg']['size'] == (400, 200)
+    assert assetBundle['mapLayer']['versions'] == {100: 'def'}
+    assert assetBundle['mapLayer']['aspectRatio'] == (200, 50)
+
+# %%% ----- End of test_zelda_assets.py -----
@@ -0,0 +1,360 @@
+# -*- coding: utf-8 -*-
+"""
+
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Helper functions to build the image assets served by the Zelda Dash app.
+    Each source image in the img folder is resized to the largest size it is
+    displayed at and saved in the Dash assets folder as WebP along with a
+    fallback in its original format. The static layers of the map figure
+    can also be composited into one image, saved at a few widths and served
+    by a generated stylesheet as the background of the map graph. Images are
+    only rebuilt when the source or the settings change, and each asset has
+    a version string from its contents so browsers can cache it for a long
+    time.
+
+"""
+
+# %% Import packages
+
+import os
+import sys
+import json
+import hashlib
+from PIL import Image, ImageDraw
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from file_hash import fileHash
+
+# %% Define functions
+
+#Set the maximum (width, height) each image is displayed at in the app
+#These are around twice the on screen size so they stay sharp on high DPI screens
+imageMaxSizes = {'oot_map.jpg': (1000, 565),
+                 'linkPlaying.png': (800, 800),
+                 'ocarina_small.png': (100, 100),
+                 'n64_A.png': (128, 128),
+                 'n64_up.png': (128, 128),
+                 'n64_left.png': (128, 128),
+                 'n64_right.png': (128, 128),
+                 'n64_down.png': (128, 128),
+                 'treble_clef.png': (256, 256)}
+
+#Set the time (s) browsers can cache the assets for
+assetMaxAge = 60 * 60 * 24 * 365
+
+#Function to save a resized image in a given format
+def _saveImage(img, outFile, imageFormat):
+
+    #Use lossless settings for the small icons and lossy for the larger images
+    if imageFormat == 'webp':
+        if max(img.size) <= 256:
+            img.save(outFile, 'WEBP', lossless = True, method = 6)
+        else:
+            img.save(outFile, 'WEBP', quality = 85, method = 6)
+    elif imageFormat == 'avif':
+        img.save(outFile, 'AVIF', quality = 60)
+    elif imageFormat == 'jpeg':
+        img.convert('RGB').save(outFile, 'JPEG', quality = 85, optimize = True, progressive = True)
+    else:
+        img.save(outFile, 'PNG', optimize = True)
+
+#Function to load the manifest of built assets
+def _loadManifest(manifestFile):
+
+    if os.path.exists(manifestFile):
+        with open(manifestFile, 'r') as inFile:
+            return json.load(inFile)
+
+    return {}
+
+#Function to save the manifest of built assets
+def _saveManifest(manifest, manifestFile):
+
+    with open(manifestFile, 'w') as outFile:
+        json.dump(manifest, outFile, indent = 2, sort_keys = True)
+
+#Function to build the image assets for the app
+def buildImageAssets(imgDir = 'img', assetsDir = 'assets', maxSizes = None,
+                     subDir = 'img', extraFormats = ()):
+    """
+    imgDir: folder with the source images (default = 'img')
+    assetsDir: Dash assets folder (default = 'assets')
+    maxSizes: dictionary of the maximum (width, height) for each image
+        (default = imageMaxSizes)
+    subDir: folder within the assets folder for the images (default = 'img')
+    extraFormats: other formats to save each image in, e.g. ['avif']
+        (default = none)
+
+    Returns a dictionary for each source image with the original 'size', the
+    asset paths of the 'webp' and 'fallback' images (and any extra formats)
+    relative to the assets folder, and a 'version' string from the asset
+    contents.
+
+    """
+
+    #Set the default sizes
+    if maxSizes is None:
+        maxSizes = imageMaxSizes
+
+    #Create the output folder and load the manifest from the last build
+    outDir = os.path.join(assetsDir, subDir)
+    os.makedirs(outDir, exist_ok = True)
+    manifestFile = os.path.join(outDir, 'manifest.json')
+    manifest = _loadManifest(manifestFile)
+
+    #Build each image
+    imageAssets = {}
+    for imgName, maxSize in maxSizes.items():
+
+        #Set the source and output files
+        imgFile = os.path.join(imgDir, imgName)
+        baseName, ext = os.path.splitext(imgName)
+        fallbackFormat = 'jpeg' if ext.lower() in ['.jpg', '.jpeg'] else 'png'
+        outFiles = {'webp': f'{baseName}.webp', 'fallback': f'{baseName}{ext.lower()}'}
+        outFiles.update({extraFormat: f'{baseName}.{extraFormat}' for extraFormat in extraFormats})
+
+        #Check whether the image needs building again
+        fileStat = os.stat(imgFile)
+        buildKey = {'mtime': fileStat.st_mtime, 'size': fileStat.st_size,
+                    'maxSize': list(maxSize)}
+        if len(extraFormats) > 0:
+            buildKey['extraFormats'] = list(extraFormats)
+        cacheEntry = manifest.get(imgName)
+        if cacheEntry is None or cacheEntry['buildKey'] != buildKey or \
+            not all([os.path.exists(os.path.join(outDir, outFile)) for outFile in outFiles.values()]):
+
+            #Resize the image to fit the maximum size (keeping its aspect ratio)
+            with Image.open(imgFile) as img:
+                originalSize = img.size
+                img = img.copy()
+                img.thumbnail(maxSize, Image.LANCZOS)
+
+                #Save the WebP, fallback and any extra format images
+                _saveImage(img, os.path.join(outDir, outFiles['webp']), 'webp')
+                _saveImage(img, os.path.join(outDir, outFiles['fallback']), fallbackFormat)
+                for extraFormat in extraFormats:
+                    _saveImage(img, os.path.join(outDir, outFiles[extraFormat]), extraFormat)
+
+            #Update the manifest
+            cacheEntry = {'buildKey': buildKey, 'originalSize': list(originalSize),
+                          'version': fileHash(os.path.join(outDir, outFiles['webp']))[0:12]}
+            manifest[imgName] = cacheEntry
+
+        #Store the asset details
+        imageAssets[imgName] = dict({imageFormat: f'{subDir}/{outFile}' for imageFormat, outFile in outFiles.items()},
+                                    size = tuple(cacheEntry['originalSize']),
+                                    version = cacheEntry['version'])
+
+    #Save the manifest
+    _saveManifest(manifest, manifestFile)
+
+    return imageAssets
+
+#Set the alignment of each plotly anchor within its box
+anchorAlignment = {'left': 0, 'center': 0.5, 'right': 1,
+                   'top': 0, 'middle': 0.5, 'bottom': 1}
+
+#Function to add an image to a canvas in the same way as a plotly layout image
+def _addLayerImage(canvas, img, layer):
+
+    #Get the box the image is placed in (paper y is from the bottom)
+    canvasWidth, canvasHeight = canvas.size
+    boxWidth = layer['sizex'] * canvasWidth
+    boxHeight = layer['sizey'] * canvasHeight
+    xAlign = anchorAlignment[layer.get('xanchor', 'left')]
+    yAlign = anchorAlignment[layer.get('yanchor', 'top')]
+    boxLeft = layer['x'] * canvasWidth - xAlign * boxWidth
+    boxTop = (1 - layer['y']) * canvasHeight - yAlign * boxHeight
+
+    #Scale the image to fit in the box, keeping its aspect ratio (plotly's
+    #default 'contain' sizing), and align it within the box by the anchors
+    scale = min(boxWidth / img.size[0], boxHeight / img.size[1])
+    imgSize = (max(1, round(img.size[0] * scale)), max(1, round(img.size[1] * scale)))
+    imgLeft = round(boxLeft + xAlign * (boxWidth - imgSize[0]))
+    imgTop = round(boxTop + yAlign * (boxHeight - imgSize[1]))
+
+    #Add the image over the canvas
+    layerCanvas = Image.new('RGBA', canvas.size, (0, 0, 0, 0))
+    layerCanvas.paste(img.convert('RGBA').resize(imgSize, Image.LANCZOS), (imgLeft, imgTop))
+
+    return Image.alpha_composite(canvas, layerCanvas)
+
+#Function to add circle markers to a canvas
+def _addMarkers(canvas, markers, markerStyle, superSample = 4):
+
+    #Get the marker size and line width in pixels
+    canvasWidth, canvasHeight = canvas.size
+    radius = markerStyle['size'] * canvasHeight * superSample / 2
+    lineWidth = max(1, round(markerStyle['lineWidth'] * canvasHeight * superSample))
+
+    #Draw the markers on a larger layer and scale it down to smooth the edges
+    markerLayer = Image.new('RGBA', (canvasWidth * superSample, canvasHeight * superSample), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(markerLayer)
+    for markerX, markerY in markers:
+        centreX = markerX * canvasWidth * superSample
+        centreY = (1 - markerY) * canvasHeight * superSample
+        draw.ellipse([centreX - radius, centreY - radius, centreX + radius, centreY + radius],
+                     fill = markerStyle['colour'], outline = markerStyle['lineColour'],
+                     width = lineWidth)
+
+    return Image.alpha_composite(canvas, markerLayer.resize(canvas.size, Image.LANCZOS))
+
+#Function to composite the static layers of the map into images and a stylesheet
+def buildMapLayer(imgDir, assetsDir, canvasSize, layers, markers = (), markerStyle = None,
+                  widths = (480, 960, 1440), displayWidth = 0.78, backgroundColour = '#fffaf0',
+                  name = 'map_layer', cssClass = 'zeldaMapLayer', subDir = 'img', extraFormats = ()):
+    """
+    imgDir: folder with the source images
+    assetsDir: Dash assets folder
+    canvasSize: (width, height) of the full resolution composite in pixels
+    layers: list of plotly layout image dictionaries for the static images,
+        in paper coordinates and with the image file name as the source.
+        Images with layer = 'below' are drawn under the markers.
+    markers: list of (x, y) marker positions in paper coordinates (default = none)
+    markerStyle: dictionary of the marker 'size' and 'lineWidth' (as
+        proportions of the canvas height), 'colour' and 'lineColour'
+        (default = None, needed if there are markers)
+    widths: widths of the images to save (default = (480, 960, 1440)).
+        Widths larger than the canvas are replaced by the canvas width.
+    displayWidth: proportion of the browser width the map is shown at,
+        used to pick the image for each screen size (default = 0.78)
+    backgroundColour: colour the composite is flattened on to (default =
+        '#fffaf0', the page background)
+    name: base name of the image and stylesheet files (default = 'map_layer')
+    cssClass: class of the element the images are the background of
+        (default = 'zeldaMapLayer')
+    subDir: folder within the assets folder for the files (default = 'img')
+    extraFormats: other formats to save the images in, which are listed
+        before the WebP image in the stylesheet, e.g. ['avif'] (default = none)
+
+    Returns a dictionary with the 'widths' and 'versions' of the saved
+    images, the 'css' file path (relative to the assets folder), the
+    'cssClass' and the 'aspectRatio' (width, height) of the composite.
+
+    The stylesheet is in the assets folder, so Dash adds it to the page. It
+    sets the WebP image for each range of screen widths (with the JPEG for
+    browsers without image-set), stretched to fill the element so it lines
+    up with the figure axes.
+
+    """
+
+    #Set the widths of the images
+    widths = sorted(set([min(width, canvasSize[0]) for width in widths]))
+
+    #Create the output folder and load the manifest from the last build
+    outDir = os.path.join(assetsDir, subDir)
+    os.makedirs(outDir, exist_ok = True)
+    manifestFile = os.path.join(outDir, 'manifest.json')
+    manifest = _loadManifest(manifestFile)
+
+    #Set the output files
+    outFiles = {width: dict({extraFormat: f'{name}_{width}.{extraFormat}' for extraFormat in extraFormats},
+                            webp = f'{name}_{width}.webp', fallback = f'{name}_{width}.jpg')
+                for width in widths}
+    cssFile = f'{name}.css'
+
+    #Check whether the composite needs building again
+    sourceStats = {}
+    for layer in layers:
+        fileStat = os.stat(os.path.join(imgDir, layer['source']))
+        sourceStats[layer['source']] = [fileStat.st_mtime, fileStat.st_size]
+    buildKey = hashlib.sha256(json.dumps([list(canvasSize), layers, [list(marker) for marker in markers],
+                                          markerStyle, widths, displayWidth, backgroundColour,
+                                          cssClass, sourceStats] + ([list(extraFormats)] if len(extraFormats) > 0 else []),
+                                         sort_keys = True).encode()).hexdigest()
+    cacheEntry = manifest.get(name)
+    outPaths = [os.path.join(outDir, outFile) for widthFiles in outFiles.values() for outFile in widthFiles.values()]
+    if cacheEntry is None or cacheEntry['buildKey'] != buildKey or \
+        not all([os.path.exists(outPath) for outPath in outPaths + [os.path.join(outDir, cssFile)]]):
+
+        #Composite the layers at full resolution
+        canvas = Image.new('RGBA', tuple(canvasSize), (0, 0, 0, 0))
+        for layer in [layer for layer in layers if layer.get('layer') == 'below']:
+            with Image.open(os.path.join(imgDir, layer['source'])) as img:
+                canvas = _addLayerImage(canvas, img, layer)
+        if len(markers) > 0:
+            canvas = _addMarkers(canvas, markers, markerStyle)
+        for layer in [layer for layer in layers if layer.get('layer') != 'below']:
+            with Image.open(os.path.join(imgDir, layer['source'])) as img:
+                canvas = _addLayerImage(canvas, img, layer)
+
+        #Flatten the composite on to the page background, as the layer is opaque
+        canvas = Image.alpha_composite(Image.new('RGBA', canvas.size, backgroundColour), canvas).convert('RGB')
+
+        #Save the image at each width
+        versions = {}
+        for width in widths:
+            height = max(1, round(canvasSize[1] * width / canvasSize[0]))
+            img = canvas.resize((width, height), Image.LANCZOS)
+            img.save(os.path.join(outDir, outFiles[width]['webp']), 'WEBP', quality = 85, method = 6)
+            _saveImage(img, os.path.join(outDir, outFiles[width]['fallback']), 'jpeg')
+            for extraFormat in extraFormats:
+                _saveImage(img, os.path.join(outDir, outFiles[width][extraFormat]), extraFormat)
+            versions[width] = fileHash(os.path.join(outDir, outFiles[width]['webp']))[0:12]
+
+        #Create the stylesheet, with larger images for wider screens
+        cssRules = [f'/* Generated by zelda_assets.buildMapLayer */\n'
+                    f'.{cssClass} {{\n'
+                    f'    background-repeat: no-repeat;\n'
+                    f'    background-size: 100% 100%;\n'
+                    f'}}']
+        for widthInd, width in enumerate(widths):
+            fallbackUrl = f"url('{outFiles[width]['fallback']}?v={versions[width]}')"
+            imageSet = ', '.join([f"url('{outFiles[width][imageFormat]}?v={versions[width]}') type('image/{imageFormat}')"
+                                  for imageFormat in list(extraFormats) + ['webp']] +
+                                 [f"{fallbackUrl} type('image/jpeg')"])
+            rule = (f'.{cssClass} {{\n'
+                    f'    background-image: {fallbackUrl};\n'
+                    f'    background-image: image-set({imageSet});\n'
+                    f'}}')
+            if widthInd > 0:
+                minScreenWidth = int(widths[widthInd - 1] / displayWidth) + 1
+                rule = f'@media (min-width: {minScreenWidth}px) {{\n' + rule + '\n}'
+            cssRules.append(rule)
+        with open(os.path.join(outDir, cssFile), 'w') as outFile:
+            outFile.write('\n\n'.join(cssRules) + '\n')
+
+        #Update the manifest
+        cacheEntry = {'buildKey': buildKey, 'versions': {str(width): versions[width] for width in widths}}
+        manifest[name] = cacheEntry
+        _saveManifest(manifest, manifestFile)
+
+    return {'widths': widths,
+            'versions': {int(width): version for width, version in cacheEntry['versions'].items()},
+            'css': f'{subDir}/{cssFile}',
+            'cssClass': cssClass,
+            'aspectRatio': tuple(canvasSize)}
+
+#Function to load the asset details saved with a deployment bundle
+def loadAssetBundle(assetsDir = 'assets', bundleFile = 'bundle.json'):
+    """
+    assetsDir: Dash assets folder (default = 'assets')
+    bundleFile: name of the bundle file in the assets folder (default = 'bundle.json')
+
+    Returns the dictionary of the prebuilt 'images' (in the same form as
+    buildImageAssets) and 'mapLayer' (in the same form as buildMapLayer)
+    saved by build_bundle.py, or None if the assets aren't from a bundle.
+
+    """
+
+    #Check for the bundle file
+    bundlePath = os.path.join(assetsDir, bundleFile)
+    if not os.path.exists(bundlePath):
+        return None
+
+    #Load the asset details and restore the tuples
+    with open(bundlePath, 'r') as inFile:
+        assetBundle = json.load(inFile)
+    for imageAsset in assetBundle['images'].values():
+        imageAsset['size'] = tuple(imageAsset['size'])
+    if assetBundle.get('mapLayer') is not None:
+        assetBundle['mapLayer']['aspectRatio'] = tuple(assetBundle['mapLayer']['aspectRatio'])
+        assetBundle['mapLayer']['versions'] = {int(width): version for width, version in assetBundle['mapLayer']['versions'].items()}
+
+    return assetBundle
+
+# %%% ----- End of zelda_assets.py -----
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Tests for the shared figure export stage.
+
+"""
+
+# %%% Import packages
+
+import os
+import numpy as np
+import pytest
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from PIL import Image
+from figure_export import writePngRows, streamPng, exportFigure
+
+# %%% Tests for writePngRows
+
+def test_png_rows_round_trip(tmp_path):
+
+    #Write an image in uneven blocks of rows
+    imgRGBA = np.random.RandomState(1).randint(0, 256, (13, 7, 4)).astype(np.uint8)
+    outputFile = str(tmp_path / 'rows.png')
+    writePngRows(outputFile, (7, 13), (imgRGBA[rowInd:rowInd+5] for rowInd in range(0, 13, 5)),
+                 dpi = 300)
+
+    #PIL reads back the same pixels and resolution
+    with Image.open(outputFile) as img:
+        assert img.mode == 'RGBA'
+        assert np.array_equal(np.asarray(img), imgRGBA)
+        assert np.allclose(img.info['dpi'], (300, 300), atol = 0.01)
+
+def test_png_rows_missing_rows(tmp_path):
+
+    #Writing fewer rows than the image height is an error
+    with pytest.raises(ValueError):
+        writePngRows(str(tmp_path / 'short.png'), (2, 3), [np.zeros((2, 2, 4), dtype = np.uint8)])
+
+# %%% Tests for the figure export
+
+#Create a small figure to export
+@pytest.fixture
+def fig():
+    fig, ax = plt.subplots(figsize = (2, 1))
+    ax.plot([0, 1], [0, 1])
+    yield fig
+    plt.close(fig)
+
+def test_stream_png_matches_savefig(fig, tmp_path):
+
+    #The streamed PNG matches saving the figure with Agg at the same resolution
+    streamPng(fig, str(tmp_path / 'stream.png'), 50, blockRows = 7)
+    fig.savefig(str(tmp_path / 'savefig.png'), dpi = 50)
+    with Image.open(tmp_path / 'stream.png') as streamImg, Image.open(tmp_path / 'savefig.png') as saveImg:
+        assert streamImg.size == (100, 50)
+        assert np.array_equal(np.asarray(streamImg.convert('RGBA')), np.asarray(saveImg.convert('RGBA')))
+
+    #The figure's resolution is restored
+    assert fig.dpi == 100
+
+def test_export_stages(fig, tmp_path):
+
+    #Each stage saves its file and reports its time
+    export = exportFigure(fig, str(tmp_path / 'figure.png'), dpi = 60, previewDpi = 20,
+                          vectorFormats = ['svg'], verbose = False)
+    assert export['files'] == {'preview': str(tmp_path / 'figure_preview.png'),
+                               'png': str(tmp_path / 'figure.png'),
+                               'svg': str(tmp_path / 'figure.svg')}
+    assert all(os.path.exists(savedFile) for savedFile in export['files'].values())
+    assert sorted(export['timings']) == ['png', 'preview', 'svg']
+    with Image.open(export['files']['preview']) as previewImg:
+        assert previewImg.size == (40, 20)
+
+# %%% ----- End of test_figure_export.py -----
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Tests for the shared file hashing.
+
+"""
+
+# %%% Import packages
+
+import hashlib
+from file_hash import fileHash
+
+# %%% Tests
+
+def test_file_hash_blocks(tmp_path):
+
+    #The hash matches hashing the whole file, including across block boundaries
+    fileData = bytes(range(256)) * 1000
+    filePath = tmp_path / 'data.bin'
+    filePath.write_bytes(fileData)
+    assert fileHash(str(filePath)) == hashlib.sha256(fileData).hexdigest()
+    assert fileHash(str(filePath), blockSize = 1000) == hashlib.sha256(fileData).hexdigest()
+
+def test_file_hash_empty(tmp_path):
+
+    #An empty file has the hash of no data
+    filePath = tmp_path / 'empty.bin'
+    filePath.write_bytes(b'')
+    assert fileHash(str(filePath)) == hashlib.sha256(b'').hexdigest()
+
+# %%% ----- End of test_file_hash.py -----
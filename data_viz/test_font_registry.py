@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+@author:
+    Aaron Fox
+    Centre for Sport Research
+    Deakin University
+    aaron.f@deakin.edu.au
+
+    Tests for the shared font registry.
+
+"""
+
+# %%% Import packages
+
+import os
+import json
+import shutil
+import pytest
+from matplotlib import font_manager
+import font_registry
+from font_registry import registerFonts, cacheFileName, fontSignature
+
+# %%% Test fonts
+
+#Copy a font into a new directory and start with no registered directories
+@pytest.fixture
+def fontDir(tmp_path, monkeypatch):
+    shutil.copy(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'level_2',
+                             'retro_modern_mario_bros', 'fonts', 'Super Mario Bros.ttf'),
+                tmp_path)
+    monkeypatch.setattr(font_registry, '_registeredDirs', set())
+    return str(tmp_path)
+
+#Function to count the calls to addfont
+def countAddFont(monkeypatch):
+    addFontCalls = []
+    addFont = font_manager.fontManager.addfont
+    monkeypatch.setattr(font_manager.fontManager, 'addfont',
+                        lambda path: addFontCalls.append(path) or addFont(path))
+    return addFontCalls
+
+# %%% Tests
+
+def test_register_fonts_cache(fontDir, monkeypatch):
+
+    #The first registration reads the font and saves the cache
+    addFontCalls = countAddFont(monkeypatch)
+    assert registerFonts([fontDir]) == ['Super Mario Bros.']
+    assert len(addFontCalls) == 1
+    with open(os.path.join(fontDir, cacheFileName), 'r') as inFile:
+        assert json.load(inFile)['entries'][0]['file'] == 'Super Mario Bros.ttf'
+
+    #The directory is only registered once per process
+    assert registerFonts([fontDir]) == []
+
+    #A new process adds the cached entries without reading the font
+    monkeypatch.setattr(font_registry, '_registeredDirs', set())
+    assert registerFonts([fontDir]) == ['Super Mario Bros.']
+    assert len(addFontCalls) == 1
+    assert os.path.basename(font_manager.findfont('Super Mario Bros.')) == 'Super Mario Bros.ttf'
+
+def test_register_fonts_changed(fontDir, monkeypatch):
+
+    #A changed font directory is read again
+    registerFonts([fontDir])
+    os.utime(os.path.join(fontDir, 'Super Mario Bros.ttf'), (0, 0))
+    monkeypatch.setattr(font_registry, '_registeredDirs', set())
+    addFontCalls = countAddFont(monkeypatch)
+    assert registerFonts([fontDir]) == ['Super Mario Bros.']
+    assert len(addFontCalls) == 1
+
+def test_register_fonts_missing(tmp_path):
+
+    #Missing directories are skipped
+    assert registerFonts([str(tmp_path / 'missing')]) == []
+
+def test_font_signature_skips_afm(fontDir):
+
+    #Only the font files the cache can restore are listed
+    open(os.path.join(fontDir, 'metrics.afm'), 'w').close()
+    assert [entry[0] for entry in fontSignature(fontDir)] == ['Super Mario Bros.ttf']
+
+# %%% ----- End of test_font_registry.py -----